@@ -92,6 +92,12 @@ PAGE_CONFIG = {
             "hover": "Match resumes with job descriptions using AI analysis",
             "filename": "Resume_Matcher.py",
         },
+        {
+            "name": "LLM Metrics",
+            "emoji": "📈",
+            "hover": "Latency, throughput and error dashboard for LLM calls",
+            "filename": "LLM_Metrics.py",
+        },
     ],
 }
 
@@ -0,0 +1,107 @@
+"""
+Admission-control benchmark: interactive chat next to bulk jobs on a throttled provider.
+
+Run from ``src/``:
+
+    python -m benchmarks.admission --rate 240 --batch 60
+
+Two sessions run batch jobs through ``generate_batch`` (one large, one small)
+while a third sends interactive requests, in three modes:
+
+- fifo: one priority and one session for everything, i.e. first come, first served;
+- fair: each caller is its own session, all at batch priority;
+- prioritized: as fair, with the chat at interactive priority.
+"""
+
+import argparse
+import threading
+import time
+from typing import List
+
+from benchmarks.llm_load import percentile
+from tools.fake_provider import FakeClient
+from tools.llm_utils import LLMClient
+from tools.scheduler import (
+    PRIORITY_BATCH,
+    PRIORITY_INTERACTIVE,
+    AdmissionScheduler,
+    request_context,
+)
+
+MODES = ("fifo", "fair", "prioritized")
+
+
+def run(args, mode: str) -> None:
+    scheduler = AdmissionScheduler(rate_per_minute=args.rate, burst=args.burst)
+    llm_client = LLMClient(
+        client=FakeClient(ttft=0.05, tokens_per_sec=2000, response_tokens=20, seed=0),
+        use_cache=False,
+        hedge_after=0,
+        scheduler=scheduler,
+    )
+    interactive = PRIORITY_INTERACTIVE if mode == "prioritized" else PRIORITY_BATCH
+    chat_latencies: List[float] = []
+    finished = {}
+    start = time.perf_counter()
+
+    def batch(session: str, size: int) -> None:
+        with request_context(session=session if mode != "fifo" else "everyone"):
+            llm_client.generate_batch(
+                [f"{session} item {i}" for i in range(size)],
+                max_concurrency=8,
+                use_cache=False,
+            )
+        finished[session] = time.perf_counter() - start
+
+    def chat() -> None:
+        time.sleep(0.5)
+        with request_context(
+            priority=interactive, session="chat" if mode != "fifo" else "everyone"
+        ):
+            for i in range(args.chat):
+                sent = time.perf_counter()
+                llm_client.generate_text(
+                    "You are a chatbot.", f"turn {i}", use_cache=False
+                )
+                chat_latencies.append(time.perf_counter() - sent)
+                time.sleep(args.think)
+
+    threads = [
+        threading.Thread(target=batch, args=("large job", args.batch)),
+        threading.Thread(target=batch, args=("small job", args.batch // 6)),
+        threading.Thread(target=chat),
+    ]
+    for thread in threads:
+        thread.start()
+        time.sleep(0.05)
+    for thread in threads:
+        thread.join()
+
+    print(
+        f"{mode:<12} chat p50 {percentile(chat_latencies, 50):6.2f}s  "
+        f"p95 {percentile(chat_latencies, 95):6.2f}s  "
+        f"small job done {finished['small job']:6.2f}s  large job done {finished['large job']:6.2f}s"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--rate", type=float, default=240.0, help="Admitted requests per minute"
+    )
+    parser.add_argument("--burst", type=float, default=4.0, help="Token bucket size")
+    parser.add_argument(
+        "--batch", type=int, default=60, help="Requests in the large batch job"
+    )
+    parser.add_argument("--chat", type=int, default=8, help="Interactive requests")
+    parser.add_argument(
+        "--think", type=float, default=0.5, help="Pause between chat turns (s)"
+    )
+    args = parser.parse_args()
+
+    for mode in MODES:
+        run(args, mode)
+
+
+if __name__ == "__main__":
+    main()
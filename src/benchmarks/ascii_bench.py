@@ -0,0 +1,126 @@
+"""
+Compare the vectorized ASCII art engine with the original per-pixel loop.
+
+Run from ``src/``:
+
+    python -m benchmarks.ascii_bench --widths 50 100 200 500 1000
+"""
+
+import argparse
+import time
+
+import numpy as np
+from PIL import Image
+
+from tools.ascii_utils import DEFAULT_CHARS, image_to_ascii
+
+
+def legacy_image_to_ascii(
+    image,
+    output_width=100,
+    grayscale="default",
+    invert=False,
+    brightness=1.0,
+    contrast=1.0,
+):
+    """Original per-pixel implementation, kept as the reference for equality and speed."""
+    if image is None:
+        return ""
+
+    img = image.convert("L")  # Convert to grayscale
+
+    width, height = img.size
+    aspect_ratio = height / width
+    output_height = int(
+        output_width * aspect_ratio * 0.5
+    )  # Adjust for character aspect ratio
+
+    img = img.resize((output_width, output_height), resample=Image.LANCZOS)
+
+    pixels = img.getdata()
+
+    if grayscale == "default":
+        grayscale_chars = DEFAULT_CHARS
+    elif grayscale == "simple":
+        grayscale_chars = " .:-=+*#"
+    else:
+        grayscale_chars = grayscale
+
+    if invert:
+        grayscale_chars = grayscale_chars[::-1]
+
+    num_chars = len(grayscale_chars)
+    pixel_range = 256 / num_chars
+
+    ascii_art = ""
+    for i, pixel_value in enumerate(pixels):
+        # Apply brightness and contrast adjustments
+        adjusted_pixel = int(
+            min(255, max(0, (pixel_value - 128) * contrast + 128 * brightness))
+        )
+        ascii_art += grayscale_chars[int(adjusted_pixel / pixel_range)]
+        if (i + 1) % output_width == 0:
+            ascii_art += "\n"
+
+    return ascii_art
+
+
+def make_image(size=(1600, 1200), seed=0):
+    """A gradient with noise, so every intensity bucket is exercised."""
+    rng = np.random.default_rng(seed)
+    x = np.linspace(0, 255, size[0])
+    y = np.linspace(0, 255, size[1])[:, None]
+    data = (x + y) / 2 + rng.normal(0, 25, (size[1], size[0]))
+    return Image.fromarray(np.clip(data, 0, 255).astype(np.uint8), mode="L").convert(
+        "RGB"
+    )
+
+
+def best_of(func, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ASCII art engine benchmark")
+    parser.add_argument(
+        "--widths", type=int, nargs="+", default=[50, 100, 200, 500, 1000]
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    image = make_image()
+    settings = [
+        ("default", False, 1.0, 1.0),
+        ("simple", True, 1.4, 0.7),
+        (" .:-=+*#%@", False, 0.8, 1.9),
+    ]
+    print(
+        f"{'width':>6}{'legacy (ms)':>14}{'vectorized (ms)':>18}{'speedup':>10}  identical"
+    )
+    for width in args.widths:
+        legacy_total = vector_total = 0.0
+        identical = True
+        for grayscale, invert, brightness, contrast in settings:
+            call_args = (image, width, grayscale, invert, brightness, contrast)
+            legacy_time, expected = best_of(
+                lambda: legacy_image_to_ascii(*call_args), args.repeat
+            )
+            vector_time, actual = best_of(
+                lambda: image_to_ascii(*call_args), args.repeat
+            )
+            legacy_total += legacy_time
+            vector_total += vector_time
+            identical &= expected.encode("utf-8") == actual.encode("utf-8")
+        print(
+            f"{width:>6}{legacy_total * 1000:>14.2f}{vector_total * 1000:>18.2f}"
+            f"{legacy_total / vector_total:>9.1f}x  {identical}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Background removal throughput: per-call rembg vs pooled sessions in a thread pool.
+
+Run from ``src/`` (needs rembg and its model weights):
+
+    python -m benchmarks.bg_batch --images 50 --workers 4 --model u2netp
+"""
+
+import argparse
+import io
+import time
+
+import numpy as np
+from PIL import Image
+
+from tools.bg_utils import remove_backgrounds, rembg_sessions
+
+
+def make_images(count, size=(640, 480), seed=0):
+    rng = np.random.default_rng(seed)
+    images = []
+    for i in range(count):
+        data = rng.integers(0, 255, (size[1], size[0], 3), dtype=np.uint8)
+        buf = io.BytesIO()
+        Image.fromarray(data).save(buf, format="PNG")
+        images.append((f"image_{i}.png", buf.getvalue()))
+    return images
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Background removal batch benchmark")
+    parser.add_argument("--images", type=int, default=50)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--model", default="u2net")
+    parser.add_argument(
+        "--baseline-images",
+        type=int,
+        default=5,
+        help="Images for the per-call baseline, which loads a new session each time",
+    )
+    args = parser.parse_args()
+
+    from rembg import new_session, remove
+
+    images = make_images(args.images)
+
+    # Same model as the pooled run, so only session reuse differs
+    start = time.perf_counter()
+    for _, data in images[: args.baseline_images]:
+        remove(data, session=new_session(args.model))
+    baseline = (time.perf_counter() - start) / args.baseline_images
+
+    start = time.perf_counter()
+    rembg_sessions.get(args.model)
+    session_load = time.perf_counter() - start
+
+    start = time.perf_counter()
+    results = list(
+        remove_backgrounds(images, model=args.model, max_workers=args.workers)
+    )
+    elapsed = time.perf_counter() - start
+    failed = sum(1 for r in results if r.error)
+
+    print(f"per-call session:    {baseline:.3f} s/image ({1 / baseline:.2f} images/s)")
+    print(f"session load:        {session_load:.3f} s (once per process)")
+    print(
+        f"pooled batch:        {elapsed / len(images):.3f} s/image "
+        f"({len(images) / elapsed:.2f} images/s, {args.workers} workers, {failed} failed)"
+    )
+    print(
+        f"estimated {len(images)}-image speedup: {baseline * len(images) / elapsed:.1f}x"
+    )
+
+
+if __name__ == "__main__":
+    main()
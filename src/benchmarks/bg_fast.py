@@ -0,0 +1,119 @@
+"""
+Background removal on large photos: full-resolution inference vs fast mode.
+
+Run from ``src/`` (needs rembg and its model weights):
+
+    python -m benchmarks.bg_fast --megapixels 24
+    python -m benchmarks.bg_fast --image photo.jpg --sizes 768 1024 1536
+
+Each configuration runs in a fresh process, so the reported peak RSS is its
+own (model weights included). Mask IoU compares the alpha channel with the
+full-resolution result of ``--model``.
+"""
+
+import argparse
+import io
+import multiprocessing
+import resource
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+from tools.bg_utils import (
+    FAST_MODEL,
+    mask_iou,
+    rembg_sessions,
+    remove_background,
+    to_png_bytes,
+)
+
+
+def make_photo(megapixels: float, seed: int = 0) -> bytes:
+    """A JPEG with a noisy gradient background and a few solid foreground shapes."""
+    width = int((megapixels * 1e6 * 3 / 2) ** 0.5)
+    height = int(width * 2 / 3)
+    rng = np.random.default_rng(seed)
+    gradient = np.linspace(60, 200, width, dtype=np.float32)[None, :, None]
+    background = np.broadcast_to(gradient, (height, width, 3)) + rng.normal(
+        0, 12, (height, width, 3)
+    )
+    image = Image.fromarray(np.clip(background, 0, 255).astype(np.uint8))
+    draw = ImageDraw.Draw(image)
+    draw.ellipse(
+        (width * 0.3, height * 0.15, width * 0.7, height * 0.95), fill=(200, 40, 40)
+    )
+    draw.rectangle(
+        (width * 0.42, height * 0.05, width * 0.58, height * 0.3), fill=(30, 30, 160)
+    )
+    buf = io.BytesIO()
+    image.save(buf, format="JPEG", quality=90)
+    return buf.getvalue()
+
+
+def measure(image_bytes: bytes, model: str, fast: bool, max_working_size: int):
+    rembg_sessions.get(model)
+    start = time.perf_counter()
+    result = remove_background(image_bytes, model, fast, max_working_size)
+    elapsed = time.perf_counter() - start
+    # ru_maxrss is in KiB on Linux
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return elapsed, peak_mb, to_png_bytes(result.getchannel("A"))
+
+
+def run(image_bytes: bytes, model: str, fast: bool = False, max_working_size: int = 0):
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+        return pool.submit(measure, image_bytes, model, fast, max_working_size).result()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--image", help="Photo to use instead of a synthetic one")
+    parser.add_argument(
+        "--megapixels", type=float, default=24.0, help="Size of the synthetic photo"
+    )
+    parser.add_argument(
+        "--model", default="u2net", help="Model for the full-resolution reference"
+    )
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[1024],
+        help="Fast-mode max working sizes",
+    )
+    args = parser.parse_args()
+
+    if args.image:
+        with open(args.image, "rb") as f:
+            image_bytes = f.read()
+    else:
+        image_bytes = make_photo(args.megapixels)
+    width, height = Image.open(io.BytesIO(image_bytes)).size
+    print(f"input: {width}x{height} ({width * height / 1e6:.1f} MP)\n")
+
+    reference_time, reference_peak, reference_png = run(image_bytes, args.model)
+    reference = Image.open(io.BytesIO(reference_png))
+
+    header = f"{'mode':<28}{'time':>9}{'speedup':>9}{'peak RSS':>11}{'mask IoU':>10}"
+    print(header)
+    print("-" * len(header))
+    print(
+        f"{'full resolution ' + args.model:<28}{reference_time:>8.2f}s{1:>8.1f}x{reference_peak:>9.0f}MB{1:>10.3f}"
+    )
+    for model in dict.fromkeys([args.model, FAST_MODEL]):
+        for size in args.sizes:
+            elapsed, peak, mask_png = run(
+                image_bytes, model, fast=True, max_working_size=size
+            )
+            iou = mask_iou(Image.open(io.BytesIO(mask_png)), reference)
+            print(
+                f"{f'fast {model} @ {size}px':<28}{elapsed:>8.2f}s"
+                f"{reference_time / elapsed:>8.1f}x{peak:>9.0f}MB{iou:>10.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
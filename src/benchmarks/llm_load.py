@@ -0,0 +1,225 @@
+"""
+Load benchmark for the LLM layer against the fake g4f provider.
+
+Run from ``src/``:
+
+    python -m benchmarks.llm_load --sessions 16 --requests 10 --ttft 0.4 --tps 60
+
+Hedging uses the client default unless ``--hedge-after`` is given; streams
+are hedged onto a second fake route. Compare tail latency with and without
+hedging against a provider that occasionally stalls:
+
+    python -m benchmarks.llm_load --stall-rate 0.1 --stall-seconds 8 --hedge-after 0
+    python -m benchmarks.llm_load --stall-rate 0.1 --stall-seconds 8 --hedge-after 1.5
+
+Send every session the same few prompts at once, with the in-memory response
+cache and in-flight request sharing on, and count upstream requests:
+
+    python -m benchmarks.llm_load --popular 3
+"""
+
+import argparse
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, List
+
+from tools.cache import ResponseCache
+from tools.fake_provider import FakeClient
+from tools.hedging import DEFAULT_HEDGE_AFTER
+from tools.llm_utils import LLMClient, is_error_response
+from tools.scheduler import AdmissionScheduler
+
+OPERATIONS = ("generate_text", "stream_content", "json_output")
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Linear-interpolated percentile of a list of numbers."""
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def run_operation(
+    llm_client: LLMClient, operation: str, prompt: str, use_cache: bool = False
+) -> Dict[str, float]:
+    start = time.perf_counter()
+    ttft = None
+    if operation == "generate_text":
+        text = llm_client.generate_text(
+            "You are a benchmark.", prompt, use_cache=use_cache
+        )
+    elif operation == "stream_content":
+        parts = []
+        response = llm_client.generate_text(
+            "You are a benchmark.", prompt, stream=True, use_cache=use_cache
+        )
+        for delta in llm_client.stream_content(response):
+            if ttft is None:
+                ttft = time.perf_counter() - start
+            parts.append(delta)
+        text = "".join(parts)
+    else:
+        text = llm_client.generate_text("Reply in JSON.", prompt, use_cache=use_cache)
+        if not is_error_response(text):
+            llm_client.json_output(text)
+    return {
+        "latency": time.perf_counter() - start,
+        "ttft": ttft,
+        "chars": len(text),
+        "error": is_error_response(text),
+    }
+
+
+def session(
+    llm_client: LLMClient,
+    session_id: int,
+    requests: int,
+    results: list,
+    lock,
+    popular: int = 0,
+):
+    for i in range(requests):
+        if popular:
+            # Every session sends the same request at the same step
+            operation = OPERATIONS[i % len(OPERATIONS)]
+            prompt = f"popular request {i % popular}"
+        else:
+            operation = OPERATIONS[(session_id + i) % len(OPERATIONS)]
+            prompt = f"session {session_id} request {i}"
+        sample = run_operation(llm_client, operation, prompt, use_cache=bool(popular))
+        sample["operation"] = operation
+        sample["prompt"] = prompt
+        with lock:
+            results.append(sample)
+
+
+def report(results: list, elapsed: float) -> None:
+    by_operation = defaultdict(list)
+    for sample in results:
+        by_operation[sample["operation"]].append(sample)
+
+    header = f"{'operation':<16}{'n':>5}{'err':>5}{'p50':>9}{'p95':>9}{'p99':>9}{'ttft p50':>10}{'ttft p95':>10}{'ttft p99':>10}"
+    print(header)
+    print("-" * len(header))
+    for operation in OPERATIONS:
+        samples = by_operation.get(operation, [])
+        latencies = [s["latency"] for s in samples if not s["error"]]
+        ttfts = [s["ttft"] for s in samples if s["ttft"] is not None]
+        errors = sum(s["error"] for s in samples)
+        ttft_cols = (
+            "".join(f"{percentile(ttfts, pct):>10.3f}" for pct in (50, 95, 99))
+            if ttfts
+            else f"{'-':>10}" * 3
+        )
+        print(
+            f"{operation:<16}{len(samples):>5}{errors:>5}"
+            f"{percentile(latencies, 50):>9.3f}{percentile(latencies, 95):>9.3f}"
+            f"{percentile(latencies, 99):>9.3f}{ttft_cols}"
+        )
+
+    total_chars = sum(s["chars"] for s in results if not s["error"])
+    print(
+        f"\n{len(results)} requests in {elapsed:.2f}s: "
+        f"{len(results) / elapsed:.2f} req/s, {total_chars / elapsed:.0f} chars/s"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--sessions", type=int, default=8, help="Concurrent simulated sessions"
+    )
+    parser.add_argument("--requests", type=int, default=10, help="Requests per session")
+    parser.add_argument(
+        "--ttft", type=float, default=0.5, help="Fake time-to-first-token (s)"
+    )
+    parser.add_argument(
+        "--tps", type=float, default=50.0, help="Fake tokens per second"
+    )
+    parser.add_argument(
+        "--jitter", type=float, default=0.2, help="Relative latency jitter"
+    )
+    parser.add_argument(
+        "--error-rate", type=float, default=0.0, help="Fake failure probability"
+    )
+    parser.add_argument("--tokens", type=int, default=120, help="Tokens per response")
+    parser.add_argument(
+        "--stall-rate",
+        type=float,
+        default=0.0,
+        help="Fake probability of a stalled first token",
+    )
+    parser.add_argument(
+        "--stall-seconds",
+        type=float,
+        default=10.0,
+        help="Fake first-token delay of a stalled request",
+    )
+    parser.add_argument(
+        "--hedge-after",
+        type=float,
+        default=DEFAULT_HEDGE_AFTER,
+        help="LLMClient hedging delay (s); 0 disables. Defaults to the client default",
+    )
+    parser.add_argument(
+        "--rate",
+        type=float,
+        default=0.0,
+        help="Admitted requests per minute; 0 disables admission control",
+    )
+    parser.add_argument(
+        "--popular",
+        type=int,
+        default=0,
+        help="Distinct prompts shared by all sessions; 0 gives every request its own",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    fake = FakeClient(
+        ttft=args.ttft,
+        tokens_per_sec=args.tps,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        response_tokens=args.tokens,
+        seed=args.seed,
+        stall_rate=args.stall_rate,
+        stall_seconds=args.stall_seconds,
+    )
+    llm_client = LLMClient(
+        client=fake,
+        cache=ResponseCache(use_disk=False),
+        use_cache=bool(args.popular),
+        # The fake provider ignores the provider name; this is a second route
+        # for streams to be hedged onto
+        fallbacks=["gpt-4o-mini@Backup"],
+        hedge_after=args.hedge_after,
+        scheduler=AdmissionScheduler(rate_per_minute=args.rate),
+    )
+
+    results, lock = [], threading.Lock()
+    threads = [
+        threading.Thread(
+            target=session,
+            args=(llm_client, i, args.requests, results, lock, args.popular),
+        )
+        for i in range(args.sessions)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    report(results, time.perf_counter() - start)
+    # generate_text and stream_content send the same request for a prompt
+    distinct = len({(s["operation"] == "json_output", s["prompt"]) for s in results})
+    print(f"{fake.requests} upstream requests for {distinct} distinct requests")
+
+
+if __name__ == "__main__":
+    main()
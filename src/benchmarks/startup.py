@@ -0,0 +1,127 @@
+"""
+Cold-start import cost of every Streamlit page.
+
+Each page's top-level imports run in a fresh interpreter, so the numbers match
+what a first page load pays. Run from ``src/``:
+
+    python -m benchmarks.startup --top 5 --max-seconds 2.0
+
+With ``--max-seconds`` the script exits non-zero when any page is slower,
+which makes it usable as a regression check.
+"""
+
+import argparse
+import ast
+import json
+import os
+import subprocess
+import sys
+
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PAGES_DIR = os.path.join(SRC_DIR, "pages")
+
+# Executed in a child interpreter: time the page's import statements and keep
+# the -X importtime log (written to stderr) for the per-module breakdown.
+_CHILD = """
+import json, sys, time
+statements = json.loads(sys.argv[1])
+sys.stderr.write("-- page imports --\\n")
+sys.stderr.flush()
+errors = []
+start = time.perf_counter()
+for statement in statements:
+    try:
+        exec(statement, {})
+    except Exception as e:
+        errors.append(f"{type(e).__name__}: {e}")
+print(json.dumps({"seconds": time.perf_counter() - start, "errors": errors}))
+"""
+
+
+def page_imports(path: str) -> list:
+    """Source of each module-level import statement of a page."""
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read(), filename=path)
+    imports = [
+        node for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))
+    ]
+    return [ast.unparse(node) for node in imports]
+
+
+def heaviest_modules(importtime_log: str, top: int):
+    """Top-level packages with the largest cumulative import time, in seconds."""
+    totals = {}
+    # Ignore interpreter start-up imports logged before the page's own imports
+    _, _, importtime_log = importtime_log.partition("-- page imports --")
+    for line in importtime_log.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:") :].split("|")
+        if len(fields) != 3 or not fields[1].strip().isdigit():
+            continue
+        # Nested imports are indented further; keep only top-level entries
+        name = fields[2]
+        if len(name) - len(name.lstrip()) != 1:
+            continue
+        totals[name.strip()] = totals.get(name.strip(), 0) + int(fields[1]) / 1e6
+    return sorted(totals.items(), key=lambda kv: -kv[1])[:top]
+
+
+def measure(path: str, top: int):
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-X",
+            "importtime",
+            "-c",
+            _CHILD,
+            json.dumps(page_imports(path)),
+        ],
+        cwd=SRC_DIR,
+        capture_output=True,
+        text=True,
+        env={**os.environ, "PYTHONPATH": SRC_DIR},
+    )
+    lines = result.stdout.strip().splitlines()
+    if result.returncode or not lines:
+        return {
+            "seconds": float("nan"),
+            "errors": result.stderr.strip().splitlines()[-1:],
+            "top": [],
+        }
+    data = json.loads(lines[-1])
+    data["top"] = heaviest_modules(result.stderr, top)
+    return data
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-page import cost benchmark")
+    parser.add_argument(
+        "--top", type=int, default=3, help="Heaviest modules to list per page"
+    )
+    parser.add_argument(
+        "--max-seconds", type=float, default=None, help="Fail above this import time"
+    )
+    args = parser.parse_args()
+
+    pages = sorted(
+        f for f in os.listdir(PAGES_DIR) if f.endswith(".py") and f != "__init__.py"
+    )
+    slow = []
+    print(f"{'page':<32}{'import (s)':>11}  heaviest modules")
+    for filename in pages:
+        data = measure(os.path.join(PAGES_DIR, filename), args.top)
+        heavy = ", ".join(f"{name} {seconds:.2f}s" for name, seconds in data["top"])
+        # Missing optional packages are reported; the remaining imports are still timed
+        note = f"  [{'; '.join(data['errors'])}]" if data["errors"] else ""
+        print(f"{filename:<32}{data['seconds']:>11.3f}  {heavy}{note}")
+        if args.max_seconds is not None and not data["seconds"] <= args.max_seconds:
+            slow.append(filename)
+
+    if slow:
+        print(f"\nOver {args.max_seconds:.2f}s: {', '.join(slow)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
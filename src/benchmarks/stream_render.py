@@ -0,0 +1,74 @@
+"""
+Render-cost benchmark for delta coalescing in front of st.write_stream.
+
+Run from ``src/``:
+
+    python -m benchmarks.stream_render --tokens 1500 --tps 80
+
+The consumer mimics ``st.write_stream``: every chunk re-serializes the whole
+accumulated markdown into a message (here, JSON-encoding it and paying a fixed
+per-message overhead).
+"""
+
+import argparse
+import json
+import time
+
+from tools.fake_provider import FakeClient
+from tools.llm_utils import LLMClient
+from tools.scheduler import AdmissionScheduler
+
+
+def render(stream, message_overhead: float):
+    text, renders, render_time = "", 0, 0.0
+    for chunk in stream:
+        start = time.perf_counter()
+        text += chunk
+        json.dumps({"markdown": text})
+        time.sleep(message_overhead)
+        render_time += time.perf_counter() - start
+        renders += 1
+    return text, renders, render_time
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tokens", type=int, default=1500, help="Tokens per response")
+    parser.add_argument(
+        "--tps", type=float, default=80.0, help="Fake tokens per second"
+    )
+    parser.add_argument(
+        "--overhead", type=float, default=0.002, help="Per-message render overhead (s)"
+    )
+    args = parser.parse_args()
+
+    results = {}
+    for name in ("per delta", "coalesced"):
+        llm_client = LLMClient(
+            client=FakeClient(
+                ttft=0.1, tokens_per_sec=args.tps, response_tokens=args.tokens, seed=0
+            ),
+            use_cache=False,
+            hedge_after=0,
+            scheduler=AdmissionScheduler(rate_per_minute=0),
+        )
+        response = llm_client.generate_text(
+            "You are a benchmark.", "Write.", stream=True
+        )
+        stream = (
+            llm_client.stream_content(response)
+            if name == "per delta"
+            else llm_client.stream_coalesced(response)
+        )
+        start = time.perf_counter()
+        text, renders, render_time = render(stream, args.overhead)
+        results[name] = text
+        print(
+            f"{name:<10} {renders:>6} renders  {render_time:7.3f}s rendering  "
+            f"{time.perf_counter() - start:7.3f}s wall"
+        )
+    print("identical output:", results["per delta"] == results["coalesced"])
+
+
+if __name__ == "__main__":
+    main()
@@ -4,58 +4,7 @@ import io
 import pyperclip
 import base64
 
-
-def image_to_ascii(
-    image,
-    output_width=100,
-    grayscale="default",
-    invert=False,
-    brightness=1.0,
-    contrast=1.0,
-):
-    """
-    Converts a PIL Image object to ASCII art with adjustable detail, brightness, and contrast.
-    """
-    if image is None:
-        return ""
-
-    img = image.convert("L")  # Convert to grayscale
-
-    width, height = img.size
-    aspect_ratio = height / width
-    output_height = int(
-        output_width * aspect_ratio * 0.5
-    )  # Adjust for character aspect ratio
-
-    img = img.resize((output_width, output_height), resample=Image.LANCZOS)
-
-    pixels = img.getdata()
-
-    if grayscale == "default":
-        grayscale_chars = " .:-=+*#%@MW&8Q0X$UOZAJKYP6G9V432F5S7I1TLrcvunxzjft/\|()1{}[]?-_+~<>i!lI;:,\"^`'. "
-    elif grayscale == "simple":
-        grayscale_chars = " .:-=+*#"
-    else:
-        grayscale_chars = grayscale
-
-    if invert:
-        grayscale_chars = grayscale_chars[::-1]
-
-    num_chars = len(grayscale_chars)
-    pixel_range = 256 / num_chars
-
-    ascii_art = ""
-    for i, pixel_value in enumerate(pixels):
-        # Apply brightness and contrast adjustments
-        adjusted_pixel = int(
-            min(255, max(0, (pixel_value - 128) * contrast + 128 * brightness))
-        )
-        ascii_art += grayscale_chars[int(adjusted_pixel / pixel_range)]
-        if (i + 1) % output_width == 0:
-            ascii_art += "\n"
-
-    return ascii_art
-
+from tools.ascii_utils import image_to_ascii
 
 st.title("🖼️ ASCII Art Generator 🎨")
 
@@ -1,7 +1,14 @@
 import streamlit as st
-from PIL import Image
-from rembg import remove
-import io
+
+from tools.bg_utils import (
+    DEFAULT_MAX_WORKING_SIZE,
+    FAST_MODEL,
+    REMBG_MODELS,
+    build_zip,
+    remove_background,
+    remove_backgrounds,
+    to_png_bytes,
+)
 
 # Set page config
 st.set_page_config(page_title="Background Remover", layout="wide")
@@ -12,39 +19,111 @@ st.write("✨ Upload an image to effortlessly remove its background. ✨")
 
 
 # Function to process the image
-def process_image(uploaded_image):
+def process_image(
+    uploaded_image, model="u2net", fast=False, max_working_size=DEFAULT_MAX_WORKING_SIZE
+):
     """Removes the background from an uploaded image."""
     input_image = uploaded_image.read()
-    output_image = remove(input_image)
-    output_image = Image.open(io.BytesIO(output_image))
-    return output_image
+    return remove_background(input_image, model, fast, max_working_size)
+
+
+col_mode, col_model, col_speed = st.columns(3)
+mode = col_mode.radio("🗂️ Mode", ["Single image", "Batch"], horizontal=True)
+model = col_model.selectbox(
+    "🧠 Model",
+    REMBG_MODELS,
+    help="u2netp is smaller and faster; isnet-general-use is more precise.",
+)
+speed = col_speed.radio(
+    "⚡ Speed / quality",
+    ["Quality", "Fast"],
+    horizontal=True,
+    help="Fast mode finds the subject on a smaller copy of the image and applies "
+    "the mask to the full-resolution original. Much quicker on large photos.",
+)
+fast = speed == "Fast"
+max_working_size = DEFAULT_MAX_WORKING_SIZE
+if fast:
+    col_size, col_light = st.columns(2)
+    max_working_size = col_size.select_slider(
+        "📐 Max working size (px)",
+        options=[512, 768, 1024, 1536, 2048],
+        value=DEFAULT_MAX_WORKING_SIZE,
+        help="Longest side of the copy the model runs on. Smaller is faster and uses less memory.",
+    )
+    if col_light.checkbox(f"🪶 Use the lightweight {FAST_MODEL} model", value=True):
+        model = FAST_MODEL
 
+if mode == "Single image":
+    # File uploader
+    uploaded_file = st.file_uploader(
+        "📂 Choose an image...", type=["jpg", "jpeg", "png"]
+    )
 
-# File uploader
-uploaded_file = st.file_uploader("📂 Choose an image...", type=["jpg", "jpeg", "png"])
+    if uploaded_file is not None:
+        col1, col2 = st.columns(2)
 
-if uploaded_file is not None:
-    col1, col2 = st.columns(2)
+        with col1:
+            st.subheader("Original Image")
+            st.image(uploaded_file, use_container_width=True)
 
-    with col1:
-        st.subheader("Original Image")
-        st.image(uploaded_file, use_container_width=True)
+        with col2:
+            st.subheader("✨ Processed Image (Background Removed)")
+            with st.spinner("🔄 Removing background..."):
+                processed_image = process_image(
+                    uploaded_file, model, fast, max_working_size
+                )
+                st.image(processed_image, use_container_width=True)
 
-    with col2:
-        st.subheader("✨ Processed Image (Background Removed)")
-        with st.spinner("🔄 Removing background..."):
-            processed_image = process_image(uploaded_file)
-            st.image(processed_image, use_container_width=True)
+            # Download button for processed image
+            st.download_button(
+                label="💾 Download Processed Image",
+                data=to_png_bytes(processed_image),
+                file_name="no_bg.png",
+                on_click="ignore",
+                mime="image/png",
+            )
+else:
+    uploaded_files = st.file_uploader(
+        "📂 Choose images...", type=["jpg", "jpeg", "png"], accept_multiple_files=True
+    )
+    max_workers = st.slider("⚙️ Parallel workers", 1, 8, 4)
 
-        # Download button for processed image
-        buf = io.BytesIO()
-        processed_image.save(buf, format="PNG")
-        byte_im = buf.getvalue()
+    if uploaded_files and st.button("🚀 Remove Backgrounds", use_container_width=True):
+        progress = st.progress(0.0, text="🔄 Removing backgrounds...")
+        grid = st.columns(4)
+        results = []
+        images = [(f.name, f.getvalue()) for f in uploaded_files]
 
+        # Results are shown as each image finishes, not in upload order
+        for result in remove_backgrounds(
+            images,
+            model=model,
+            max_workers=max_workers,
+            fast=fast,
+            max_working_size=max_working_size,
+        ):
+            results.append(result)
+            with grid[(len(results) - 1) % 4]:
+                if result.error:
+                    st.error(f"{result.name}: {result.error}")
+                else:
+                    st.image(
+                        result.image, caption=result.name, use_container_width=True
+                    )
+            progress.progress(
+                len(results) / len(images),
+                text=f"🔄 Processed {len(results)} / {len(images)}",
+            )
+
+        failed = sum(1 for r in results if r.error)
+        progress.progress(
+            1.0, text=f"✅ Done: {len(results) - failed} processed, {failed} failed"
+        )
         st.download_button(
-            label="💾 Download Processed Image",
-            data=byte_im,
-            file_name="no_bg.png",
+            label="💾 Download All (ZIP)",
+            data=build_zip(results),
+            file_name="no_bg_images.zip",
             on_click="ignore",
-            mime="image/png",
+            mime="application/zip",
         )
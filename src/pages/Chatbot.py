@@ -1,5 +1,7 @@
 import streamlit as st
+from tools.chat_context import ChatContextManager
 from tools.llm_utils import LLMClient
+from tools.scheduler import PRIORITY_INTERACTIVE, queue_message, request_context
 
 st.set_page_config(page_title="AI Alchemy", layout="wide")
 
@@ -16,31 +18,48 @@ llm_client = LLMClient()
 if "openai_model" not in st.session_state:
     st.session_state["openai_model"] = "gpt-4o-mini"
 
-# Initialize chat history
-if "messages" not in st.session_state:
-    st.session_state.messages = []
+# Initialize chat history; other pages keep their own "messages" and reset them,
+# which must not touch the history the context manager has summarized
+if "chatbot_messages" not in st.session_state:
+    st.session_state.chatbot_messages = []
+
+# Keeps each request within the model's token budget by summarizing old turns
+if "chat_context" not in st.session_state:
+    st.session_state.chat_context = ChatContextManager(
+        llm_client, model=st.session_state["openai_model"]
+    )
 
 # Display chat messages from history on app rerun
-for message in st.session_state.messages:
+for message in st.session_state.chatbot_messages:
     with st.chat_message(message["role"]):
         st.markdown(message["content"])
 
 # Accept user input
 if prompt := st.chat_input("What is up?"):
     # Add user message to chat history
-    st.session_state.messages.append({"role": "user", "content": prompt})
+    st.session_state.chatbot_messages.append({"role": "user", "content": prompt})
     # Display user message in chat message container
     with st.chat_message("user"):
         st.markdown(prompt)
     # Display assistant response in chat message container
     with st.chat_message("assistant"):
-        stream = llm_client.client.chat.completions.create(
-            model=st.session_state["openai_model"],
-            messages=[
-                {"role": m["role"], "content": m["content"]}
-                for m in st.session_state.messages
-            ],
-            stream=True,
-        )
-        response = st.write_stream(llm_client.stream_content(stream))
-    st.session_state.messages.append({"role": "assistant", "content": response})
+        # Chat turns jump the upstream queue; show the position while waiting
+        queue_notice = st.empty()
+        with request_context(
+            priority=PRIORITY_INTERACTIVE,
+            on_wait=lambda position, wait: queue_notice.caption(
+                queue_message(position, wait)
+            ),
+        ):
+            stream = llm_client.chat_completion(
+                st.session_state.chat_context.build_messages(
+                    st.session_state.chatbot_messages
+                ),
+                stream=True,
+                model=st.session_state["openai_model"],
+            )
+        queue_notice.empty()
+        response = st.write_stream(llm_client.stream_coalesced(stream))
+    st.session_state.chatbot_messages.append({"role": "assistant", "content": response})
+    # Fold older turns into the running summary without blocking the next turn
+    st.session_state.chat_context.compact_async(st.session_state.chatbot_messages)
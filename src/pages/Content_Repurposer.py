@@ -40,8 +40,10 @@ def main():
                 {input_text}
                 ```"""
                 output = st.write_stream(
-                    llm_client.stream_content(
-                        llm_client.generate_text(system_prompt, user_prompt, stream=True)
+                    llm_client.stream_coalesced(
+                        llm_client.generate_text(
+                            system_prompt, user_prompt, stream=True
+                        )
                     )
                 )
                 st.session_state.output = output  # Store in session state
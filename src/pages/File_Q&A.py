@@ -1,9 +1,22 @@
 import streamlit as st
 from tools.llm_utils import LLMClient
+from tools.retrieval import SearchResult, document_indexes
+from tools.scheduler import PRIORITY_INTERACTIVE, queue_message, request_context
 
 # Initialize the LLM client
 llm_client = LLMClient()
 
+# Number of article chunks sent with each question
+TOP_K = 4
+
+SYSTEM_PROMPT = (
+    "You are a helpful assistant answering questions about an article. "
+    "With each question you receive the most relevant excerpts of the article, "
+    "each tagged with a chunk id like [3]. Answer based only on these excerpts and "
+    "cite the chunk ids you used in square brackets. If the excerpts do not contain "
+    "the answer, say so."
+)
+
 st.title("📝 File Q&A")
 
 # Initialize chat history if it doesn't exist
@@ -23,32 +36,52 @@ question = st.text_input(
 # Handle file upload and system message
 if uploaded_file:
     article = uploaded_file.read().decode()
+    # Chunked and indexed once per document content, shared across sessions
+    index = document_indexes.get(article)
+    doc_hash = document_indexes.document_hash(article)
 
-    # Only add the system message if it's not already in the chat history
-    if not any(msg["role"] == "system" for msg in st.session_state.messages):
-        system_prompt = (
-            f"You are a helpful assistant analyzing the following article:\n\n"
-            f"<article>\n{article}\n</article>\n\n"
-            f"Please answer questions based only on the information provided in this article."
-        )
-        st.session_state.messages = [{"role": "system", "content": system_prompt}]
+    # Start a fresh conversation whenever a different article is uploaded
+    if st.session_state.get("qa_doc_hash") != doc_hash or not any(
+        msg["role"] == "system" for msg in st.session_state.messages
+    ):
+        st.session_state.qa_doc_hash = doc_hash
+        st.session_state.messages = [{"role": "system", "content": SYSTEM_PROMPT}]
 
 # Handle question and generate response
 if question and uploaded_file:
-    # Add user message
+    results = index.search(question, top_k=TOP_K)
+    if not results:
+        # Nothing matched lexically (e.g. "summarize this"): fall back to the opening chunks
+        results = [SearchResult(chunk, 0.0) for chunk in index.chunks[:TOP_K]]
+    excerpts = "\n\n".join(f"[{r.chunk.id}] {r.chunk.text}" for r in results)
+
+    # Only the question is kept in history; excerpts are sent for this turn only
     user_message = {"role": "user", "content": question}
+    messages = st.session_state.messages + [
+        {
+            "role": "user",
+            "content": f"<excerpts>\n{excerpts}\n</excerpts>\n\nQuestion: {question}",
+        }
+    ]
     st.session_state.messages.append(user_message)
 
-    # Generate response
-    stream = llm_client.client.chat.completions.create(
-        model=llm_client.model,
-        messages=st.session_state.messages,
-        stream=True,
-    )
+    # Generate response, ahead of queued tool and batch requests
+    queue_notice = st.empty()
+    with request_context(
+        priority=PRIORITY_INTERACTIVE,
+        on_wait=lambda position, wait: queue_notice.caption(
+            queue_message(position, wait)
+        ),
+    ):
+        stream = llm_client.chat_completion(messages, stream=True)
+    queue_notice.empty()
 
     # Display answer
     st.write("### Answer")
-    response = st.write_stream(llm_client.stream_content(stream))
+    response = st.write_stream(llm_client.stream_coalesced(stream))
+    with st.expander("📚 Sources"):
+        for r in results:
+            st.markdown(f"**[{r.chunk.id}]** {r.chunk.text}")
 
     # Add assistant message
     assistant_message = {"role": "assistant", "content": response}
@@ -1,16 +1,14 @@
-import tempfile
-
 import streamlit as st
 from redlines import Redlines  # Import Redlines
 
-from tools.image_utils import ocr
+from tools.ocr_utils import ocr_pages
 from tools.llm_utils import LLMClient
 
 # Initialize the LLM client
 llm_client = LLMClient()
 
 
-def ielts_examiner(ielts_writing, max_attempts=3):
+def ielts_prompts(ielts_writing):
     system_prompt = """You are an expert IELTS writing examiner. You assess the given essay and provide feedback, identify mistakes, and suggest corrections.
                 Your output must be a JSON following this structure:
                 Format strictly as:
@@ -25,28 +23,85 @@ def ielts_examiner(ielts_writing, max_attempts=3):
 ielts_writing:\n
 {ielts_writing}
 """
+    return system_prompt, user_prompt
+
+
+def ielts_examiner(ielts_writing, max_attempts=3):
+    system_prompt, user_prompt = ielts_prompts(ielts_writing)
     for attempt in range(max_attempts):
         try:
-            return llm_client.json_output(llm_client.generate_text(system_prompt, user_prompt))
+            return llm_client.json_output(
+                llm_client.generate_text(system_prompt, user_prompt)
+            )
         except Exception as e:
             # If this is the last attempt, return None
             if attempt == max_attempts - 1:
                 return None
 
 
-def show_ielts_result(result):
-    st.success(f"🎉 Score: {result['band']} / 9")
+def show_band(band):
+    st.success(f"🎉 Score: {band} / 9")
+
+
+def show_feedback(feedback):
     st.subheader("📝 Feedback:")
-    st.write(result["feedback"])
+    st.write(feedback)
+
+
+def show_mistake(i, mistake):
+    st.markdown("---")
+    st.write(f"**Mistake {i+1}:** {mistake['mistake']}")
+    st.write(f"**Correction {i+1}:** {mistake['correction']}")
+    # Generate and display the diff
+    with st.expander(f"## 🔍 See Changes Highlighted (Mistake {i+1})"):
+        diff = Redlines(mistake["mistake"], mistake["correction"])
+        st.markdown(diff.output_markdown, unsafe_allow_html=True)
+
+
+def show_ielts_result(result):
+    show_band(result["band"])
+    show_feedback(result["feedback"])
     st.subheader("⚠️ Mistakes and Corrections:")
     for i, mistake in enumerate(result["mistakes"]):
-        st.markdown("---")
-        st.write(f"**Mistake {i+1}:** {mistake['mistake']}")
-        st.write(f"**Correction {i+1}:** {mistake['correction']}")
-        # Generate and display the diff
-        with st.expander(f"## 🔍 See Changes Highlighted (Mistake {i+1})"):
-            diff = Redlines(mistake["mistake"], mistake["correction"])
-            st.markdown(diff.output_markdown, unsafe_allow_html=True)
+        show_mistake(i, mistake)
+
+
+def stream_ielts_result(ielts_writing):
+    """Render the band, feedback and each mistake as soon as the model has written it."""
+    system_prompt, user_prompt = ielts_prompts(ielts_writing)
+    # Slots keep the usual layout whatever order the fields arrive in; they
+    # share one placeholder so a failed stream can be cleared in one go
+    root = st.empty()
+    with root.container():
+        band_slot = st.empty()
+        feedback_slot = st.container()
+        mistakes_slot = st.container()
+    band_slot.info("🔄 Evaluating...")
+
+    result = None
+    mistakes_shown = 0
+    stream = llm_client.generate_text(system_prompt, user_prompt, stream=True)
+    for event in llm_client.stream_json(stream):
+        if event.path == ("band",):
+            with band_slot:
+                show_band(event.value)
+        elif event.path == ("feedback",):
+            with feedback_slot:
+                show_feedback(event.value)
+        elif len(event.path) == 2 and event.path[0] == "mistakes":
+            mistake = event.value
+            if isinstance(mistake, dict) and {"mistake", "correction"} <= set(mistake):
+                with mistakes_slot:
+                    if not mistakes_shown:
+                        st.subheader("⚠️ Mistakes and Corrections:")
+                    show_mistake(mistakes_shown, mistake)
+                mistakes_shown += 1
+        elif event.path == ():
+            result = event.value
+    if result is None:
+        # The fallback renders the whole result again
+        root.empty()
+    return result
 
 
 def main():
@@ -59,19 +114,19 @@ def main():
         input_text = st.text_area(
             "✍️ Paste your IELTS writing here to evaluate:", height=250
         )
-        uploaded_image = st.file_uploader(
-            "📷 Or upload an image of your writing:", type=["png", "jpg", "jpeg"]
+        uploaded_images = st.file_uploader(
+            "📷 Or upload images of your writing (one per page):",
+            type=["png", "jpg", "jpeg"],
+            accept_multiple_files=True,
         )
         submitted = st.form_submit_button("🚀 Evaluate My Writing")
 
         if submitted:
-            if uploaded_image:
-                with tempfile.NamedTemporaryFile(
-                    delete=False, suffix=".png"
-                ) as temp_file:
-                    temp_file.write(uploaded_image.read())
-                    image_path = temp_file.name
-                input_text = ocr(image_path)
+            if uploaded_images:
+                # Pages are OCR'd in memory, in parallel worker processes
+                with st.spinner(f"🔍 Reading {len(uploaded_images)} page(s)..."):
+                    pages = ocr_pages([image.getvalue() for image in uploaded_images])
+                input_text = "\n\n".join(pages)
                 st.subheader("📝 Extracted Text:")
                 st.write(input_text)
 
@@ -79,14 +134,16 @@ def main():
                 st.warning("⚠️ Please provide text input or upload an image. ⚠️")
                 return
 
-            with st.spinner("🔄 Evaluating..."):
-
-                try:
-                    result = ielts_examiner(input_text)
+            try:
+                if stream_ielts_result(input_text) is None:
+                    # The streamed reply was not parseable JSON; fall back to the
+                    # lenient full-response parser (served from the response cache)
+                    with st.spinner("🔄 Evaluating..."):
+                        result = ielts_examiner(input_text)
                     show_ielts_result(result)
-                except Exception as e:
-                    print(f"Error: {str(e)}")
-                    st.error("An error occurred during evaluation. Please try again.")
+            except Exception as e:
+                print(f"Error: {str(e)}")
+                st.error("An error occurred during evaluation. Please try again.")
 
 
 if __name__ == "__main__":
@@ -1,6 +1,6 @@
 import streamlit as st
 from PIL import Image
-from tools.image_utils import image_to_latex
+from tools.image_utils import image_to_latex, latex_models
 
 st.title("Image to LaTeX Converter")
 
@@ -14,13 +14,15 @@ if uploaded_file is not None:
     image = Image.open(uploaded_file)
     st.image(image, caption="Uploaded Image")
 
-    # Save the uploaded image to a temporary location
-    with open("temp_image.png", "wb") as f:
-        f.write(uploaded_file.getbuffer())
-
-    # Convert the image to LaTeX code
+    # Convert the image to LaTeX code; the model stays loaded between uploads
     with st.spinner("Converting image to LaTeX..."):
-        latex_code = image_to_latex("temp_image.png", model="nougat")
+        latex_code = image_to_latex(image, model="nougat")
+
+    stats = latex_models.metrics()["nougat"]
+    st.caption(
+        f"Inference {stats['last_inference_seconds']:.2f}s · "
+        f"model loaded {stats['loads']}x (last load {stats['last_load_seconds']:.2f}s)"
+    )
 
     st.subheader("Generated LaTeX Code")
     st.code(latex_code, language="latex")
@@ -0,0 +1,199 @@
+import time
+from datetime import datetime
+
+import streamlit as st
+from tools.client_pool import get_client_pool
+from tools.hedging import provider_breakers
+from tools.metrics import (
+    llm_metrics,
+    percentiles_over_time,
+    quantile,
+    summarize,
+    to_json,
+    to_prometheus,
+)
+from tools.scheduler import llm_scheduler
+
+WINDOWS = {
+    "Last 15 minutes": 15 * 60,
+    "Last hour": 3600,
+    "Last 6 hours": 6 * 3600,
+    "Everything buffered": None,
+}
+CHART_FIELDS = {
+    "Time to first token (s)": "ttft",
+    "Total duration (s)": "duration",
+    "Characters per second": "chars_per_sec",
+}
+
+
+def format_seconds(value):
+    return "–" if value is None else f"{value:.2f}s"
+
+
+def summary_rows(records):
+    rows = []
+    for row in summarize(records):
+        rows.append(
+            {
+                "Page": row["page"],
+                "Model": row["model"],
+                "Calls": row["calls"],
+                "Cached": row["cached"],
+                "Shared": row["shared"],
+                "Errors": sum(row["errors"].values()),
+                "Retries": row["retries"],
+                "TTFT p50": row["ttft"]["p50"],
+                "TTFT p95": row["ttft"]["p95"],
+                "TTFT p99": row["ttft"]["p99"],
+                "Duration p50": row["duration"]["p50"],
+                "Duration p95": row["duration"]["p95"],
+                "Chars/s p50": row["chars_per_sec"]["p50"],
+                "Error classes": ", ".join(
+                    f"{name} ({count})" for name, count in row["errors"].items()
+                ),
+            }
+        )
+    return rows
+
+
+def metrics_dashboard():
+    st.title("📈 LLM Metrics")
+    st.write(
+        "✨ Latency, throughput and errors of every LLM call made by this server, "
+        "across all sessions. ✨"
+    )
+
+    col1, col2, col3 = st.columns([2, 2, 1])
+    with col1:
+        window = st.selectbox("🕒 Window", list(WINDOWS))
+    with col2:
+        bucket_seconds = st.select_slider(
+            "📊 Chart resolution",
+            options=[10, 30, 60, 300, 900],
+            value=60,
+            format_func=lambda s: f"{s}s" if s < 60 else f"{s // 60} min",
+        )
+    with col3:
+        st.write("")
+        st.button("🔄 Refresh", use_container_width=True)
+
+    since = time.time() - WINDOWS[window] if WINDOWS[window] else None
+    records = llm_metrics.snapshot(since)
+    if not records:
+        st.info("No LLM calls recorded yet. Use any of the tools and come back here.")
+        return
+
+    pages = sorted({r.page for r in records})
+    models = sorted({r.model for r in records})
+    col1, col2 = st.columns(2)
+    with col1:
+        selected_pages = st.multiselect("📄 Pages", pages, default=pages)
+    with col2:
+        selected_models = st.multiselect("🤖 Models", models, default=models)
+    records = [
+        r for r in records if r.page in selected_pages and r.model in selected_models
+    ]
+    if not records:
+        st.warning("No calls match the selected pages and models.")
+        return
+
+    upstream = [r for r in records if not r.cached and not r.shared]
+    errors = [r for r in upstream if r.error is not None]
+    ttfts = sorted(r.ttft for r in upstream if r.error is None and r.ttft is not None)
+    ttft_p95 = quantile(ttfts, 0.95) if ttfts else None
+
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Calls", len(records))
+    col2.metric(
+        "Cache/shared hits", f"{(len(records) - len(upstream)) / len(records):.0%}"
+    )
+    error_rate = f"{len(errors) / len(upstream):.1%}" if upstream else "–"
+    col3.metric("Error rate", error_rate)
+    col4.metric("TTFT p95", format_seconds(ttft_p95))
+
+    st.subheader("⏱️ Percentiles over time")
+    label = st.radio("Metric", list(CHART_FIELDS), horizontal=True)
+    series = percentiles_over_time(records, CHART_FIELDS[label], bucket_seconds)
+    if series["time"]:
+        series["time"] = [datetime.fromtimestamp(t) for t in series["time"]]
+        st.line_chart(series, x="time", y=["p50", "p95", "p99"])
+    else:
+        st.caption("No successful upstream calls in this window.")
+
+    st.subheader("📋 By page and model")
+    st.dataframe(summary_rows(records), hide_index=True, use_container_width=True)
+
+    st.subheader("🔌 Circuit breakers")
+    breakers = provider_breakers.stats()
+    if breakers:
+        st.dataframe(
+            [{"Route": name, **stats} for name, stats in breakers.items()],
+            hide_index=True,
+            use_container_width=True,
+        )
+    else:
+        st.caption("No routes have been called yet.")
+
+    st.subheader("🚦 Admission control")
+    admission = llm_scheduler.stats()
+    if admission["enabled"]:
+        st.dataframe(
+            [
+                {
+                    "Priority": row["priority"],
+                    "Queued": row["queued"],
+                    "Oldest wait": format_seconds(row["oldest_wait"] or None),
+                    "Admitted": row["admitted"],
+                    "Wait p50": format_seconds(row["wait_p50"]),
+                    "Wait p95": format_seconds(row["wait_p95"]),
+                }
+                for row in admission["priorities"]
+            ],
+            hide_index=True,
+            use_container_width=True,
+        )
+        st.caption(
+            f"{llm_scheduler.rate_per_minute:g} requests/min per provider, bursts of "
+            f"{llm_scheduler.burst:g}. Tokens left: "
+            + (", ".join(f"{k}: {v:g}" for k, v in admission["tokens"].items()) or "–")
+        )
+    else:
+        st.caption("Admission control is disabled.")
+
+    st.subheader("🔗 Connection pool")
+    pool = get_client_pool()
+    pool_stats = pool.stats()
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Requests", pool_stats["leases"])
+    col2.metric("Waited for a slot", pool_stats["waits"])
+    col3.metric("In flight", sum(pool_stats["in_flight"].values()))
+    st.caption(
+        f"At most {pool.max_per_provider} concurrent requests per provider. "
+        + ", ".join(f"{k}: {v}" for k, v in pool_stats["in_flight"].items())
+    )
+
+    st.subheader("📤 Export")
+    col1, col2 = st.columns(2)
+    with col1:
+        st.download_button(
+            "Prometheus text",
+            to_prometheus(records),
+            file_name="llm_metrics.prom",
+            mime="text/plain",
+            use_container_width=True,
+        )
+    with col2:
+        st.download_button(
+            "JSON",
+            to_json(records),
+            file_name="llm_metrics.json",
+            mime="application/json",
+            use_container_width=True,
+        )
+    with st.expander("Prometheus exposition"):
+        st.code(to_prometheus(records), language=None)
+
+
+if __name__ == "__main__":
+    metrics_dashboard()
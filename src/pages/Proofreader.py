@@ -1,10 +1,51 @@
 import streamlit as st
 from redlines import Redlines
 from tools.llm_utils import LLMClient
+from tools.proofread import SYSTEM_PROMPT, USER_PROMPT, proofread_chunks, split_document
+from tools.text_utils import estimate_tokens
 
 # Initialize the LLM client
 llm_client = LLMClient()
 
+# Inputs above this size default to long-document mode
+LONG_DOCUMENT_TOKENS = 1500
+
+
+def show_diff(original, corrected):
+    diff = Redlines(original, corrected)
+    st.markdown(diff.output_markdown, unsafe_allow_html=True)
+
+
+def proofread_long_document(input_text):
+    st.markdown("### ✨ Corrected Text:")
+    corrected_area = st.container()
+    total = len(split_document(input_text))
+    progress = st.progress(0.0, text=f"Proofreading {total} chunks...")
+    with st.expander("## 🔍 See Changes Highlighted"):
+        diff_area = st.container()
+
+    corrected_chunks, cached = [], 0
+    for chunk in proofread_chunks(input_text, llm_client, max_concurrency=4):
+        corrected_chunks.append(chunk.corrected)
+        cached += chunk.cached
+        with corrected_area:
+            if chunk.error:
+                st.error(
+                    f"Chunk {chunk.index + 1} could not be proofread: {chunk.error}"
+                )
+            st.markdown(chunk.corrected)
+        with diff_area:
+            show_diff(chunk.original, chunk.corrected)
+        progress.progress(
+            len(corrected_chunks) / total,
+            text=f"Proofread {len(corrected_chunks)} of {total} chunks...",
+        )
+
+    progress.empty()
+    st.caption(
+        f"♻️ {cached} of {len(corrected_chunks)} chunks were unchanged since an earlier run"
+    )
+
 
 def proofreader():
     st.title("📝 Proofreader & Editor")
@@ -18,28 +59,37 @@ def proofreader():
             height=200,
             placeholder="Type or paste your text here...",
         )
+        long_document = st.checkbox(
+            "📚 Long-document mode",
+            help="Proofread paragraphs in parallel chunks and skip chunks corrected in an earlier run. "
+            f"Used automatically for texts over ~{LONG_DOCUMENT_TOKENS} tokens.",
+        )
         if st.form_submit_button("Proofread & Correct"):
             if not input_text.strip():
                 st.warning("Please enter some text to proofread.")
                 return
 
+            if long_document or estimate_tokens(input_text) > LONG_DOCUMENT_TOKENS:
+                proofread_long_document(input_text)
+                return
+
             with st.spinner("Proofreading and correcting..."):
-                system_prompt = "I want to improve my English. I want you act as a proofreader. I will provide you texts and I would like you to review them for any spelling, grammar, or punctuation errors. Just correct the mistakes in my text by changing them to the corrected one."
-                user_prompt = f"This is the input text in the triple backticks: ```{input_text}``` \n Only give me the corrected version of the input text in the triple backticks."
+                user_prompt = USER_PROMPT.format(text=input_text)
 
                 # Stream the corrected text
                 st.markdown("### ✨ Corrected Text:")
                 corrected_text = st.write_stream(
-                    llm_client.stream_content(
-                        llm_client.generate_text(system_prompt, user_prompt, stream=True)
+                    llm_client.stream_coalesced(
+                        llm_client.generate_text(
+                            SYSTEM_PROMPT, user_prompt, stream=True
+                        )
                     )
                 )
                 corrected_text = llm_client.remove_triple_backticks(corrected_text)
 
                 # Generate and display the diff
                 with st.expander("## 🔍 See Changes Highlighted"):
-                    diff = Redlines(input_text, corrected_text)
-                    st.markdown(diff.output_markdown, unsafe_allow_html=True)
+                    show_diff(input_text, corrected_text)
 
 
 if __name__ == "__main__":
@@ -1,55 +1,58 @@
-import docx2txt
-import pypdfium2
+import asyncio
+import functools
+
 import streamlit as st
 from redlines import Redlines
-from langchain.prompts import ChatPromptTemplate
-from langchain.output_parsers import StructuredOutputParser, ResponseSchema
-from tenacity import retry, stop_after_attempt, wait_exponential
-from tools.llm_utils import generate_text, json_output, stream_content
+from tools.doc_utils import extract_document_text, extract_documents
+from tools.json_stream import StreamingJSONParser
+from tools.llm_utils import AsyncLLMClient, LLMClient, json_output
+from tools.resume_ranking import rank_resumes
+from tools.scheduler import PRIORITY_BATCH, request_context
+from tools.stream_coalesce import acoalesce_deltas
 
 # Define schemas for structured output
 job_info_schema = [
-    ResponseSchema(
-        name="company_name", description="The name of the company or 'unknown'"
-    ),
-    ResponseSchema(name="job_title", description="The job title or 'unknown'"),
-    ResponseSchema(name="job_location", description="The job location or 'unknown'"),
+    ("company_name", "The name of the company or 'unknown'"),
+    ("job_title", "The job title or 'unknown'"),
+    ("job_location", "The job location or 'unknown'"),
 ]
 
 match_schema = [
-    ResponseSchema(name="match_score", description="Match percentage (e.g., '85%')"),
-    ResponseSchema(name="revised_summary", description="Revised professional summary"),
-    ResponseSchema(
-        name="resume_phrases_to_adjust",
-        description="Dictionary of original vs improved phrases",
-    ),
-    ResponseSchema(name="skills_to_add", description="List of skills to add"),
-    ResponseSchema(name="skills_to_remove", description="List of skills to remove"),
+    ("match_score", "Match percentage (e.g., '85%')"),
+    ("revised_summary", "Revised professional summary"),
+    ("resume_phrases_to_adjust", "Dictionary of original vs improved phrases"),
+    ("skills_to_add", "List of skills to add"),
+    ("skills_to_remove", "List of skills to remove"),
 ]
 
-job_info_parser = StructuredOutputParser.from_response_schemas(job_info_schema)
-match_parser = StructuredOutputParser.from_response_schemas(match_schema)
 
+# langchain is slow to import, so it is only loaded once a prompt is built
+@functools.lru_cache(maxsize=None)
+def format_instructions(schema_name):
+    from langchain.output_parsers import StructuredOutputParser, ResponseSchema
 
-# Text extraction functions (unchanged)
-def extract_text_from_pdf(pdf_file):
-    text = ""
-    pdf = pypdfium2.PdfDocument(pdf_file)
-    for i in range(len(pdf)):
-        page = pdf[i]
-        text += page.get_textpage().get_text_range() + "\n"
-    return text
+    schema = {"job_info": job_info_schema, "match": match_schema}[schema_name]
+    parser = StructuredOutputParser.from_response_schemas(
+        [ResponseSchema(name=name, description=desc) for name, desc in schema]
+    )
+    return parser.get_format_instructions()
 
 
-def extract_text_from_docx(docx_file):
-    return docx2txt.process(docx_file)
+def format_prompt(template, **kwargs):
+    from langchain.prompts import ChatPromptTemplate
+
+    return ChatPromptTemplate.from_template(template).format(**kwargs)
+
+
+# All selected tasks run concurrently through a shared async client; slow or
+# failing upstream calls are hedged and failed over inside LLMClient
+async_client = AsyncLLMClient(LLMClient(), max_concurrency=4)
 
 
 # Job info extraction
-@retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=4, max=10))
-def extract_job_info(job_description):
+async def extract_job_info(job_description):
     """Extract structured job info using g4f."""
-    prompt_template = ChatPromptTemplate.from_template(
+    prompt = format_prompt(
         """
         Extract the following information from the job description:
         1. company_name: The name of the company. Return "unknown" if not found.
@@ -60,13 +63,11 @@ def extract_job_info(job_description):
         {job_description}
 
         {format_instructions}
-        """
-    )
-    prompt = prompt_template.format(
+        """,
         job_description=job_description,
-        format_instructions=job_info_parser.get_format_instructions(),
+        format_instructions=format_instructions("job_info"),
     )
-    response = generate_text(prompt)
+    response = await async_client.agenerate_text(prompt)
     default = {
         "company_name": "unknown",
         "job_title": "unknown",
@@ -76,10 +77,8 @@ def extract_job_info(job_description):
 
 
 # Resume matching
-@retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=4, max=10))
-def match_resume_to_job(resume_text, job_description):
-    """Match resume to job description with structured output."""
-    prompt_template = ChatPromptTemplate.from_template(
+def match_prompt(resume_text, job_description):
+    return format_prompt(
         """
         Analyze the following resume and job description. Provide:
         1. match_score (0-100%) based on keyword alignment, experience, and skills.
@@ -95,20 +94,29 @@ def match_resume_to_job(resume_text, job_description):
         {job_description}
 
         {format_instructions}
-        """
-    )
-    prompt = prompt_template.format(
+        """,
         resume_text=resume_text,
         job_description=job_description,
-        format_instructions=match_parser.get_format_instructions(),
+        format_instructions=format_instructions("match"),
+    )
+
+
+async def match_resume_to_job(resume_text, job_description):
+    """Match resume to job description with structured output."""
+    response = await async_client.agenerate_text(
+        match_prompt(resume_text, job_description)
     )
-    response = generate_text(prompt)
     return json_output(response)
 
 
+def stream_match_resume_to_job(resume_text, job_description):
+    """Stream the raw match response so its fields can be parsed as they arrive."""
+    return async_client.astream_text(match_prompt(resume_text, job_description))
+
+
 # Cover letter generation
 def generate_cover_letter(resume_text, job_description):
-    prompt_template = ChatPromptTemplate.from_template(
+    prompt = format_prompt(
         """
         Generate a cover letter based on the resume and job description.
 
@@ -116,17 +124,16 @@ def generate_cover_letter(resume_text, job_description):
         {resume_text}
         Job Description:
         {job_description}
-        """
-    )
-    prompt = prompt_template.format(
-        resume_text=resume_text, job_description=job_description
+        """,
+        resume_text=resume_text,
+        job_description=job_description,
     )
-    return generate_text(prompt, stream=True)
+    return async_client.astream_text(prompt)
 
 
 # Interview questions generation
 def generate_interview_questions(resume_text, job_description):
-    prompt_template = ChatPromptTemplate.from_template(
+    prompt = format_prompt(
         """
         Generate several interview questions and answers based on the resume and job description.
 
@@ -134,41 +141,294 @@ def generate_interview_questions(resume_text, job_description):
         {resume_text}
         Job Description:
         {job_description}
-        """
-    )
-    prompt = prompt_template.format(
-        resume_text=resume_text, job_description=job_description
+        """,
+        resume_text=resume_text,
+        job_description=job_description,
     )
-    return generate_text(prompt, stream=True)
+    return async_client.astream_text(prompt)
 
 
-# UI display function (unchanged)
-def show_match_result(match_result):
-    st.subheader("🔍 Match Analysis 📊")
-    if match_result["match_score"] >= "80%":
-        st.success(f"🌟 Match Score: {match_result['match_score']} 🎉")
-    elif match_result["match_score"] >= "60%":
-        st.warning(f"⚠️ Match Score: {match_result['match_score']} 🔄")
+# UI display functions
+def show_match_score(match_score):
+    if match_score >= "80%":
+        st.success(f"🌟 Match Score: {match_score} 🎉")
+    elif match_score >= "60%":
+        st.warning(f"⚠️ Match Score: {match_score} 🔄")
     else:
-        st.error(f"❌ Match Score: {match_result['match_score']} 💔")
+        st.error(f"❌ Match Score: {match_score} 💔")
+
 
+def show_revised_summary(revised_summary):
     st.markdown("### ✏️ Revised Professional Summary")
-    st.code(f"{match_result['revised_summary']}", language=None, wrap_lines=True)
+    st.code(f"{revised_summary}", language=None, wrap_lines=True)
+
 
+def show_phrases_to_adjust(phrases):
     st.markdown("### 🔄 Phrases to Improve")
-    for orig, improved in match_result["resume_phrases_to_adjust"].items():
+    for orig, improved in phrases.items():
         diff = Redlines(orig, improved)
         st.markdown(diff.output_markdown, unsafe_allow_html=True)
 
-    cols = st.columns(2)
-    with cols[0]:
-        st.markdown("### 🌱 Skills to Add")
-        for skill in match_result["skills_to_add"]:
-            st.markdown(f"- ✅ :green[{skill}]")
-    with cols[1]:
-        st.markdown("### 🗑️ Skills to Remove")
-        for skill in match_result["skills_to_remove"]:
-            st.markdown(f"- ❌ :red[{skill}]")
+
+def show_skills_to_add(skills):
+    st.markdown("### 🌱 Skills to Add")
+    for skill in skills:
+        st.markdown(f"- ✅ :green[{skill}]")
+
+
+def show_skills_to_remove(skills):
+    st.markdown("### 🗑️ Skills to Remove")
+    for skill in skills:
+        st.markdown(f"- ❌ :red[{skill}]")
+
+
+MATCH_FIELD_RENDERERS = {
+    "match_score": show_match_score,
+    "revised_summary": show_revised_summary,
+    "resume_phrases_to_adjust": show_phrases_to_adjust,
+    "skills_to_add": show_skills_to_add,
+    "skills_to_remove": show_skills_to_remove,
+}
+
+
+def match_field_slots(container):
+    """One slot per match field, laid out like show_match_result."""
+    slots = {
+        "match_score": container.container(),
+        "revised_summary": container.container(),
+        "resume_phrases_to_adjust": container.container(),
+    }
+    cols = container.columns(2)
+    slots["skills_to_add"] = cols[0].container()
+    slots["skills_to_remove"] = cols[1].container()
+    return slots
+
+
+def show_match_result(match_result):
+    st.subheader("🔍 Match Analysis 📊")
+    slots = match_field_slots(st.container())
+    for field, render in MATCH_FIELD_RENDERERS.items():
+        with slots[field]:
+            render(match_result[field])
+
+
+async def stream_to(container, stream):
+    """Render an async text stream into a container as it arrives."""
+    placeholder = container.empty()
+    text = ""
+    async for delta in acoalesce_deltas(stream):
+        text += delta
+        placeholder.markdown(text)
+    return text
+
+
+def job_info_suffix(job_info):
+    return (
+        f"{job_info['company_name']}-{job_info['job_title']}-{job_info['job_location']}"
+    )
+
+
+# Section renderers. Each one only draws into its own container, and never across
+# an await inside a `with` block, so concurrently running sections do not interleave.
+async def render_job_info(container, job_info_task):
+    status = container.empty()
+    status.caption("⏳ Preparing job description...")
+    st.session_state.job_info = await job_info_task
+    status.empty()
+    with container:
+        st.write("### 💼 Job Details")
+        st.write(f":briefcase: **Job Title:** {st.session_state.job_info['job_title']}")
+        st.write(f":office: **Company:** {st.session_state.job_info['company_name']}")
+        st.write(
+            f":round_pushpin: **Location:** {st.session_state.job_info['job_location']}"
+        )
+
+
+async def render_match(container, job_info_task, resume_text, job_description):
+    status = container.empty()
+    status.caption("⏳ Evaluating resume...")
+    slots = None
+    parser = StreamingJSONParser(max_depth=1)
+    # Render each field of the analysis as soon as the model has finished writing it
+    async for delta in stream_match_resume_to_job(resume_text, job_description):
+        for event in parser.feed(delta):
+            field = event.path[0] if len(event.path) == 1 else None
+            if field not in MATCH_FIELD_RENDERERS:
+                continue
+            if slots is None:
+                status.subheader("🔍 Match Analysis 📊")
+                slots = match_field_slots(container)
+            with slots[field]:
+                render = MATCH_FIELD_RENDERERS[field]
+                render(event.value)
+
+    if slots is not None:
+        st.session_state.result = parser.result
+    else:
+        # Nothing parseable arrived; retry with the lenient full-response parser
+        st.session_state.result = await match_resume_to_job(
+            resume_text, job_description
+        )
+        status.empty()
+        with container:
+            if st.session_state.result:
+                show_match_result(st.session_state.result)
+            else:
+                st.info("Failed to analyze match. Please check inputs and try again.")
+
+    job_info = await job_info_task
+    container.download_button(
+        label="Applied -> [Download Job Description]",
+        data=job_description,
+        file_name=f"job_description-{job_info_suffix(job_info)}.txt",
+        mime="text/plain",
+        on_click="ignore",
+    )
+
+
+async def render_cover_letter(container, job_info_task, resume_text, job_description):
+    container.write("#### Generated Cover Letter:")
+    cover_letter = await stream_to(
+        container, generate_cover_letter(resume_text, job_description)
+    )
+    if isinstance(cover_letter, str) and cover_letter.startswith("Error:"):
+        container.error(cover_letter)
+    else:
+        st.session_state.cover_letter = cover_letter
+        job_info = await job_info_task
+        container.download_button(
+            label="Download Cover Letter",
+            data=st.session_state.cover_letter,
+            file_name=f"cover_letter-{job_info_suffix(job_info)}.txt",
+            mime="text/plain",
+            on_click="ignore",
+        )
+
+
+async def render_interview(container, resume_text, job_description):
+    container.write("#### Generated Interview Questions:")
+    interview_questions = await stream_to(
+        container, generate_interview_questions(resume_text, job_description)
+    )
+    if isinstance(interview_questions, str) and interview_questions.startswith(
+        "Error:"
+    ):
+        container.error(interview_questions)
+    else:
+        st.session_state.interview_questions = interview_questions
+        container.download_button(
+            label="Download Interview Questions",
+            data=st.session_state.interview_questions,
+            file_name="interview_questions.txt",
+            mime="text/plain",
+            on_click="ignore",
+        )
+
+
+async def run_selected_options(run_match, run_cover_letter, run_interview):
+    """Start every selected task at once; each section renders when its result arrives."""
+    resume_text = st.session_state.resume_text
+    job_description = st.session_state.job_description
+
+    # Containers are created up front so sections keep their order on the page
+    job_container = st.container()
+    job_info_task = asyncio.ensure_future(extract_job_info(job_description))
+    tasks = [render_job_info(job_container, job_info_task)]
+    if run_match:
+        tasks.append(
+            render_match(st.container(), job_info_task, resume_text, job_description)
+        )
+    if run_cover_letter:
+        tasks.append(
+            render_cover_letter(
+                st.container(), job_info_task, resume_text, job_description
+            )
+        )
+    if run_interview:
+        tasks.append(render_interview(st.container(), resume_text, job_description))
+    await asyncio.gather(*tasks)
+
+
+def parse_match_score(match_score):
+    try:
+        return float(str(match_score).strip().rstrip("%"))
+    except ValueError:
+        return None
+
+
+async def analyze_top_resumes(candidates, job_description):
+    """Run the full LLM match only for the shortlisted resumes, concurrently."""
+    return await asyncio.gather(
+        *(match_resume_to_job(c.text, job_description) for c in candidates),
+        return_exceptions=True,
+    )
+
+
+def ranking_rows(ranked, analyses):
+    rows = []
+    for rank, candidate in enumerate(ranked, start=1):
+        analysis = analyses.get(id(candidate))
+        rows.append(
+            {
+                "Rank": rank,
+                "Resume": candidate.name,
+                "Local score": round(candidate.score * 100, 1),
+                "TF-IDF similarity": round(candidate.similarity, 3),
+                "Keyword coverage": f"{len(candidate.matched)}/{len(candidate.matched) + len(candidate.missing)}",
+                "LLM match": (
+                    parse_match_score(analysis.get("match_score"))
+                    if isinstance(analysis, dict)
+                    else None
+                ),
+                "Missing keywords": ", ".join(candidate.missing[:8]),
+            }
+        )
+    return rows
+
+
+def run_bulk_ranking(uploaded_files, job_description, top_k):
+    with st.spinner(f"📄 Extracting {len(uploaded_files)} resumes..."):
+        documents = extract_documents([(f.name, f.getvalue()) for f in uploaded_files])
+    for document in documents:
+        if document.error:
+            st.warning(f"Skipped {document.name}: {document.error}")
+
+    ranked = rank_resumes(
+        job_description, [(d.name, d.text) for d in documents if not d.error]
+    )
+    if not ranked:
+        st.warning("None of the uploaded resumes could be read.")
+        return
+
+    shortlist = ranked[:top_k]
+    with st.spinner(f"🔍 Analyzing the top {len(shortlist)} resumes..."):
+        with request_context(priority=PRIORITY_BATCH):
+            results = asyncio.run(analyze_top_resumes(shortlist, job_description))
+    analyses = {id(c): r for c, r in zip(shortlist, results)}
+
+    st.subheader("🏆 Ranking")
+    st.caption(
+        f"All {len(ranked)} resumes were scored locally; only the top {len(shortlist)} were sent to the LLM."
+    )
+    st.dataframe(
+        ranking_rows(ranked, analyses),
+        hide_index=True,
+        use_container_width=True,
+        column_config={
+            "Local score": st.column_config.ProgressColumn(
+                format="%.0f", min_value=0, max_value=100
+            ),
+            "LLM match": st.column_config.NumberColumn(format="%.0f%%"),
+        },
+    )
+
+    for candidate in shortlist:
+        analysis = analyses[id(candidate)]
+        with st.expander(f"📄 {candidate.name}"):
+            if isinstance(analysis, dict) and analysis:
+                show_match_result(analysis)
+            else:
+                st.info("Failed to analyze match for this resume.")
 
 
 # Streamlit UI
@@ -181,21 +441,49 @@ if "resume_text" not in st.session_state:
 if "job_description" not in st.session_state:
     st.session_state.job_description = ""
 
+mode = st.radio(
+    "Mode",
+    ["Single resume", "Bulk ranking"],
+    horizontal=True,
+    help="Bulk ranking scores many resumes locally and sends only the best ones to the LLM.",
+)
+bulk_mode = mode == "Bulk ranking"
+
 col1, col2 = st.columns(2)
 with col1:
-    st.header("Upload Resume")
-    uploaded_file = st.file_uploader("Upload PDF or DOCX", type=["pdf", "docx"])
-    if uploaded_file is not None:
-        if uploaded_file.name.endswith(".pdf"):
-            st.session_state.resume_text = extract_text_from_pdf(uploaded_file)
-        elif uploaded_file.name.endswith(".docx"):
-            st.session_state.resume_text = extract_text_from_docx(uploaded_file)
+    if bulk_mode:
+        st.header("Upload Resumes")
+        uploaded_files = st.file_uploader(
+            "Upload PDF or DOCX files", type=["pdf", "docx"], accept_multiple_files=True
+        )
+    else:
+        st.header("Upload Resume")
+        uploaded_file = st.file_uploader("Upload PDF or DOCX", type=["pdf", "docx"])
+        if uploaded_file is not None:
+            # Memoized by file content, so reruns do not re-parse the document
+            st.session_state.resume_text = extract_document_text(
+                uploaded_file.name, uploaded_file.getvalue()
+            )
 
 with col2:
     st.header("Job Description")
     job_desc_input = st.text_area("Paste the job description here:", height=400)
     st.session_state.job_description = job_desc_input
 
+if bulk_mode:
+    top_k = st.slider(
+        "🔝 Resumes to analyze with the LLM",
+        min_value=1,
+        max_value=20,
+        value=5,
+    )
+    if st.button("Rank Resumes", use_container_width=True):
+        if not (uploaded_files and st.session_state.job_description):
+            st.warning("Please provide resumes and a job description.")
+        else:
+            run_bulk_ranking(uploaded_files, st.session_state.job_description, top_k)
+    st.stop()
+
 st.subheader("🚀 Generation Options")
 col1, col2, col3 = st.columns(3)
 with col1:
@@ -218,79 +506,4 @@ if st.button("Run Selected Options", use_container_width=True):
     elif not (st.session_state.resume_text and st.session_state.job_description):
         st.warning("Please provide both resume and job description.")
     else:
-        with st.spinner("Preparing job description..."):
-            st.session_state.job_info = extract_job_info(
-                st.session_state.job_description
-            )
-        st.write("### 💼 Job Details")
-        st.write(f":briefcase: **Job Title:** {st.session_state.job_info['job_title']}")
-        st.write(f":office: **Company:** {st.session_state.job_info['company_name']}")
-        st.write(
-            f":round_pushpin: **Location:** {st.session_state.job_info['job_location']}"
-        )
-
-        if run_match:
-            with st.spinner("Evaluating resume..."):
-                st.session_state.result = match_resume_to_job(
-                    st.session_state.resume_text, st.session_state.job_description
-                )
-            if st.session_state.result:
-                show_match_result(st.session_state.result)
-            else:
-                st.info("Failed to analyze match. Please check inputs and try again.")
-
-            st.download_button(
-                label="Applied -> [Download Job Description]",
-                data=st.session_state.job_description,
-                file_name=f"job_description-{st.session_state.job_info['company_name']}-{st.session_state.job_info['job_title']}-{st.session_state.job_info['job_location']}.txt",
-                mime="text/plain",
-                on_click="ignore",
-            )
-
-        if run_cover_letter:
-            st.write("#### Generated Cover Letter:")
-            with st.spinner("Generating Cover letter..."):
-                cover_letter = st.write_stream(
-                    stream_content(
-                        generate_cover_letter(
-                            st.session_state.resume_text,
-                            st.session_state.job_description,
-                        )
-                    )
-                )
-                if isinstance(cover_letter, str) and cover_letter.startswith("Error:"):
-                    st.error(cover_letter)
-                else:
-                    st.session_state.cover_letter = cover_letter
-                    st.download_button(
-                        label="Download Cover Letter",
-                        data=st.session_state.cover_letter,
-                        file_name=f"cover_letter-{st.session_state.job_info['company_name']}-{st.session_state.job_info['job_title']}-{st.session_state.job_info['job_location']}.txt",
-                        mime="text/plain",
-                        on_click="ignore",
-                    )
-
-        if run_interview:
-            st.write("#### Generated Interview Questions:")
-            with st.spinner("Generating Interview Questions..."):
-                interview_questions = st.write_stream(
-                    stream_content(
-                        generate_interview_questions(
-                            st.session_state.resume_text,
-                            st.session_state.job_description,
-                        )
-                    )
-                )
-                if isinstance(
-                    interview_questions, str
-                ) and interview_questions.startswith("Error:"):
-                    st.error(interview_questions)
-                else:
-                    st.session_state.interview_questions = interview_questions
-                    st.download_button(
-                        label="Download Interview Questions",
-                        data=st.session_state.interview_questions,
-                        file_name="interview_questions.txt",
-                        mime="text/plain",
-                        on_click="ignore",
-                    )
+        asyncio.run(run_selected_options(run_match, run_cover_letter, run_interview))
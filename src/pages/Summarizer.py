@@ -1,5 +1,9 @@
 import streamlit as st
-from tools.llm_utils import generate_text, stream_content
+from tools.llm_utils import LLMClient, stream_coalesced
+from tools.summarize import MapReduceSummarizer
+
+# Long inputs are chunked, summarized in parallel and reduced before streaming
+summary_engine = MapReduceSummarizer(LLMClient())
 
 
 def summarizer():
@@ -10,17 +14,20 @@ def summarizer():
 
     with st.form("summary_form"):
         input_text = st.text_area("✍️ Paste text to summarize:", height=250)
+        length = st.select_slider(
+            "📏 Summary length:",
+            options=["short", "medium", "detailed"],
+            value="medium",
+        )
         submitted = st.form_submit_button("🚀 Generate Summary")
 
         if submitted:
             if input_text:
                 with st.spinner("🔄 Summarizing..."):
-                    system_prompt = "You are a helpful assistant that creates concise summaries of text."
-                    user_prompt = f"Summarize the following text:\n\n{input_text}"
-                    summary = generate_text(system_prompt, user_prompt, stream=True)
+                    summary = summary_engine.summarize(input_text, length=length)
 
                     st.subheader("✨ Summary:")
-                    st.write_stream(stream_content(summary))
+                    st.write_stream(stream_coalesced(summary))
             else:
                 st.warning("⚠️ Please paste some text to summarize. ⚠️")
 
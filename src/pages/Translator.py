@@ -1,8 +1,56 @@
 import streamlit as st
 from tools.llm_utils import LLMClient
+from tools.translation_memory import get_translation_memory
 
 # Initialize the LLM client
 llm_client = LLMClient()
+translation_memory = get_translation_memory(llm_client)
+
+LANGUAGES = [
+    "Persian",
+    "English",
+    "Spanish",
+    "French",
+    "German",
+    "Chinese",
+    "Japanese",
+    "Hindi",
+    "Arabic",
+    "Russian",
+    "Portuguese",
+]
+RTL_LANGUAGES = ("Persian", "Arabic")
+
+
+def translation_prompts(text_to_translate, target_language):
+    system_prompt = f"You are a professional translator. Translate the following text to {target_language}\
+        just give me the translation in language {target_language} without any explanation."
+    user_prompt = f"This is the text:```{text_to_translate}```\n Just translate the text I gave you in triple backticks to {target_language} language"
+    return system_prompt, user_prompt
+
+
+def show_rtl(text):
+    # Apply right-to-left direction for Persian and Arabic
+    st.markdown(
+        f'<div style="direction: rtl; text-align: right;">{text}</div>',
+        unsafe_allow_html=True,
+    )
+
+
+def show_translation(language, text):
+    if language in RTL_LANGUAGES:
+        show_rtl(text)
+    else:
+        st.write(text)
+
+
+def show_memory_result(language, result):
+    if result.error:
+        st.error(result.error)
+    show_translation(language, result.text)
+    st.caption(
+        f"♻️ {result.hits} of {result.segments} paragraphs reused from translation memory"
+    )
 
 
 def main():
@@ -14,43 +62,80 @@ def main():
     # Input text area for source text.
     text_to_translate = st.text_area("✍️ Enter text to translate:", height=200)
 
+    translate_all = st.checkbox("🌍 Translate into all languages at once")
+    use_memory = st.checkbox(
+        "♻️ Reuse earlier translations",
+        value=False,
+        help="Only paragraphs that were not translated before are sent to the model. "
+        "The translation is shown once complete instead of streaming.",
+    )
+
     # Select box for target language.
     target_language = st.selectbox(
-        "🌍 Select target language:",
-        [
-            "Persian",
-            "English",
-            "Spanish",
-            "French",
-            "German",
-            "Chinese",
-            "Japanese",
-            "Hindi",
-            "Arabic",
-            "Russian",
-            "Portuguese",
-        ],
+        "🌍 Select target language:", LANGUAGES, disabled=translate_all
     )
 
     if st.button("🚀 Translate"):
         if text_to_translate:
+            if translate_all and use_memory:
+                with st.spinner(f"🔄 Translating into {len(LANGUAGES)} languages..."):
+                    results = translation_memory.translate_many(
+                        text_to_translate, LANGUAGES, max_concurrency=6
+                    )
+
+                st.subheader("✨ Translations:")
+                for tab, language, result in zip(
+                    st.tabs(LANGUAGES), LANGUAGES, results
+                ):
+                    with tab:
+                        show_memory_result(language, result)
+                return
+
+            if translate_all:
+                with st.spinner(f"🔄 Translating into {len(LANGUAGES)} languages..."):
+                    results = llm_client.generate_batch(
+                        [
+                            translation_prompts(text_to_translate, language)
+                            for language in LANGUAGES
+                        ],
+                        max_concurrency=6,
+                    )
+
+                st.subheader("✨ Translations:")
+                for tab, language, result in zip(
+                    st.tabs(LANGUAGES), LANGUAGES, results
+                ):
+                    with tab:
+                        if not result.ok:
+                            st.error(result.error)
+                        else:
+                            show_translation(language, result.text)
+                return
+
+            if use_memory:
+                with st.spinner("🔄 Translating..."):
+                    result = translation_memory.translate(
+                        text_to_translate, target_language
+                    )
+                st.subheader("✨ Translation:")
+                show_memory_result(target_language, result)
+                return
+
             with st.spinner("🔄 Translating..."):
-                system_prompt = f"You are a professional translator. Translate the following text to {target_language}\
-                    just give me the translation in language {target_language} without any explanation."
-                user_prompt = f"This is the text:```{text_to_translate}```\n Just translate the text I gave you in triple backticks to {target_language} language"
-                translation = llm_client.generate_text(system_prompt, user_prompt, stream=True)
+                system_prompt, user_prompt = translation_prompts(
+                    text_to_translate, target_language
+                )
+                translation = llm_client.generate_text(
+                    system_prompt, user_prompt, stream=True
+                )
 
                 st.subheader("✨ Translation:")
 
-                if target_language == "Persian" or target_language == "Arabic":
-                    # Apply right-to-left direction for Persian and Arabic
-                    st.markdown(
-                        f'<div style="direction: rtl; text-align: right;">{ "".join(llm_client.stream_content(translation))}</div>',
-                        unsafe_allow_html=True,
-                    )
+                if target_language in RTL_LANGUAGES:
+                    show_rtl("".join(llm_client.stream_content(translation)))
                 else:
                     # Default left-to-right direction
-                    st.write_stream(llm_client.stream_content(translation))
+                    st.write_stream(llm_client.stream_coalesced(translation))
 
         else:
             st.warning("⚠️ Please enter some text to translate. ⚠️")
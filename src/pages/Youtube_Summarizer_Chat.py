@@ -2,12 +2,18 @@ import streamlit as st
 from youtube_transcript_api import YouTubeTranscriptApi
 from urllib.parse import urlparse, parse_qs
 from tools.llm_utils import LLMClient
+from tools.scheduler import PRIORITY_INTERACTIVE, queue_message, request_context
+from tools.summarize import MapReduceSummarizer
+from tools.transcript_store import get_transcript_store
 
 # Initialize the LLM client
 llm_client = LLMClient()
+summary_engine = MapReduceSummarizer(llm_client)
+transcript_store = get_transcript_store()
 
 # Define the display name of the tool
 TOOL_NAME = "YouTube Video Summarizer & Chat 🎬"
+TRANSCRIPT_LANGUAGE = "en"
 
 
 def extract_video_id(url: str) -> str:
@@ -29,32 +35,37 @@ def extract_video_id(url: str) -> str:
     return None
 
 
-def fetch_transcript(video_id: str) -> str:
-    """Fetches the transcript for the given YouTube video ID."""
+def fetch_transcript(video_id: str, language: str = TRANSCRIPT_LANGUAGE) -> str:
+    """Fetches the transcript for the given YouTube video ID, from the local store if possible."""
     try:
-        transcript_entries = YouTubeTranscriptApi.get_transcript(video_id)
-        transcript = " ".join([entry["text"] for entry in transcript_entries])
-        return transcript
+        transcript = transcript_store.load(video_id, language)
+        if transcript is None:
+            transcript_entries = YouTubeTranscriptApi.get_transcript(
+                video_id, languages=[language]
+            )
+            transcript = transcript_store.save(video_id, language, transcript_entries)
+        return transcript.text
     except Exception as e:
         st.error(f"Error fetching transcript: {str(e)}")
         return None
 
 
-def summarize_transcript(transcript: str) -> str:
-    """Uses the LLM to summarize the provided transcript."""
-    system_prompt = "You are a professional summarizer. Provide a concise summary of the provided text."
-    user_prompt = f"Summarize the following YouTube video transcript into a concise summary:\n\n{transcript}"
+def transcript_message(transcript: str) -> str:
+    return f"<transcript>\n{transcript}\n</transcript>\n\nPlease answer questions based only on the information provided in this transcript."
+
+
+def transcript_range(video_id: str, start_minute: int, end_minute: int) -> str:
+    """Loads only the part of the stored transcript between the given minutes."""
+    transcript = transcript_store.load(
+        video_id, TRANSCRIPT_LANGUAGE, start_minute * 60, end_minute * 60
+    )
+    return transcript.timestamped() if transcript else ""
+
+
+def summarize_transcript(transcript: str):
+    """Uses the LLM to summarize the provided transcript, chunking long videos."""
     try:
-        # Create a streaming response using the client
-        stream = llm_client.client.chat.completions.create(
-            model=llm_client.model,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt},
-            ],
-            stream=True,
-        )
-        return stream
+        return summary_engine.summarize(transcript, kind="YouTube video transcript")
     except Exception as e:
         st.error(f"Error during summarization: {str(e)}")
         return "An error occurred during summarization."
@@ -140,7 +151,7 @@ def run():
                 if not st.session_state.summary:
                     summary_stream = summarize_transcript(transcript)
                     st.session_state.summary = st.write_stream(
-                        llm_client.stream_content(summary_stream)
+                        llm_client.stream_coalesced(summary_stream)
                     )
                 else:
                     st.write(st.session_state.summary)
@@ -155,13 +166,33 @@ def run():
             system_prompt = f"You are a helpful assistant analyzing the following YouTube video transcript:\n\n"
             st.session_state.messages = [
                 {"role": "system", "content": system_prompt},
-                {
-                    "role": "user",
-                    "content": f"<transcript>\n{transcript}\n</transcript>\n\nPlease answer questions based only on the information provided in this transcript.",
-                },
+                {"role": "user", "content": transcript_message(transcript)},
                 {"role": "assistant", "content": "Ask me anything about the video."},
             ]
 
+        # Chat about a part of the video; the range is read from the transcript store
+        duration = transcript_store.duration(
+            st.session_state.current_video_id, TRANSCRIPT_LANGUAGE
+        )
+        total_minutes = int(duration // 60) + 1 if duration else 0
+        if total_minutes > 1:
+            start_minute, end_minute = st.slider(
+                "⏱️ Chat about minutes",
+                min_value=0,
+                max_value=total_minutes,
+                value=(0, total_minutes),
+            )
+            if (start_minute, end_minute) != (0, total_minutes):
+                chat_transcript = transcript_range(
+                    st.session_state.current_video_id, start_minute, end_minute
+                )
+            else:
+                chat_transcript = transcript
+            if len(st.session_state.messages) > 1:
+                st.session_state.messages[1]["content"] = transcript_message(
+                    chat_transcript
+                )
+
         # Display chat history
         for message in st.session_state.messages[4:]:
             if message["role"] != "system":  # Don't display the system message
@@ -182,13 +213,18 @@ def run():
 
             # Generate response
             with st.chat_message("assistant"):
-                with st.spinner("Thinking..."):
-                    stream = llm_client.client.chat.completions.create(
-                        model=llm_client.model,
-                        messages=st.session_state.messages,
-                        stream=True,
+                queue_notice = st.empty()
+                with st.spinner("Thinking..."), request_context(
+                    priority=PRIORITY_INTERACTIVE,
+                    on_wait=lambda position, wait: queue_notice.caption(
+                        queue_message(position, wait)
+                    ),
+                ):
+                    stream = llm_client.chat_completion(
+                        st.session_state.messages, stream=True
                     )
-                    response = st.write_stream(llm_client.stream_content(stream))
+                    queue_notice.empty()
+                    response = st.write_stream(llm_client.stream_coalesced(stream))
 
             # Add assistant message to history
             st.session_state.messages.append({"role": "assistant", "content": response})
@@ -0,0 +1,74 @@
+import numpy as np
+from PIL import Image
+
+DEFAULT_CHARS = " .:-=+*#%@MW&8Q0X$UOZAJKYP6G9V432F5S7I1TLrcvunxzjft/\\|()1{}[]?-_+~<>i!lI;:,\"^`'. "
+SIMPLE_CHARS = " .:-=+*#"
+
+
+def resolve_grayscale_chars(grayscale="default", invert=False):
+    """Map a grayscale preset name (or a custom character ramp) to the ramp to use."""
+    if grayscale == "default":
+        grayscale_chars = DEFAULT_CHARS
+    elif grayscale == "simple":
+        grayscale_chars = SIMPLE_CHARS
+    else:
+        grayscale_chars = grayscale
+
+    if invert:
+        grayscale_chars = grayscale_chars[::-1]
+    return grayscale_chars
+
+
+def build_lookup_table(grayscale_chars, brightness=1.0, contrast=1.0):
+    """
+    Precompute the character for each of the 256 grayscale intensities.
+
+    The per-intensity arithmetic is exactly the scalar formula the original
+    pixel loop used, so the table reproduces its output byte for byte.
+    """
+    num_chars = len(grayscale_chars)
+    pixel_range = 256 / num_chars
+    table = []
+    for pixel_value in range(256):
+        # Apply brightness and contrast adjustments
+        adjusted_pixel = int(
+            min(255, max(0, (pixel_value - 128) * contrast + 128 * brightness))
+        )
+        table.append(grayscale_chars[int(adjusted_pixel / pixel_range)])
+    return np.array(table, dtype="<U1")
+
+
+def image_to_ascii(
+    image,
+    output_width=100,
+    grayscale="default",
+    invert=False,
+    brightness=1.0,
+    contrast=1.0,
+):
+    """
+    Converts a PIL Image object to ASCII art with adjustable detail, brightness, and contrast.
+    """
+    if image is None:
+        return ""
+
+    img = image.convert("L")  # Convert to grayscale
+
+    width, height = img.size
+    aspect_ratio = height / width
+    output_height = int(
+        output_width * aspect_ratio * 0.5
+    )  # Adjust for character aspect ratio
+
+    img = img.resize((output_width, output_height), resample=Image.LANCZOS)
+    pixels = np.asarray(img, dtype=np.uint8).reshape(output_height, output_width)
+
+    table = build_lookup_table(
+        resolve_grayscale_chars(grayscale, invert), brightness, contrast
+    )
+
+    # One extra column holds the newline, then the whole grid is decoded in a single pass
+    grid = np.empty((output_height, output_width + 1), dtype="<U1")
+    grid[:, :output_width] = table[pixels]
+    grid[:, output_width] = "\n"
+    return grid.tobytes().decode("utf-32-le")
@@ -0,0 +1,200 @@
+import io
+import threading
+import zipfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from PIL import Image, ImageOps
+
+REMBG_MODELS = ["u2net", "u2netp", "isnet-general-use", "silueta", "u2net_human_seg"]
+# Lightweight model offered in fast mode
+FAST_MODEL = "u2netp"
+# Longest side, in pixels, of the copy fast mode runs inference on
+DEFAULT_MAX_WORKING_SIZE = 1024
+
+
+class RembgSessionPool:
+    """
+    Process-wide cache of rembg sessions, one per model.
+
+    Creating a session loads the ONNX model from disk, so it is done once and
+    the session is shared by every Streamlit session and worker thread
+    (onnxruntime inference sessions are safe to call concurrently).
+    """
+
+    def __init__(self):
+        self._sessions: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def get(self, model: str = "u2net"):
+        session = self._sessions.get(model)
+        if session is None:
+            with self._lock:
+                session = self._sessions.get(model)
+                if session is None:
+                    from rembg import new_session
+
+                    session = new_session(model)
+                    self._sessions[model] = session
+        return session
+
+    def loaded(self) -> List[str]:
+        return list(self._sessions)
+
+
+rembg_sessions = RembgSessionPool()
+
+
+@dataclass
+class BackgroundResult:
+    index: int
+    name: str
+    image: Optional[Image.Image] = None
+    error: Optional[str] = None
+
+
+def remove_background(
+    image_bytes: bytes,
+    model: str = "u2net",
+    fast: bool = False,
+    max_working_size: int = DEFAULT_MAX_WORKING_SIZE,
+) -> Image.Image:
+    """
+    Remove the background from an encoded image using a pooled rembg session.
+
+    In fast mode the model runs on a copy downscaled to at most
+    ``max_working_size`` pixels on its longest side, and the predicted mask is
+    upsampled and applied to the full-resolution original. rembg resizes its
+    input to the model's small input size anyway, so the mask loses little
+    detail, while resizing, cutting out and PNG round-tripping the full-size
+    photo, which dominate time and memory on large uploads, are skipped.
+
+    Args:
+        image_bytes (bytes): The encoded input image.
+        model (str): The rembg model name. Defaults to "u2net".
+        fast (bool): Whether to infer on a downscaled copy. Defaults to False.
+        max_working_size (int): Longest side of the fast-mode inference copy.
+
+    Returns:
+        PIL.Image.Image: The RGBA image with the background removed.
+    """
+    from rembg import remove
+
+    if not fast:
+        output = remove(image_bytes, session=rembg_sessions.get(model))
+        return Image.open(io.BytesIO(output))
+
+    image = ImageOps.exif_transpose(Image.open(io.BytesIO(image_bytes))).convert("RGB")
+    mask = predict_mask(image, model, max_working_size)
+    cutout = image.convert("RGBA")
+    cutout.putalpha(mask)
+    return cutout
+
+
+def predict_mask(
+    image: Image.Image, model: str = "u2net", max_working_size: Optional[int] = None
+) -> Image.Image:
+    """
+    Predict the foreground mask of an image, optionally on a downscaled copy.
+
+    Args:
+        image (PIL.Image.Image): The RGB input image.
+        model (str): The rembg model name. Defaults to "u2net".
+        max_working_size (int, optional): Longest side of the inference copy;
+            None infers at full resolution.
+
+    Returns:
+        PIL.Image.Image: An "L" mask the size of ``image``.
+    """
+    from rembg import remove
+
+    working = image
+    scale = max_working_size / max(image.size) if max_working_size else 1.0
+    if scale < 1:
+        size = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+        # reducing_gap lets Pillow shrink by whole factors first, which is much
+        # cheaper than a single filtered resize from the full image
+        working = image.resize(size, Image.BILINEAR, reducing_gap=2.0)
+
+    mask = remove(working, session=rembg_sessions.get(model), only_mask=True)
+    if mask.size != image.size:
+        mask = mask.resize(image.size, Image.BILINEAR)
+    return mask
+
+
+def mask_iou(mask: Image.Image, reference: Image.Image, threshold: int = 128) -> float:
+    """Intersection over union of two masks binarized at ``threshold``."""
+    import numpy as np
+
+    a = np.asarray(mask.convert("L")) >= threshold
+    b = np.asarray(reference.convert("L")) >= threshold
+    union = np.logical_or(a, b).sum()
+    return float(np.logical_and(a, b).sum() / union) if union else 1.0
+
+
+def remove_backgrounds(
+    images: Iterable[Tuple[str, bytes]],
+    model: str = "u2net",
+    max_workers: int = 4,
+    fast: bool = False,
+    max_working_size: int = DEFAULT_MAX_WORKING_SIZE,
+) -> Iterator[BackgroundResult]:
+    """
+    Remove backgrounds from many images in a bounded thread pool.
+
+    onnxruntime releases the GIL during inference, so threads sharing one session
+    scale without paying a model load per worker process.
+
+    Args:
+        images (iterable): (name, encoded bytes) pairs.
+        model (str): The rembg model name. Defaults to "u2net".
+        max_workers (int): Maximum number of images processed at once. Defaults to 4.
+        fast (bool): Whether to use fast mode; see remove_background.
+        max_working_size (int): Longest side of the fast-mode inference copy.
+
+    Yields:
+        BackgroundResult: Results in completion order; failures carry an error message.
+    """
+    images = list(images)
+    # Load the session once up front instead of racing for it in every worker
+    rembg_sessions.get(model)
+
+    def run(index: int, name: str, data: bytes) -> BackgroundResult:
+        try:
+            image = remove_background(data, model, fast, max_working_size)
+            return BackgroundResult(index, name, image=image)
+        except Exception as e:
+            return BackgroundResult(index, name, error=f"{type(e).__name__}: {e}")
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = [
+            pool.submit(run, index, name, data)
+            for index, (name, data) in enumerate(images)
+        ]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def to_png_bytes(image: Image.Image) -> bytes:
+    buf = io.BytesIO()
+    image.save(buf, format="PNG")
+    return buf.getvalue()
+
+
+def build_zip(results: Iterable[BackgroundResult]) -> bytes:
+    """Pack successful results into a ZIP archive of PNG files, in input order."""
+    buf = io.BytesIO()
+    used = set()
+    with zipfile.ZipFile(buf, "w", compression=zipfile.ZIP_STORED) as archive:
+        for result in sorted(results, key=lambda r: r.index):
+            if result.image is None:
+                continue
+            stem = result.name.rsplit(".", 1)[0] or f"image_{result.index + 1}"
+            name = f"{stem}_no_bg.png"
+            if name in used:
+                name = f"{stem}_{result.index + 1}_no_bg.png"
+            used.add(name)
+            # PNG data is already compressed, so the archive just stores it
+            archive.writestr(name, to_png_bytes(result.image))
+    return buf.getvalue()
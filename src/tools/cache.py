@@ -0,0 +1,283 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from types import SimpleNamespace
+from typing import Any, Dict, Generator, Iterable, List, Optional
+
+DEFAULT_CACHE_DIR = os.environ.get(
+    "AI_ALCHEMY_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "ai_alchemy"),
+)
+
+
+def normalize_text(text: str) -> str:
+    """
+    Normalize line endings and strip surrounding whitespace.
+
+    Indentation inside the text is kept: prompts that differ only in how code
+    or YAML is indented must not share a cache key.
+    """
+    return text.replace("\r\n", "\n").replace("\r", "\n").strip()
+
+
+def make_key(model: str, messages: List[Dict[str, str]]) -> str:
+    """
+    Build a content-addressed cache key for a chat request.
+
+    Args:
+        model (str): The model name.
+        messages (list): The chat messages sent to the model.
+
+    Returns:
+        str: A hex SHA-256 digest of the normalized request.
+    """
+    payload = {
+        "model": model,
+        "messages": [
+            {"role": m["role"], "content": normalize_text(m["content"] or "")}
+            for m in messages
+        ],
+    }
+    encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def replay_stream(text: str, chunk_size: int = 16) -> Generator:
+    """
+    Replay cached text as a g4f-style chunk stream.
+
+    The yielded objects expose ``chunk.choices[0].delta.content`` so that
+    ``LLMClient.stream_content`` consumes them exactly like a live response.
+
+    Args:
+        text (str): The cached response text.
+        chunk_size (int): Number of characters per replayed chunk.
+
+    Yields:
+        SimpleNamespace: Chunks shaped like g4f streaming chunks.
+    """
+    for start in range(0, len(text), chunk_size):
+        delta = SimpleNamespace(content=text[start : start + chunk_size])
+        yield SimpleNamespace(choices=[SimpleNamespace(delta=delta)])
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    memory_hits: int = 0
+    disk_hits: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class LRUCache:
+    """In-process LRU cache with a per-entry TTL and a maximum entry count."""
+
+    def __init__(self, max_entries: int = 256, ttl: float = 3600.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, expires_at = item
+            if expires_at < time.time():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str) -> None:
+        with self._lock:
+            self._data[key] = (value, time.time() + self.ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class SQLiteCache:
+    """On-disk cache backed by SQLite with TTL and total-size eviction."""
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        ttl: float = 7 * 24 * 3600.0,
+        max_bytes: int = 64 * 1024 * 1024,
+    ):
+        self.path = path or os.path.join(DEFAULT_CACHE_DIR, "llm_cache.sqlite")
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("""CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    expires_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )""")
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[1] < now:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                return None
+            self._conn.execute(
+                "UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+            return row[0]
+
+    def set(self, key: str, value: str) -> None:
+        now = time.time()
+        size = len(value.encode("utf-8"))
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+                (key, value, size, now + self.ttl, now),
+            )
+            self._evict(now)
+
+    def _evict(self, now: float) -> None:
+        self._conn.execute("DELETE FROM responses WHERE expires_at < ?", (now,))
+        total = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # Drop least recently accessed entries until we are back under budget
+        for key, size in self._conn.execute(
+            "SELECT key, size FROM responses ORDER BY accessed_at ASC"
+        ).fetchall():
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def clear(self) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM responses")
+
+
+class ResponseCache:
+    """
+    Two-tier response cache: an in-process LRU in front of a SQLite store.
+
+    Memory hits are served directly; disk hits are promoted into memory.
+    """
+
+    def __init__(
+        self,
+        memory: Optional[LRUCache] = None,
+        disk: Optional[SQLiteCache] = None,
+        use_disk: bool = True,
+    ):
+        self.memory = memory or LRUCache()
+        self.disk = disk if disk is not None else (SQLiteCache() if use_disk else None)
+        self.stats = CacheStats()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        value = self.memory.get(key)
+        if value is not None:
+            self._record(hit=True, tier="memory")
+            return value
+        if self.disk is not None:
+            try:
+                value = self.disk.get(key)
+            except sqlite3.Error:
+                value = None
+            if value is not None:
+                self.memory.set(key, value)
+                self._record(hit=True, tier="disk")
+                return value
+        self._record(hit=False)
+        return None
+
+    def set(self, key: str, value: str) -> None:
+        self.memory.set(key, value)
+        if self.disk is not None:
+            try:
+                self.disk.set(key, value)
+            except sqlite3.Error as e:
+                print(f"Response cache write failed: {e}")
+
+    def record_stream(self, key: str, response: Iterable[Any]) -> Generator:
+        """
+        Pass a live g4f stream through unchanged and store its text once it completes.
+
+        Streams that are abandoned part-way or fail are not cached.
+        """
+        parts = []
+        for chunk in response:
+            try:
+                delta = chunk.choices[0].delta.content
+            except (AttributeError, IndexError):
+                delta = None
+            if delta:
+                parts.append(delta)
+            yield chunk
+        text = "".join(parts)
+        if text:
+            self.set(key, text)
+
+    def clear(self) -> None:
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def _record(self, hit: bool, tier: Optional[str] = None) -> None:
+        with self._lock:
+            if hit:
+                self.stats.hits += 1
+                if tier == "memory":
+                    self.stats.memory_hits += 1
+                else:
+                    self.stats.disk_hits += 1
+            else:
+                self.stats.misses += 1
+
+
+_default_cache: Optional[ResponseCache] = None
+_default_cache_lock = threading.Lock()
+
+
+def get_default_cache() -> ResponseCache:
+    """Return the process-wide response cache, creating it on first use."""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            try:
+                _default_cache = ResponseCache()
+            except (OSError, sqlite3.Error):
+                # Read-only filesystems still get the in-memory tier
+                _default_cache = ResponseCache(use_disk=False)
+        return _default_cache
@@ -0,0 +1,190 @@
+import threading
+from dataclasses import replace
+from typing import Dict, List, Optional
+
+from tools.llm_utils import LLMClient, is_error_response
+from tools.scheduler import PRIORITY_BATCH, capture_context, use_context
+from tools.text_utils import estimate_tokens
+
+# Prompt token budget per model; unknown models fall back to DEFAULT_BUDGET
+MODEL_BUDGETS: Dict[str, int] = {
+    "gpt-4o-mini": 6000,
+    "gpt-4o": 8000,
+    "gpt-4": 4000,
+    "gpt-3.5-turbo": 3000,
+}
+DEFAULT_BUDGET = 4000
+
+# Rough per-message overhead for role and separators
+MESSAGE_OVERHEAD = 4
+
+SUMMARY_PROMPT = (
+    "You maintain a running summary of a conversation between a user and an AI "
+    "assistant. Update the summary with the new messages. Keep facts, names, "
+    "decisions, user preferences and open questions; drop small talk. "
+    "Reply with the updated summary only, in at most {max_words} words."
+)
+
+
+def message_tokens(message: Dict[str, str]) -> int:
+    return estimate_tokens(message.get("content") or "") + MESSAGE_OVERHEAD
+
+
+class ChatContextManager:
+    """
+    Keeps chat requests within a token budget.
+
+    Requests contain the running summary (as a system message) followed by as
+    many recent turns as fit in the budget. After a turn completes, older turns
+    beyond the window are folded into the summary in a background thread, so
+    request size stays roughly constant however long the conversation gets.
+
+    One instance belongs to one conversation; keep it in ``st.session_state``.
+    """
+
+    def __init__(
+        self,
+        llm_client: LLMClient,
+        model: Optional[str] = None,
+        budget_tokens: Optional[int] = None,
+        system_prompt: Optional[str] = None,
+        compact_ratio: float = 0.75,
+        summary_words: int = 200,
+    ):
+        self.llm_client = llm_client
+        self.model = model or llm_client.model
+        self.budget_tokens = budget_tokens or MODEL_BUDGETS.get(
+            self.model, DEFAULT_BUDGET
+        )
+        self.system_prompt = system_prompt
+        self.compact_ratio = compact_ratio
+        self.summary_words = summary_words
+        self.summary = ""
+        # Number of history messages already folded into the summary
+        self.summarized_count = 0
+        self._lock = threading.Lock()
+        self._worker: Optional[threading.Thread] = None
+
+    def _prefix(self) -> List[Dict[str, str]]:
+        prefix = []
+        if self.system_prompt:
+            prefix.append({"role": "system", "content": self.system_prompt})
+        if self.summary:
+            prefix.append(
+                {
+                    "role": "system",
+                    "content": f"Summary of the earlier conversation:\n{self.summary}",
+                }
+            )
+        return prefix
+
+    def _pending(self, history: List[Dict[str, str]]) -> List[Dict[str, str]]:
+        """Messages not yet folded into the summary; call with the lock held."""
+        if self.summarized_count > len(history):
+            # The history was cleared or replaced; the summary no longer applies
+            self.summary = ""
+            self.summarized_count = 0
+        # The newest message is never summarized away
+        return history[self.summarized_count :] or history[-1:]
+
+    def build_messages(self, history: List[Dict[str, str]]) -> List[Dict[str, str]]:
+        """
+        Select the messages to send for the next request.
+
+        Args:
+            history (list): The full conversation, oldest first, ending with the new user turn.
+
+        Returns:
+            list: System/summary messages plus the most recent turns that fit the budget.
+        """
+        with self._lock:
+            pending = self._pending(history)
+            prefix = self._prefix()
+        remaining = self.budget_tokens - sum(message_tokens(m) for m in prefix)
+
+        window = []
+        for message in reversed(pending):
+            tokens = message_tokens(message)
+            # The newest message is always sent, even if it alone exceeds the budget
+            if window and tokens > remaining:
+                break
+            window.append({"role": message["role"], "content": message["content"]})
+            remaining -= tokens
+        return prefix + window[::-1]
+
+    def request_tokens(self, history: List[Dict[str, str]]) -> int:
+        return sum(message_tokens(m) for m in self.build_messages(history))
+
+    def needs_compaction(self, history: List[Dict[str, str]]) -> bool:
+        with self._lock:
+            pending = self._pending(history)
+        return (
+            sum(message_tokens(m) for m in pending)
+            > self.budget_tokens * self.compact_ratio
+        )
+
+    def compact(self, history: List[Dict[str, str]]) -> None:
+        """Fold the oldest unsummarized turns into the running summary."""
+        with self._lock:
+            pending = self._pending(history)
+            start = self.summarized_count
+            summary = self.summary
+
+        # Keep the newest turns (up to half the budget) verbatim, summarize the rest
+        keep_tokens, keep = 0, 0
+        for message in reversed(pending):
+            keep_tokens += message_tokens(message)
+            if keep_tokens > self.budget_tokens // 2:
+                break
+            keep += 1
+        # Never keep fewer than the latest exchange
+        keep = max(keep, min(2, len(pending)))
+        fold = pending[: len(pending) - keep]
+        if not fold:
+            return
+
+        transcript = "\n".join(f"{m['role']}: {m['content']}" for m in fold)
+        user_prompt = (
+            f"Current summary:\n{summary or '(empty)'}\n\nNew messages:\n{transcript}"
+        )
+        new_summary = self.llm_client.generate_text(
+            SUMMARY_PROMPT.format(max_words=self.summary_words), user_prompt
+        )
+        if not new_summary or is_error_response(new_summary):
+            # Leave the history untouched; the next turn will try again
+            return
+
+        with self._lock:
+            # Only apply if nobody else compacted in the meantime
+            if self.summarized_count == start:
+                self.summary = new_summary.strip()
+                self.summarized_count = start + len(fold)
+
+    def compact_async(
+        self, history: List[Dict[str, str]]
+    ) -> Optional[threading.Thread]:
+        """
+        Start compaction in a background thread if the history is over budget.
+
+        Returns the worker thread, or None if no compaction was needed or one is
+        already running.
+        """
+        if not self.needs_compaction(history):
+            return None
+        if self._worker is not None and self._worker.is_alive():
+            return None
+        # Compaction is background work: keep the session, yield to everything else
+        context = replace(capture_context(), priority=PRIORITY_BATCH)
+
+        def run(history: List[Dict[str, str]]) -> None:
+            with use_context(context):
+                self.compact(history)
+
+        self._worker = threading.Thread(target=run, args=(list(history),), daemon=True)
+        self._worker.start()
+        return self._worker
+
+    def reset(self) -> None:
+        with self._lock:
+            self.summary = ""
+            self.summarized_count = 0
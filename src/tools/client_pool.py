@@ -0,0 +1,194 @@
+import asyncio
+import os
+import queue
+import threading
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Generator, List, Optional
+
+# Concurrent requests allowed per provider (or per model when g4f picks the provider)
+DEFAULT_MAX_PER_PROVIDER = int(os.environ.get("AI_ALCHEMY_MAX_PER_PROVIDER", 8))
+
+_DONE = object()
+
+
+def _default_async_client():
+    from g4f.client import AsyncClient
+
+    return AsyncClient()
+
+
+def _default_sync_client():
+    from g4f.client import Client
+
+    return Client()
+
+
+class _PooledCompletions:
+    def __init__(self, pool: "ClientPool"):
+        self._pool = pool
+
+    def create(
+        self, model: str, messages: List[Dict[str, str]], stream: bool = False, **kwargs
+    ):
+        return self._pool.create(
+            model=model, messages=messages, stream=stream, **kwargs
+        )
+
+
+class ClientPool:
+    """
+    Process-wide g4f client shared by every Streamlit session and rerun.
+
+    Requests run on one long-lived asyncio loop in a background thread through
+    a single ``g4f.client.AsyncClient``. g4f binds its keep-alive TCP connector
+    to the running loop, so keeping one loop alive lets connections (and DNS
+    lookups) be reused across requests instead of being rebuilt for every call,
+    as happens when each sync call spins up its own loop.
+
+    Each request leases a slot for its provider (or model, when g4f chooses the
+    provider) for as long as it runs, capping concurrent connections per
+    provider at ``max_per_provider``. The pool exposes the same
+    ``chat.completions.create`` interface as ``g4f.client.Client``, so
+    LLMClient uses it unchanged.
+    """
+
+    def __init__(
+        self,
+        max_per_provider: int = DEFAULT_MAX_PER_PROVIDER,
+        async_client_factory: Optional[Callable[[], Any]] = None,
+        sync_client_factory: Optional[Callable[[], Any]] = None,
+    ):
+        self.max_per_provider = max_per_provider
+        self._async_client_factory = async_client_factory or _default_async_client
+        self._sync_client_factory = sync_client_factory or _default_sync_client
+        self._async_client = None
+        self._sync_client = None
+        self._lock = threading.Lock()
+        self._slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._in_flight: Dict[str, int] = {}
+        self.leases = 0
+        self.waits = 0
+
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_forever, name="llm-client-pool", daemon=True
+        )
+        self._thread.start()
+        self.chat = SimpleNamespace(completions=_PooledCompletions(self))
+
+    @property
+    def async_client(self):
+        with self._lock:
+            if self._async_client is None:
+                self._async_client = self._async_client_factory()
+            return self._async_client
+
+    @property
+    def images(self):
+        """Image generation goes through a shared sync g4f client."""
+        with self._lock:
+            if self._sync_client is None:
+                self._sync_client = self._sync_client_factory()
+            return self._sync_client.images
+
+    # -- leases -------------------------------------------------------------
+
+    def _acquire(self, key: str) -> None:
+        with self._lock:
+            slots = self._slots.get(key)
+            if slots is None:
+                slots = self._slots[key] = threading.BoundedSemaphore(
+                    self.max_per_provider
+                )
+            self.leases += 1
+        if not slots.acquire(blocking=False):
+            with self._lock:
+                self.waits += 1
+            slots.acquire()
+        with self._lock:
+            self._in_flight[key] = self._in_flight.get(key, 0) + 1
+
+    def _release(self, key: str) -> None:
+        with self._lock:
+            self._in_flight[key] -= 1
+        self._slots[key].release()
+
+    @staticmethod
+    def _key(model: str, provider: Any) -> str:
+        if provider is None:
+            return f"auto:{model}"
+        return getattr(provider, "__name__", str(provider))
+
+    # -- requests -----------------------------------------------------------
+
+    def create(
+        self, model: str, messages: List[Dict[str, str]], stream: bool = False, **kwargs
+    ):
+        """Run a chat completion on the pool's loop; see g4f's Client.chat.completions.create."""
+        kwargs.update(model=model, messages=messages)
+        key = self._key(model, kwargs.get("provider"))
+        if stream:
+            return self._stream(key, kwargs)
+
+        self._acquire(key)
+        try:
+            future = asyncio.run_coroutine_threadsafe(
+                self._complete(kwargs), self._loop
+            )
+            return future.result()
+        finally:
+            self._release(key)
+
+    async def _complete(self, kwargs: Dict[str, Any]):
+        return await self.async_client.chat.completions.create(stream=False, **kwargs)
+
+    async def _pump(self, kwargs: Dict[str, Any], out: queue.Queue) -> None:
+        try:
+            async for chunk in self.async_client.chat.completions.create(
+                stream=True, **kwargs
+            ):
+                out.put((chunk, None))
+            out.put((_DONE, None))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            out.put((None, e))
+
+    def _stream(self, key: str, kwargs: Dict[str, Any]) -> Generator:
+        # The lease is taken when iteration starts, so a stream that is never
+        # consumed never holds a slot
+        self._acquire(key)
+        out: queue.Queue = queue.Queue()
+        future = asyncio.run_coroutine_threadsafe(self._pump(kwargs, out), self._loop)
+        try:
+            while True:
+                chunk, error = out.get()
+                if error is not None:
+                    raise error
+                if chunk is _DONE:
+                    return
+                yield chunk
+        finally:
+            future.cancel()
+            self._release(key)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "leases": self.leases,
+                "waits": self.waits,
+                "in_flight": {k: v for k, v in sorted(self._in_flight.items()) if v},
+            }
+
+
+_default_pool: Optional[ClientPool] = None
+_default_pool_lock = threading.Lock()
+
+
+def get_client_pool() -> ClientPool:
+    """Return the process-wide client pool, creating it on first use."""
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = ClientPool()
+        return _default_pool
@@ -0,0 +1,205 @@
+import hashlib
+import io
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Generator, List, Optional, Tuple
+
+from tools.cache import LRUCache
+
+# Worker processes are spawned: forking the multithreaded Streamlit server can
+# leave children deadlocked on locks held by its other threads
+_SPAWN = multiprocessing.get_context("spawn")
+
+# PDFs with at least this many pages are extracted in worker processes
+PARALLEL_PAGE_THRESHOLD = 32
+PAGES_PER_TASK = 8
+
+# Extracted text keyed by file content hash, shared across sessions and reruns
+_text_cache = LRUCache(max_entries=512, ttl=6 * 3600)
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def iter_pdf_pages(
+    data: bytes, start: int = 0, stop: Optional[int] = None
+) -> Generator[str, None, None]:
+    """
+    Yield the text of each PDF page, releasing pdfium handles as it goes.
+
+    Args:
+        data (bytes): The PDF file contents.
+        start (int): First page index. Defaults to 0.
+        stop (int, optional): Page index to stop before. Defaults to the last page.
+
+    Yields:
+        str: The text of one page.
+    """
+    import pypdfium2
+
+    pdf = pypdfium2.PdfDocument(data)
+    try:
+        stop = len(pdf) if stop is None else min(stop, len(pdf))
+        for i in range(start, stop):
+            page = pdf[i]
+            textpage = page.get_textpage()
+            try:
+                yield textpage.get_text_range()
+            finally:
+                textpage.close()
+                page.close()
+    finally:
+        pdf.close()
+
+
+def pdf_page_count(data: bytes) -> int:
+    import pypdfium2
+
+    pdf = pypdfium2.PdfDocument(data)
+    try:
+        return len(pdf)
+    finally:
+        pdf.close()
+
+
+def _extract_page_range(args: Tuple[bytes, int, int]) -> List[str]:
+    # Runs in a worker process: pdfium is not thread-safe, so pages are split
+    # across processes that each open their own copy of the document.
+    data, start, stop = args
+    return list(iter_pdf_pages(data, start, stop))
+
+
+def iter_pdf_pages_parallel(
+    data: bytes, max_workers: Optional[int] = None
+) -> Generator[str, None, None]:
+    """
+    Yield PDF pages in order, extracting page ranges in a process pool.
+
+    At most ``max_workers`` ranges are in flight, so memory stays bounded even
+    for very large documents. Small documents are extracted in-process.
+    """
+    pages = pdf_page_count(data)
+    if pages < PARALLEL_PAGE_THRESHOLD:
+        yield from iter_pdf_pages(data)
+        return
+
+    max_workers = max_workers or min(4, os.cpu_count() or 1)
+    ranges = [
+        (start, min(start + PAGES_PER_TASK, pages))
+        for start in range(0, pages, PAGES_PER_TASK)
+    ]
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=_SPAWN) as pool:
+        pending = []
+        next_range = 0
+        while next_range < len(ranges) or pending:
+            while next_range < len(ranges) and len(pending) < max_workers:
+                start, stop = ranges[next_range]
+                pending.append(pool.submit(_extract_page_range, (data, start, stop)))
+                next_range += 1
+            yield from pending.pop(0).result()
+
+
+def extract_pdf_text(data: bytes, parallel: bool = True) -> str:
+    pages = iter_pdf_pages_parallel(data) if parallel else iter_pdf_pages(data)
+    return "".join(page + "\n" for page in pages)
+
+
+def extract_docx_text(data: bytes) -> str:
+    import docx2txt
+
+    return docx2txt.process(io.BytesIO(data))
+
+
+def _document_key(filename: str, data: bytes) -> str:
+    return f"{filename.rsplit('.', 1)[-1].lower()}:{content_hash(data)}"
+
+
+def _extract(filename: str, data: bytes, parallel: bool = True) -> str:
+    lowered = filename.lower()
+    if lowered.endswith(".pdf"):
+        return extract_pdf_text(data, parallel=parallel)
+    if lowered.endswith(".docx"):
+        return extract_docx_text(data)
+    raise ValueError(f"Unsupported document type: {filename}")
+
+
+def extract_document_text(filename: str, data: bytes) -> str:
+    """
+    Extract text from a PDF or DOCX file, memoized by file content hash.
+
+    Args:
+        filename (str): The file name, used to pick the format.
+        data (bytes): The file contents.
+
+    Returns:
+        str: The extracted text.
+    """
+    key = _document_key(filename, data)
+    text = _text_cache.get(key)
+    if text is not None:
+        return text
+
+    text = _extract(filename, data)
+    _text_cache.set(key, text)
+    return text
+
+
+@dataclass
+class ExtractedDocument:
+    name: str
+    text: str
+    error: Optional[str] = None
+
+
+def _extract_document(args: Tuple[str, bytes]) -> Tuple[Optional[str], Optional[str]]:
+    # Runs in a worker process; each file is extracted serially there
+    filename, data = args
+    try:
+        return _extract(filename, data, parallel=False), None
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}"
+
+
+def extract_documents(
+    files: List[Tuple[str, bytes]], max_workers: Optional[int] = None
+) -> List[ExtractedDocument]:
+    """
+    Extract many PDF/DOCX files at once, one file per worker process.
+
+    Files already in the text cache are not re-parsed; newly extracted text is
+    added to it. A file that fails to parse gets an error instead of text.
+
+    Args:
+        files (list): (filename, contents) pairs.
+        max_workers (int, optional): Process count. Defaults to min(4, CPU count).
+
+    Returns:
+        list: One ExtractedDocument per file, in input order.
+    """
+    results: List[Optional[ExtractedDocument]] = [None] * len(files)
+    misses = []
+    for i, (filename, data) in enumerate(files):
+        text = _text_cache.get(_document_key(filename, data))
+        if text is not None:
+            results[i] = ExtractedDocument(filename, text)
+        else:
+            misses.append(i)
+
+    if len(misses) == 1:
+        outputs = [_extract_document(files[misses[0]])]
+    elif misses:
+        max_workers = max_workers or min(4, os.cpu_count() or 1, len(misses))
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=_SPAWN) as pool:
+            outputs = list(pool.map(_extract_document, [files[i] for i in misses]))
+    else:
+        outputs = []
+
+    for i, (text, error) in zip(misses, outputs):
+        filename, data = files[i]
+        if text is not None:
+            _text_cache.set(_document_key(filename, data), text)
+        results[i] = ExtractedDocument(filename, text or "", error)
+    return results
@@ -0,0 +1,142 @@
+"""
+Local stand-in for ``g4f.client.Client``.
+
+FakeClient answers chat completions without touching the network, with a
+configurable time-to-first-token, token rate, jitter and error rate, so the
+LLM layer can be benchmarked and regression-tested offline:
+
+    llm_client = LLMClient(client=FakeClient(ttft=0.3, tokens_per_sec=40))
+"""
+
+import json
+import random
+import threading
+import time
+from types import SimpleNamespace
+from typing import Callable, Dict, Generator, List, Optional
+
+LOREM = (
+    "Lorem ipsum dolor sit amet, consectetur adipiscing elit, sed do eiusmod "
+    "tempor incididunt ut labore et dolore magna aliqua. Ut enim ad minim veniam, "
+    "quis nostrud exercitation ullamco laboris nisi ut aliquip ex ea commodo consequat."
+)
+
+
+class FakeProviderError(RuntimeError):
+    """Raised by FakeClient to simulate an upstream failure."""
+
+
+def default_responder(messages: List[Dict[str, str]], num_tokens: int) -> str:
+    """Answer JSON-looking prompts with JSON and everything else with filler text."""
+    prompt = " ".join(m["content"] or "" for m in messages).lower()
+    if "json" in prompt:
+        return (
+            "```json\n"
+            + json.dumps(
+                {
+                    "band": 7.0,
+                    "feedback": "Synthetic feedback from the fake provider.",
+                    "mistakes": [
+                        {"mistake": "He go home.", "correction": "He goes home."}
+                    ],
+                }
+            )
+            + "\n```"
+        )
+    words = LOREM.split()
+    return " ".join(words[i % len(words)] for i in range(num_tokens))
+
+
+class _Completions:
+    def __init__(self, client: "FakeClient"):
+        self._client = client
+
+    def create(
+        self, model: str, messages: List[Dict[str, str]], stream: bool = False, **kwargs
+    ):
+        return self._client._create(model, messages, stream)
+
+
+class FakeClient:
+    """
+    Drop-in replacement for ``g4f.client.Client`` with simulated latency.
+
+    Args:
+        ttft (float): Seconds before the first token. Defaults to 0.5.
+        tokens_per_sec (float): Streaming rate after the first token. Defaults to 50.
+        jitter (float): Relative random variation applied to every delay (0.2 = ±20%).
+        error_rate (float): Probability that a request fails. Defaults to 0.
+        response_tokens (int): Length of generated filler responses. Defaults to 120.
+        responder (callable, optional): Maps (messages, response_tokens) to the reply text.
+        seed (int, optional): Seed for reproducible jitter and errors.
+        stall_rate (float): Probability that a request stalls before its first token,
+            to simulate a slow provider in the latency tail. Defaults to 0.
+        stall_seconds (float): Time to first token of a stalled request. Defaults to 10.
+    """
+
+    def __init__(
+        self,
+        ttft: float = 0.5,
+        tokens_per_sec: float = 50.0,
+        jitter: float = 0.2,
+        error_rate: float = 0.0,
+        response_tokens: int = 120,
+        responder: Optional[Callable[[List[Dict[str, str]], int], str]] = None,
+        seed: Optional[int] = None,
+        stall_rate: float = 0.0,
+        stall_seconds: float = 10.0,
+    ):
+        self.ttft = ttft
+        self.tokens_per_sec = tokens_per_sec
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.response_tokens = response_tokens
+        self.responder = responder or default_responder
+        self.stall_rate = stall_rate
+        self.stall_seconds = stall_seconds
+        self.requests = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.chat = SimpleNamespace(completions=_Completions(self))
+
+    def _delay(self, seconds: float) -> float:
+        with self._lock:
+            factor = 1 + self._random.uniform(-self.jitter, self.jitter)
+        return max(0.0, seconds * factor)
+
+    def _first_token_delay(self) -> float:
+        with self._lock:
+            stalled = self._random.random() < self.stall_rate
+        return self.stall_seconds if stalled else self._delay(self.ttft)
+
+    def _should_fail(self) -> bool:
+        with self._lock:
+            self.requests += 1
+            return self._random.random() < self.error_rate
+
+    @staticmethod
+    def _tokenize(text: str) -> List[str]:
+        # Split on spaces but keep them attached so joined deltas equal the text
+        tokens = text.split(" ")
+        return [t + " " for t in tokens[:-1]] + [tokens[-1]]
+
+    def _create(self, model: str, messages: List[Dict[str, str]], stream: bool):
+        if self._should_fail():
+            time.sleep(self._delay(self.ttft))
+            raise FakeProviderError(f"Simulated failure from fake provider for {model}")
+        text = self.responder(messages, self.response_tokens)
+        tokens = self._tokenize(text)
+        first_token = self._first_token_delay()
+        if stream:
+            return self._stream(tokens, first_token)
+        time.sleep(first_token + self._delay(len(tokens) / self.tokens_per_sec))
+        message = SimpleNamespace(role="assistant", content=text)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], model=model)
+
+    def _stream(self, tokens: List[str], first_token: float) -> Generator:
+        time.sleep(first_token)
+        for i, token in enumerate(tokens):
+            if i:
+                time.sleep(self._delay(1 / self.tokens_per_sec))
+            delta = SimpleNamespace(content=token)
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=delta)])
@@ -0,0 +1,330 @@
+import os
+import queue
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Generator, List, Optional, Tuple
+
+# Seconds without a first token before the same request is sent to another route;
+# 0 disables hedging
+DEFAULT_HEDGE_AFTER = float(os.environ.get("AI_ALCHEMY_HEDGE_AFTER", 6.0))
+# Extra routes to hedge or fail over to, e.g. "gpt-4o,gpt-4o-mini@Blackbox"
+DEFAULT_FALLBACKS = [
+    spec
+    for spec in os.environ.get("AI_ALCHEMY_FALLBACK_ROUTES", "").split(",")
+    if spec.strip()
+]
+
+
+@dataclass(frozen=True)
+class Route:
+    """A model, optionally pinned to a g4f provider."""
+
+    model: str
+    provider: Optional[str] = None
+
+    @property
+    def name(self) -> str:
+        return f"{self.model}@{self.provider}" if self.provider else self.model
+
+    @classmethod
+    def parse(cls, spec: str) -> "Route":
+        """Parse "model" or "model@Provider"."""
+        model, _, provider = spec.strip().partition("@")
+        return cls(model.strip(), provider.strip() or None)
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker driven by the outcome and latency of recent calls.
+
+    The circuit opens when at least ``failure_ratio`` of the last ``window``
+    calls (and at least ``min_calls`` of them) failed or took longer than
+    ``slow_call_seconds``. An open circuit rejects calls for ``cooldown``
+    seconds, then lets calls through again as probes: the next success closes
+    it, the next failure opens it for another cooldown.
+    """
+
+    def __init__(
+        self,
+        window: int = 20,
+        min_calls: int = 5,
+        failure_ratio: float = 0.5,
+        slow_call_seconds: float = 20.0,
+        cooldown: float = 30.0,
+    ):
+        self.min_calls = min_calls
+        self.failure_ratio = failure_ratio
+        self.slow_call_seconds = slow_call_seconds
+        self.cooldown = cooldown
+        self._outcomes: deque = deque(maxlen=window)
+        self._opened_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if time.monotonic() - self._opened_at < self.cooldown:
+                return "open"
+            return "half-open"
+
+    def allow(self) -> bool:
+        return self.state != "open"
+
+    def record(self, ok: bool, latency: Optional[float] = None) -> None:
+        failed = not ok or (latency is not None and latency > self.slow_call_seconds)
+        with self._lock:
+            if self._opened_at is not None:
+                # Probe result after the cooldown decides the next state
+                if time.monotonic() - self._opened_at >= self.cooldown:
+                    if failed:
+                        self._opened_at = time.monotonic()
+                    else:
+                        self._opened_at = None
+                        self._outcomes.clear()
+                        self._outcomes.append(False)
+                return
+            self._outcomes.append(failed)
+            failures = sum(self._outcomes)
+            if (
+                len(self._outcomes) >= self.min_calls
+                and failures / len(self._outcomes) >= self.failure_ratio
+            ):
+                self._opened_at = time.monotonic()
+
+    def stats(self) -> Dict[str, Any]:
+        state = self.state
+        with self._lock:
+            calls = len(self._outcomes)
+            failures = sum(self._outcomes)
+        return {"state": state, "recent_calls": calls, "recent_failures": failures}
+
+
+class BreakerRegistry:
+    """One CircuitBreaker per route, shared by every client in the process."""
+
+    def __init__(self, **breaker_options: Any):
+        self.breaker_options = breaker_options
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def get(self, route: Route) -> CircuitBreaker:
+        with self._lock:
+            breaker = self._breakers.get(route.name)
+            if breaker is None:
+                breaker = self._breakers[route.name] = CircuitBreaker(
+                    **self.breaker_options
+                )
+            return breaker
+
+    def available(self, routes: List[Route]) -> List[Route]:
+        """Routes whose circuit is not open, in order; all routes if every circuit is open."""
+        allowed = [route for route in routes if self.get(route).allow()]
+        return allowed or list(routes)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            breakers = dict(self._breakers)
+        return {name: breaker.stats() for name, breaker in sorted(breakers.items())}
+
+
+provider_breakers = BreakerRegistry()
+
+
+@dataclass
+class HedgeOutcome:
+    route: Route
+    attempts: int
+
+
+class _Attempt:
+    def __init__(self, route: Route):
+        self.route = route
+        self.started = time.perf_counter()
+        self.cancelled = threading.Event()
+        self.finished = False
+
+
+def _has_content(chunk: Any) -> bool:
+    try:
+        return bool(chunk.choices[0].delta.content)
+    except (AttributeError, IndexError):
+        return False
+
+
+def _run_attempt(
+    attempt: _Attempt,
+    launch: Callable[[Route], Any],
+    stream: bool,
+    events: queue.Queue,
+    admit: Optional[Callable[[Route, bool], None]] = None,
+) -> None:
+    try:
+        if admit is not None:
+            admit(attempt.route, False)
+            if attempt.cancelled.is_set():
+                return
+        response = launch(attempt.route)
+        if not stream:
+            events.put((attempt, "result", response))
+            return
+        try:
+            for chunk in response:
+                if attempt.cancelled.is_set():
+                    return
+                events.put((attempt, "chunk", chunk))
+        finally:
+            close = getattr(response, "close", None)
+            if close is not None:
+                close()
+        events.put((attempt, "done", None))
+    except Exception as e:
+        events.put((attempt, "error", e))
+
+
+def hedged_call(
+    routes: List[Route],
+    launch: Callable[[Route], Any],
+    stream: bool = False,
+    hedge_after: Optional[float] = DEFAULT_HEDGE_AFTER,
+    max_attempts: int = 3,
+    breakers: Optional[BreakerRegistry] = None,
+    on_attempt: Optional[Callable[[Route], None]] = None,
+    admit: Optional[Callable[[Route, bool], None]] = None,
+) -> Tuple[Any, HedgeOutcome]:
+    """
+    Run a request with hedging and failover across routes.
+
+    The request starts on the first route whose circuit is closed. If a stream
+    has no first token within ``hedge_after`` seconds, the same request is also
+    sent to the next route that is not already running it, and whichever answers
+    first wins; the others are cancelled. Calls without streaming are not
+    hedged: their latency is the whole completion, so a timer would resend every
+    long answer. A route that fails before answering is replaced by the next
+    one. At most ``max_attempts`` requests are started in total. Each outcome is
+    fed to the route's circuit breaker.
+
+    Args:
+        routes (list): Routes in order of preference. Repeated when failing over
+            past the end.
+        launch (callable): Starts the request on a route and returns the g4f response.
+        stream (bool): Whether ``launch`` returns a stream of chunks. Defaults to False.
+        hedge_after (float, optional): Seconds without a first token before a stream
+            is hedged; 0 or None disables hedging.
+        max_attempts (int): Maximum requests started, hedges and failovers included.
+        breakers (BreakerRegistry, optional): Defaults to the process-wide registry.
+        on_attempt (callable, optional): Called with the route of every request started.
+        admit (callable, optional): Called with the route, and whether it is the first
+            attempt, before each request is sent; may block. The first attempt is
+            admitted on the calling thread, hedges and failovers on their own thread
+            so waiting for them does not hold up the attempts already running.
+
+    Returns:
+        tuple: The winning response (a chunk generator when streaming) and a HedgeOutcome.
+
+    Raises:
+        Exception: The last error, if every attempt failed before answering.
+    """
+    breakers = breakers or provider_breakers
+    candidates = breakers.available(routes)
+    events: queue.Queue = queue.Queue()
+    attempts: List[_Attempt] = []
+    hedging = bool(stream and hedge_after)
+
+    def next_route() -> Optional[Route]:
+        """The next candidate in turn that no unfinished attempt is running."""
+        busy = {a.route for a in attempts if not a.finished}
+        for offset in range(len(candidates)):
+            route = candidates[(len(attempts) + offset) % len(candidates)]
+            if route not in busy:
+                return route
+        return None
+
+    def start(route: Route) -> None:
+        first = not attempts
+        if first and admit is not None:
+            admit(route, True)
+        attempt = _Attempt(route)
+        attempts.append(attempt)
+        if on_attempt is not None:
+            on_attempt(attempt.route)
+        threading.Thread(
+            target=_run_attempt,
+            args=(attempt, launch, stream, events, None if first else admit),
+            daemon=True,
+        ).start()
+
+    start(candidates[0])
+    early_chunks: Dict[_Attempt, List[Any]] = {}
+    while True:
+        timeout = None
+        if hedging and len(attempts) < max_attempts:
+            timeout = max(0.0, attempts[-1].started + hedge_after - time.perf_counter())
+        try:
+            attempt, kind, payload = events.get(timeout=timeout)
+        except queue.Empty:
+            route = next_route()
+            if route is None:
+                # Every route is already running this request
+                hedging = False
+            else:
+                start(route)
+            continue
+
+        if kind == "error":
+            attempt.finished = True
+            breakers.get(attempt.route).record(False)
+            if all(a.finished for a in attempts):
+                if len(attempts) >= max_attempts:
+                    raise payload
+                start(next_route())
+            continue
+        if kind == "chunk" and not _has_content(payload):
+            # Role-only or empty chunks do not count as the first token
+            early_chunks.setdefault(attempt, []).append(payload)
+            continue
+        winner = attempt
+        break
+
+    breakers.get(winner.route).record(True, time.perf_counter() - winner.started)
+    for other in attempts:
+        if other is not winner and not other.finished:
+            other.cancelled.set()
+            # A request overtaken after the hedging delay counts against its
+            # route, unless that route is the winner's
+            if (
+                stream
+                and hedge_after
+                and other.route != winner.route
+                and time.perf_counter() - other.started >= hedge_after
+            ):
+                breakers.get(other.route).record(False)
+    outcome = HedgeOutcome(winner.route, len(attempts))
+
+    if not stream:
+        return payload, outcome
+
+    def relay() -> Generator:
+        try:
+            yield from early_chunks.get(winner, [])
+            if kind == "done":
+                return
+            yield payload
+            while True:
+                attempt, event, item = events.get()
+                if attempt is not winner:
+                    continue
+                if event == "chunk":
+                    yield item
+                elif event == "done":
+                    return
+                else:
+                    breakers.get(winner.route).record(False)
+                    raise item
+        finally:
+            winner.cancelled.set()
+
+    return relay(), outcome
@@ -1,5 +1,8 @@
+import os
+
 from PIL import Image
 from tools.llm_utils import LLMClient
+from tools.model_registry import ModelRegistry
 
 # Initialize the LLM client
 llm_client = LLMClient()
@@ -20,60 +23,70 @@ def generate_image(prompt: str) -> str:
         return f"Error: {e}"
 
 
-def ocr(image_url: str, language: str = "en") -> str:
-    import pytesseract
+def ocr(image, language: str = "en") -> str:
+    """
+    Extract text from an image entirely in memory.
+
+    Args:
+        image (bytes, str or PIL.Image.Image): The image data, file path or image.
+        language (str): Unused; kept for compatibility.
+
+    Returns:
+        str: The recognized text, or an "Error: ..." message.
+    """
+    from tools.ocr_utils import ocr_image
 
     try:
-        image = Image.open(image_url)
-        results = pytesseract.image_to_string(
-            image,
-            config=r'--psm 3 -c tessedit_char_whitelist="ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789() "',
-        )
-        return results
+        return ocr_image(image)
     except Exception as e:
         return f"Error: {e}"
 
 
+def _load_pix2tex():
+    from pix2tex.cli import LatexOCR
+
+    return LatexOCR()
+
+
+def _load_nougat():
+    from nougat import Nougat
+
+    return Nougat()
+
+
+def _load_surya():
+    from surya import Surya
+
+    return Surya()
+
+
+# OCR models are loaded once per process and shared by every Streamlit session
+latex_models = ModelRegistry(
+    memory_budget_mb=float(os.environ.get("AI_ALCHEMY_MODEL_BUDGET_MB", 4096))
+)
+latex_models.register("pix2tex", _load_pix2tex, lambda m, image: m(image), size_mb=600)
+latex_models.register(
+    "nougat", _load_nougat, lambda m, image: m.predict(image), size_mb=1500
+)
+latex_models.register(
+    "surya", _load_surya, lambda m, image: m.predict(image), size_mb=1200
+)
+
+
 def image_to_latex(image_path, model="pix2tex"):
     """
     Convert an image containing a mathematical equation to LaTeX code.
 
+    The model is loaded on first use and reused for later conversions.
+
     Args:
-        image_path (str): The file path to the image.
+        image_path (str or PIL.Image.Image): The file path to the image, or the image itself.
+        model (str): One of "pix2tex", "nougat" or "surya". Defaults to "pix2tex".
 
     Returns:
         str: The LaTeX code representing the equation.
     """
-    if model == "pix2tex":
-        from pix2tex.cli import LatexOCR
-
-        # Initialize the OCR model
-        model = LatexOCR()
-        # Open the image file
-        image = Image.open(image_path)
-
-        # Perform OCR to get LaTeX code
-        latex_code = model(image)
-    elif model == "nougat":
-        from nougat import Nougat
-
-        # Initialize the OCR model
-        model = Nougat()
-        # Open the image file
-        image = Image.open(image_path)
-
-        # Perform OCR to get LaTeX code
-        latex_code = model.predict(image)
-    elif model == "surya":
-        from surya import Surya
-
-        # Initialize the OCR model
-        model = Surya()
-        # Open the image file
-        image = Image.open(image_path)
-
-        # Perform OCR to get LaTeX code
-        latex_code = model.predict(image)
-    return latex_code
-
-    return latex_code
+    image = (
+        image_path if isinstance(image_path, Image.Image) else Image.open(image_path)
+    )
+    return latex_models.predict(model, image)
@@ -0,0 +1,228 @@
+import json
+import string
+from dataclasses import dataclass
+from typing import Any, Iterable, Iterator, List, Optional, Tuple, Union
+
+Path = Tuple[Union[str, int], ...]
+
+_LITERALS = {
+    "true": True,
+    "True": True,
+    "false": False,
+    "False": False,
+    "null": None,
+    "None": None,
+}
+# Characters of numbers and bare words (true/null/None/...)
+_LITERAL_CHARS = set(string.ascii_letters + string.digits + "+-._")
+
+
+@dataclass
+class JSONEvent:
+    """A value that finished parsing, addressed by its path from the root."""
+
+    path: Path
+    value: Any
+
+
+class _Frame:
+    __slots__ = ("container", "path", "state", "key")
+
+    def __init__(self, container, path: Path, state: str):
+        self.container = container
+        self.path = path
+        self.state = state
+        self.key: Optional[str] = None
+
+
+class StreamingJSONParser:
+    """
+    Incremental, forgiving JSON parser for streamed LLM output.
+
+    Feed it text deltas as they arrive; it returns an event for every value that
+    completes, so callers can render fields while the model is still writing.
+    Anything before the first ``{`` or ``[`` (such as a ```json fence or a
+    preamble) and anything after the root value closes is ignored. Single-quoted
+    strings, Python literals (None/True/False) and trailing commas are accepted,
+    matching what ``LLMClient.json_output`` tolerates.
+
+    Example:
+        parser = StreamingJSONParser()
+        for delta in llm_client.stream_content(stream):
+            for event in parser.feed(delta):
+                print(event.path, event.value)   # ("band",) 7.0, ("mistakes", 0) {...}
+    """
+
+    def __init__(self, max_depth: Optional[int] = 2):
+        self.max_depth = max_depth
+        self.root: Any = None
+        self.done = False
+        self._stack: List[_Frame] = []
+        self._started = False
+        self._quote: Optional[str] = None
+        self._escape = False
+        self._buffer: List[str] = []
+        self._literal: List[str] = []
+
+    @property
+    def result(self) -> Any:
+        """The root value parsed so far; partial until ``done`` is True."""
+        return self.root
+
+    def feed(self, text: str) -> List[JSONEvent]:
+        """Consume a chunk of text and return the values completed by it."""
+        events: List[JSONEvent] = []
+        for char in text:
+            if self.done:
+                break
+            self._feed_char(char, events)
+        return events
+
+    # -- character handling -------------------------------------------------
+
+    def _feed_char(self, char: str, events: List[JSONEvent]) -> None:
+        if self._quote is not None:
+            self._feed_string_char(char, events)
+            return
+
+        if not self._started:
+            if char in "{[":
+                self._started = True
+                self._open(char, events)
+            return
+
+        if self._literal:
+            if char in _LITERAL_CHARS:
+                self._literal.append(char)
+                return
+            self._finish_literal(events)
+
+        if char.isspace():
+            return
+        frame = self._stack[-1] if self._stack else None
+        if frame is None:
+            return
+
+        if char in "\"'":
+            self._quote = char
+            self._buffer = []
+        elif char in "{[":
+            self._open(char, events)
+        elif char in "}]":
+            self._close(events)
+        elif char == ":":
+            if frame.state == "colon":
+                frame.state = "value"
+        elif char == ",":
+            frame.state = "key" if isinstance(frame.container, dict) else "value"
+        elif char in _LITERAL_CHARS:
+            self._literal = [char]
+
+    def _feed_string_char(self, char: str, events: List[JSONEvent]) -> None:
+        if self._escape:
+            self._buffer.append(char)
+            self._escape = False
+        elif char == "\\":
+            self._buffer.append(char)
+            self._escape = True
+        elif char == self._quote:
+            raw = "".join(self._buffer)
+            quote = self._quote
+            self._quote = None
+            self._buffer = []
+            self._string_done(self._decode(raw, quote), events)
+        else:
+            self._buffer.append(char)
+
+    @staticmethod
+    def _decode(raw: str, quote: str) -> str:
+        if quote == "'":
+            raw = raw.replace("\\'", "'").replace('"', '\\"')
+        try:
+            return json.loads(f'"{raw}"')
+        except json.JSONDecodeError:
+            return raw
+
+    def _finish_literal(self, events: List[JSONEvent]) -> None:
+        token = "".join(self._literal)
+        self._literal = []
+        if token in _LITERALS:
+            value = _LITERALS[token]
+        else:
+            try:
+                value = int(token)
+            except ValueError:
+                try:
+                    value = float(token)
+                except ValueError:
+                    value = token
+        self._value_done(value, events)
+
+    # -- structure ----------------------------------------------------------
+
+    def _string_done(self, value: str, events: List[JSONEvent]) -> None:
+        frame = self._stack[-1]
+        if isinstance(frame.container, dict) and frame.state == "key":
+            frame.key = value
+            frame.state = "colon"
+        else:
+            self._value_done(value, events)
+
+    def _open(self, char: str, events: List[JSONEvent]) -> None:
+        container = {} if char == "{" else []
+        if not self._stack:
+            self.root = container
+            path: Path = ()
+        else:
+            path = self._attach(container)
+        state = "key" if isinstance(container, dict) else "value"
+        self._stack.append(_Frame(container, path, state))
+
+    def _close(self, events: List[JSONEvent]) -> None:
+        frame = self._stack.pop()
+        if not self._stack:
+            self.done = True
+            events.append(JSONEvent((), frame.container))
+            return
+        self._emit(frame.path, frame.container, events)
+        self._after_value()
+
+    def _attach(self, value: Any) -> Path:
+        frame = self._stack[-1]
+        if isinstance(frame.container, dict):
+            key = frame.key if frame.key is not None else str(len(frame.container))
+            frame.container[key] = value
+            return frame.path + (key,)
+        frame.container.append(value)
+        return frame.path + (len(frame.container) - 1,)
+
+    def _value_done(self, value: Any, events: List[JSONEvent]) -> None:
+        if not self._stack:
+            return
+        path = self._attach(value)
+        self._emit(path, value, events)
+        self._after_value()
+
+    def _after_value(self) -> None:
+        frame = self._stack[-1]
+        frame.key = None
+        frame.state = "comma"
+
+    def _emit(self, path: Path, value: Any, events: List[JSONEvent]) -> None:
+        if self.max_depth is None or len(path) <= self.max_depth:
+            events.append(JSONEvent(path, value))
+
+
+def iter_json_events(
+    deltas: Iterable[str], max_depth: Optional[int] = 2
+) -> Iterator[JSONEvent]:
+    """
+    Parse a stream of text deltas, yielding values as soon as they complete.
+
+    The final event has the empty path ``()`` and carries the whole root value.
+    The input is always drained, so wrapped streams (e.g. the response cache)
+    see their end.
+    """
+    parser = StreamingJSONParser(max_depth=max_depth)
+    for delta in deltas:
+        yield from parser.feed(delta)
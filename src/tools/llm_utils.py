@@ -1,61 +1,395 @@
+import asyncio
 import json
 import re
-from typing import Generator, Union, List, Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncGenerator, Generator, Union, List, Dict, Any, Optional, Tuple
 from dataclasses import dataclass
-from g4f.client import Client
+
+from tools.cache import ResponseCache, get_default_cache, make_key, replay_stream
+from tools.client_pool import get_client_pool
+from tools.json_stream import JSONEvent, iter_json_events
+from tools.hedging import (
+    DEFAULT_FALLBACKS,
+    DEFAULT_HEDGE_AFTER,
+    BreakerRegistry,
+    Route,
+    hedged_call,
+    provider_breakers,
+)
+from tools.metrics import CallTimer, MetricsRing, llm_metrics, page_from_stack
+from tools.scheduler import (
+    PRIORITY_BATCH,
+    PRIORITY_TOOL,
+    AdmissionScheduler,
+    capture_context,
+    current_context,
+    current_session,
+    llm_scheduler,
+    use_context,
+)
+from tools.single_flight import SingleFlight, llm_flights
+from tools.stream_coalesce import coalesce_deltas
+
+# generate_text returns failures as text starting with this instead of raising
+ERROR_PREFIX = "Error in g4f API call:"
+
+
+def is_error_response(text: str) -> bool:
+    """Whether ``generate_text`` returned its error message rather than a reply."""
+    return text.startswith(ERROR_PREFIX)
+
 
 @dataclass
 class Message:
     role: str
     content: str
 
+
+@dataclass
+class BatchResult:
+    prompt: Union[str, Tuple[str, Optional[str]]]
+    text: Optional[str] = None
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
 class LLMClient:
-    def __init__(self, model: str = "gpt-4o-mini"):
-        self.client = Client()
+    def __init__(
+        self,
+        model: str = "gpt-4o-mini",
+        cache: Optional[ResponseCache] = None,
+        use_cache: bool = True,
+        client: Optional[Any] = None,
+        page: Optional[str] = None,
+        metrics: Optional[MetricsRing] = None,
+        fallbacks: Optional[List[str]] = None,
+        hedge_after: Optional[float] = None,
+        max_attempts: int = 3,
+        breakers: Optional[BreakerRegistry] = None,
+        flights: Optional[SingleFlight] = None,
+        priority: int = PRIORITY_TOOL,
+        scheduler: Optional[AdmissionScheduler] = None,
+    ):
+        # Any object with g4f's chat.completions.create interface works here,
+        # e.g. tools.fake_provider.FakeClient for offline benchmarks. By default
+        # requests go through the process-wide client pool, so instances are
+        # cheap and pages that never call the LLM do not pay for importing g4f.
+        self._client = client
         self.model = model
+        self._cache = cache
+        self.use_cache = use_cache
+        # Calls are tagged with the page that made them; calls from worker
+        # threads fall back to the page that created the client
+        self.page = page or page_from_stack()
+        self.metrics = metrics if metrics is not None else llm_metrics
+        # Slow streams are hedged and failed requests retried on these routes
+        # ("model" or "model@Provider"); without fallbacks, nothing is hedged
+        # and failed requests are resent for the same model, letting g4f pick
+        # a provider again
+        self.fallbacks = [
+            Route.parse(spec)
+            for spec in (DEFAULT_FALLBACKS if fallbacks is None else fallbacks)
+        ]
+        self.hedge_after = DEFAULT_HEDGE_AFTER if hedge_after is None else hedge_after
+        self.max_attempts = max_attempts
+        self.breakers = breakers or provider_breakers
+        # Identical requests in flight at the same time share one upstream call
+        self.flights = flights or llm_flights
+        # Upstream requests wait for admission by the process-wide scheduler;
+        # request_context() overrides the priority for a block of calls
+        self.priority = priority
+        self.scheduler = scheduler or llm_scheduler
+
+    @property
+    def client(self):
+        """The underlying g4f-compatible client; the shared ClientPool unless one was given."""
+        if self._client is None:
+            self._client = get_client_pool()
+        return self._client
 
-    def create_messages(self, system_prompt: str, user_prompt: Optional[str] = None) -> List[Dict[str, str]]:
+    @client.setter
+    def client(self, value):
+        self._client = value
+
+    @property
+    def cache(self) -> Optional[ResponseCache]:
+        """The response cache, or None when caching is disabled."""
+        if not self.use_cache:
+            return None
+        if self._cache is None:
+            self._cache = get_default_cache()
+        return self._cache
+
+    def create_messages(
+        self, system_prompt: str, user_prompt: Optional[str] = None
+    ) -> List[Dict[str, str]]:
         """Create a list of messages for the LLM."""
         messages = [{"role": "system", "content": system_prompt}]
         if user_prompt:
             messages.append({"role": "user", "content": user_prompt})
         return messages
 
+    def _timer(
+        self, messages: List[Dict[str, str]], stream: bool, model: Optional[str] = None
+    ) -> CallTimer:
+        return CallTimer(
+            self.metrics,
+            page=page_from_stack() or self.page or "unknown",
+            model=model or self.model,
+            stream=stream,
+            prompt_chars=sum(len(m.get("content") or "") for m in messages),
+        )
+
+    def _create(
+        self,
+        messages: List[Dict[str, str]],
+        stream: bool,
+        timer: CallTimer,
+        model: Optional[str] = None,
+    ) -> Any:
+        """Send a request with admission control, hedging, failover and circuit breaking."""
+        primary = Route(model or self.model)
+        routes = [primary] + [route for route in self.fallbacks if route != primary]
+        context = current_context()
+        priority = self.priority if context.priority is None else context.priority
+        session = context.session or current_session()
+
+        def admit(route: Route, first: bool) -> None:
+            # Every attempt counts against its provider's rate limit; only the
+            # first runs on the caller's thread, where on_wait may update the page
+            self.scheduler.admit(
+                route.provider or f"auto:{route.model}",
+                priority=priority,
+                session=session,
+                on_wait=context.on_wait if first else None,
+            )
+
+        def launch(route: Route) -> Any:
+            kwargs = {"provider": route.provider} if route.provider else {}
+            return self.client.chat.completions.create(
+                model=route.model, messages=messages, stream=stream, **kwargs
+            )
+
+        attempts = []
+        try:
+            response, outcome = hedged_call(
+                routes,
+                launch,
+                stream=stream,
+                hedge_after=self.hedge_after,
+                max_attempts=self.max_attempts,
+                breakers=self.breakers,
+                on_attempt=attempts.append,
+                admit=admit,
+            )
+        finally:
+            timer.retries = max(0, len(attempts) - 1)
+        timer.model = outcome.route.name
+        return response
+
+    @staticmethod
+    def _instrument_stream(
+        response: Generator, timer: CallTimer, errors_as_text: bool = False
+    ) -> Generator:
+        """
+        Pass chunks through unchanged, timing the first token and the whole stream.
+
+        With ``errors_as_text``, a request that fails before its first chunk yields
+        the error message as a chunk instead of raising.
+        """
+        error = None
+        started = False
+        try:
+            for chunk in response:
+                timer.add_output(chunk.choices[0].delta.content)
+                started = True
+                yield chunk
+        except Exception as e:
+            error = type(e).__name__
+            if started or not errors_as_text:
+                raise
+            error_msg = f"{ERROR_PREFIX} {str(e)}"
+            yield from replay_stream(error_msg, chunk_size=len(error_msg))
+        finally:
+            timer.finish(error=error)
+
+    def _complete(
+        self,
+        messages: List[Dict[str, str]],
+        timer: CallTimer,
+        cache: Optional[ResponseCache] = None,
+        key: Optional[str] = None,
+    ) -> str:
+        response = self._create(messages, False, timer)
+        content = response.choices[0].message.content
+        if cache is not None and content:
+            cache.set(key, content)
+        return content
+
+    def _generate(
+        self,
+        messages: List[Dict[str, str]],
+        cache: Optional[ResponseCache] = None,
+        key: Optional[str] = None,
+    ) -> str:
+        """Non-streaming ``generate_text`` that raises on failure."""
+        timer = self._timer(messages, False)
+        if cache is not None:
+            cached = cache.get(key)
+            if cached is not None:
+                timer.add_output(cached)
+                timer.finish(cached=True)
+                return cached
+        try:
+            if cache is None:
+                content = self._complete(messages, timer)
+            else:
+                content, timer.shared = self.flights.call(
+                    key, lambda: self._complete(messages, timer, cache, key)
+                )
+        except Exception as e:
+            timer.finish(error=type(e).__name__)
+            raise
+        timer.add_output(content)
+        timer.finish()
+        return content
+
     def generate_text(
         self,
         system_prompt: str,
         user_prompt: Optional[str] = None,
         stream: bool = False,
+        use_cache: bool = True,
     ) -> Union[str, Generator]:
         """
         Generate text using g4f API.
 
+        Identical requests are answered from the response cache; cached streaming
+        responses are replayed as g4f-style chunks. Identical requests that arrive
+        while one is still in flight share its upstream call: streaming callers
+        each get their own iterator over the shared stream, replaying what has
+        already arrived before following it live.
+
         Args:
             system_prompt (str): The system prompt for the AI.
             user_prompt (str, optional): The user prompt. Defaults to None.
             stream (bool): Whether to stream the response. Defaults to False.
+            use_cache (bool): Whether to use the response cache and share in-flight
+                requests. Defaults to True.
 
         Returns:
             Union[str, Generator]: A string if not streaming, a generator if streaming.
         """
         messages = self.create_messages(system_prompt, user_prompt)
+        cache = self.cache if use_cache else None
+        key = make_key(self.model, messages) if cache is not None else None
 
-        try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=messages,
-                stream=stream,
+        if not stream:
+            try:
+                return self._generate(messages, cache, key)
+            except Exception as e:
+                return f"{ERROR_PREFIX} {str(e)}"
+
+        timer = self._timer(messages, stream)
+        if cache is not None:
+            cached = cache.get(key)
+            if cached is not None:
+                timer.add_output(cached)
+                timer.finish(cached=True)
+                return replay_stream(cached)
+
+        if cache is None:
+            try:
+                response = self._create(messages, True, timer)
+            except Exception as e:
+                timer.finish(error=type(e).__name__)
+                error_msg = f"{ERROR_PREFIX} {str(e)}"
+                return replay_stream(error_msg, chunk_size=len(error_msg))
+        else:
+            response, timer.shared = self.flights.stream(
+                key,
+                lambda: cache.record_stream(key, self._create(messages, True, timer)),
             )
-            if stream:
-                return response
-            return response.choices[0].message.content
+        return self._instrument_stream(response, timer, errors_as_text=True)
+
+    def chat_completion(
+        self,
+        messages: List[Dict[str, str]],
+        stream: bool = False,
+        model: Optional[str] = None,
+    ) -> Any:
+        """
+        Send a prepared message list (e.g. a chat history) to the model, uncached.
+
+        Args:
+            messages (list): The messages to send.
+            stream (bool): Whether to stream the response. Defaults to False.
+            model (str, optional): Overrides the client's model for this call.
+
+        Returns:
+            The g4f response, or a stream of g4f chunks if streaming.
+        """
+        timer = self._timer(messages, stream, model)
+        try:
+            response = self._create(messages, stream, timer, model)
         except Exception as e:
-            error_msg = f"Error in g4f API call: {str(e)}"
-            if stream:
-                def error_gen():
-                    yield error_msg
-                return error_gen()
-            return error_msg
+            timer.finish(error=type(e).__name__)
+            raise
+        if stream:
+            return self._instrument_stream(response, timer)
+        timer.add_output(response.choices[0].message.content)
+        timer.finish()
+        return response
+
+    def generate_batch(
+        self,
+        prompts: List[Union[str, Tuple[str, Optional[str]]]],
+        max_concurrency: int = 4,
+        use_cache: bool = True,
+    ) -> List[BatchResult]:
+        """
+        Run many independent prompts through a bounded thread pool.
+
+        Args:
+            prompts (list): Each item is a system prompt string or a
+                (system_prompt, user_prompt) tuple.
+            max_concurrency (int): Maximum number of requests in flight. Defaults to 4.
+            use_cache (bool): Whether to use the response cache. Defaults to True.
+
+        Returns:
+            list[BatchResult]: One result per prompt, in input order. A failed item
+            carries its error message instead of failing the whole batch.
+
+        Requests are scheduled as batch work unless the caller's request_context()
+        sets another priority.
+        """
+        context = capture_context(default_priority=PRIORITY_BATCH)
+
+        def run_one(prompt) -> BatchResult:
+            system_prompt, user_prompt = (
+                prompt if isinstance(prompt, tuple) else (prompt, None)
+            )
+            messages = self.create_messages(system_prompt, user_prompt)
+            cache = self.cache if use_cache else None
+            key = make_key(self.model, messages) if cache is not None else None
+            try:
+                with use_context(context):
+                    text = self._generate(messages, cache, key)
+            except Exception as e:
+                return BatchResult(prompt, error=f"{ERROR_PREFIX} {str(e)}")
+            if not text:
+                return BatchResult(prompt, error="Empty response")
+            return BatchResult(prompt, text=text)
+
+        if not prompts:
+            return []
+        with ThreadPoolExecutor(
+            max_workers=max(1, min(max_concurrency, len(prompts)))
+        ) as pool:
+            return list(pool.map(run_one, prompts))
 
     def stream_content(self, response: Generator) -> Generator:
         """
@@ -72,7 +406,41 @@ class LLMClient:
             if delta is not None:
                 yield delta
 
-    def json_output(self, response: str, default: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    def stream_coalesced(self, response: Generator, **options) -> Generator:
+        """
+        Process a streaming response from g4f for display with ``st.write_stream``.
+
+        Deltas are merged into larger chunks (see tools.stream_coalesce), so the
+        page re-renders a few times per second instead of once per token.
+
+        Args:
+            response (Generator): The streaming response object from g4f.
+            **options: Passed to DeltaCoalescer (min_window, max_window, max_chars).
+
+        Yields:
+            str: Coalesced chunks of content; joined, they equal the full response.
+        """
+        return coalesce_deltas(self.stream_content(response), **options)
+
+    def stream_json(
+        self, response: Generator, max_depth: Optional[int] = 2
+    ) -> Generator[JSONEvent, None, None]:
+        """
+        Parse a streaming JSON response incrementally.
+
+        Args:
+            response (Generator): The streaming response object from g4f.
+            max_depth (int, optional): Deepest path to report. Defaults to 2, i.e. top-level
+                fields and the items of top-level lists.
+
+        Yields:
+            JSONEvent: A (path, value) pair for every value as soon as it completes.
+        """
+        return iter_json_events(self.stream_content(response), max_depth=max_depth)
+
+    def json_output(
+        self, response: str, default: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
         """
         Convert AI response into JSON, with fallback to a default dictionary.
 
@@ -127,11 +495,123 @@ class LLMClient:
             text = text[:-3]  # Remove trailing ```
         return text.strip()
 
+    def cache_stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters for the response cache."""
+        if self.cache is None:
+            return {"enabled": False}
+        stats = self.cache.stats
+        return {
+            "enabled": True,
+            "hits": stats.hits,
+            "misses": stats.misses,
+            "memory_hits": stats.memory_hits,
+            "disk_hits": stats.disk_hits,
+            "hit_rate": stats.hit_rate,
+        }
+
+
+class AsyncLLMClient:
+    """
+    Asyncio front-end for LLMClient.
+
+    Blocking g4f calls run in the default executor, so several requests can be in
+    flight at once while a semaphore caps how many hit the upstream together.
+    """
+
+    _SENTINEL = object()
+
+    def __init__(
+        self, llm_client: Optional[LLMClient] = None, max_concurrency: int = 4
+    ):
+        self.llm_client = llm_client or LLMClient()
+        self.max_concurrency = max_concurrency
+        self._semaphore = None
+        self._loop = None
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        # A semaphore is tied to the event loop it is first used on, and Streamlit
+        # starts a fresh loop on every rerun, so create one per loop.
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._loop = loop
+        return self._semaphore
+
+    async def _run(self, func, *args, **kwargs):
+        # Executor threads do not see the caller's request context or Streamlit
+        # session, so carry both over for admission control
+        context = capture_context()
+
+        def run():
+            with use_context(context):
+                return func(*args, **kwargs)
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, run)
+
+    async def agenerate_text(
+        self,
+        system_prompt: str,
+        user_prompt: Optional[str] = None,
+        use_cache: bool = True,
+    ) -> str:
+        """
+        Asynchronously generate a complete response.
+
+        Args:
+            system_prompt (str): The system prompt for the AI.
+            user_prompt (str, optional): The user prompt. Defaults to None.
+            use_cache (bool): Whether to use the response cache. Defaults to True.
+
+        Returns:
+            str: The generated text.
+        """
+        async with self.semaphore:
+            return await self._run(
+                self.llm_client.generate_text,
+                system_prompt,
+                user_prompt,
+                stream=False,
+                use_cache=use_cache,
+            )
+
+    async def astream_text(
+        self,
+        system_prompt: str,
+        user_prompt: Optional[str] = None,
+        use_cache: bool = True,
+    ) -> AsyncGenerator[str, None]:
+        """
+        Asynchronously stream a response as text deltas.
+
+        The semaphore slot is held until the stream is exhausted or closed.
+
+        Yields:
+            str: Chunks of content from the response.
+        """
+        async with self.semaphore:
+            response = await self._run(
+                self.llm_client.generate_text,
+                system_prompt,
+                user_prompt,
+                stream=True,
+                use_cache=use_cache,
+            )
+            chunks = self.llm_client.stream_content(response)
+            while True:
+                delta = await self._run(next, chunks, self._SENTINEL)
+                if delta is self._SENTINEL:
+                    break
+                yield delta
+
+
 # Create a default client instance
 default_client = LLMClient()
 
 # Export commonly used functions for backward compatibility
 generate_text = default_client.generate_text
 stream_content = default_client.stream_content
+stream_coalesced = default_client.stream_coalesced
 json_output = default_client.json_output
 remove_triple_backticks = LLMClient.remove_triple_backticks
@@ -0,0 +1,311 @@
+import itertools
+import json
+import os
+import sys
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+QUANTILES = (0.5, 0.95, 0.99)
+DEFAULT_CAPACITY = int(os.environ.get("AI_ALCHEMY_METRICS_CAPACITY", 4096))
+
+
+@dataclass
+class CallRecord:
+    """One LLM call. Times are in seconds; sizes are in characters."""
+
+    timestamp: float
+    page: str
+    model: str
+    stream: bool
+    cached: bool
+    duration: float
+    ttft: Optional[float]
+    prompt_chars: int
+    response_chars: int
+    retries: int = 0
+    error: Optional[str] = None
+    # Answered by another caller's identical in-flight request
+    shared: bool = False
+
+    @property
+    def chars_per_sec(self) -> float:
+        # For streams, speed after the first token so slow starts do not hide it;
+        # a response that arrived in one piece is measured over the whole call
+        generating = self.duration
+        if self.stream and self.ttft is not None and self.duration - self.ttft > 0.01:
+            generating = self.duration - self.ttft
+        return self.response_chars / generating if generating > 0 else 0.0
+
+
+def page_from_stack() -> Optional[str]:
+    """Name of the Streamlit page module on the current call stack, if any."""
+    frame = sys._getframe(1)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if os.path.basename(os.path.dirname(filename)) == "pages":
+            return os.path.splitext(os.path.basename(filename))[0]
+        frame = frame.f_back
+    return None
+
+
+class MetricsRing:
+    """
+    Fixed-size ring buffer of CallRecords shared by every session in the process.
+
+    Writers never take a lock: each claims a slot from an ``itertools.count``
+    (atomic under the GIL) and stores the record with a single list assignment,
+    so recording cannot stall a request. Readers copy the slots and sort by
+    timestamp; a record overwritten mid-copy just drops out of that snapshot.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self._slots: List[Optional[CallRecord]] = [None] * capacity
+        self._counter = itertools.count()
+
+    def record(self, record: CallRecord) -> None:
+        self._slots[next(self._counter) % self.capacity] = record
+
+    def snapshot(self, since: Optional[float] = None) -> List[CallRecord]:
+        """Records currently in the buffer, oldest first."""
+        records = [r for r in list(self._slots) if r is not None]
+        if since is not None:
+            records = [r for r in records if r.timestamp >= since]
+        return sorted(records, key=lambda r: r.timestamp)
+
+    def clear(self) -> None:
+        self._slots = [None] * self.capacity
+
+
+def quantile(ordered: List[float], q: float) -> float:
+    """Linearly interpolated quantile of an already sorted list."""
+    position = (len(ordered) - 1) * q
+    low = int(position)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (position - low)
+
+
+def _quantiles(values: List[float]) -> Dict[str, Optional[float]]:
+    # Plain Python rather than NumPy keeps llm_utils (imported by every page) light
+    ordered = sorted(values)
+    return {
+        f"p{int(q * 100)}": quantile(ordered, q) if ordered else None for q in QUANTILES
+    }
+
+
+def summarize(records: Iterable[CallRecord]) -> List[Dict[str, Any]]:
+    """
+    Aggregate records per (page, model).
+
+    Cache hits and calls shared with an identical in-flight request are counted
+    but left out of the latency percentiles, since they say nothing about the
+    upstream.
+    """
+    groups: Dict[Tuple[str, str], List[CallRecord]] = {}
+    for record in records:
+        groups.setdefault((record.page, record.model), []).append(record)
+
+    rows = []
+    for (page, model), group in sorted(groups.items()):
+        upstream = [r for r in group if not r.cached and not r.shared]
+        ok = [r for r in upstream if r.error is None]
+        errors: Dict[str, int] = {}
+        for r in upstream:
+            if r.error is not None:
+                errors[r.error] = errors.get(r.error, 0) + 1
+        rows.append(
+            {
+                "page": page,
+                "model": model,
+                "calls": len(group),
+                "cached": sum(r.cached for r in group),
+                "shared": sum(r.shared and not r.cached for r in group),
+                "errors": errors,
+                "retries": sum(r.retries for r in upstream),
+                "ttft": _quantiles([r.ttft for r in ok if r.ttft is not None]),
+                "duration": _quantiles([r.duration for r in ok]),
+                "chars_per_sec": _quantiles([r.chars_per_sec for r in ok if r.stream]),
+                "prompt_chars": sum(r.prompt_chars for r in group),
+                "response_chars": sum(r.response_chars for r in group),
+            }
+        )
+    return rows
+
+
+def to_json(records: Iterable[CallRecord]) -> str:
+    records = list(records)
+    return json.dumps(
+        {
+            "summary": summarize(records),
+            "calls": [dict(asdict(r), chars_per_sec=r.chars_per_sec) for r in records],
+        },
+        indent=2,
+    )
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels: Any) -> str:
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+def to_prometheus(records: Iterable[CallRecord]) -> str:
+    """
+    Render the buffered records in the Prometheus text exposition format.
+
+    Counts cover the records still in the ring buffer, so they are exported as
+    gauges rather than monotonic counters.
+    """
+    rows = summarize(records)
+    lines = [
+        "# HELP ai_alchemy_llm_calls LLM calls in the metrics window.",
+        "# TYPE ai_alchemy_llm_calls gauge",
+    ]
+    for row in rows:
+        upstream = row["calls"] - row["cached"] - row["shared"]
+        failed = sum(row["errors"].values())
+        for status, count in (
+            ("ok", upstream - failed),
+            ("error", failed),
+            ("cached", row["cached"]),
+            ("shared", row["shared"]),
+        ):
+            lines.append(
+                f"ai_alchemy_llm_calls{_labels(page=row['page'], model=row['model'], status=status)} {count}"
+            )
+
+    lines += [
+        "# HELP ai_alchemy_llm_errors Failed LLM calls by error class.",
+        "# TYPE ai_alchemy_llm_errors gauge",
+    ]
+    for row in rows:
+        for error, count in row["errors"].items():
+            lines.append(
+                f"ai_alchemy_llm_errors{_labels(page=row['page'], model=row['model'], error=error)} {count}"
+            )
+
+    lines += [
+        "# HELP ai_alchemy_llm_retries Retried LLM requests.",
+        "# TYPE ai_alchemy_llm_retries gauge",
+    ]
+    for row in rows:
+        lines.append(
+            f"ai_alchemy_llm_retries{_labels(page=row['page'], model=row['model'])} {row['retries']}"
+        )
+
+    for metric, field, help_text in (
+        ("ai_alchemy_llm_ttft_seconds", "ttft", "Time to first token."),
+        ("ai_alchemy_llm_duration_seconds", "duration", "Total call duration."),
+        (
+            "ai_alchemy_llm_chars_per_second",
+            "chars_per_sec",
+            "Streaming generation speed.",
+        ),
+    ):
+        lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} summary"]
+        for row in rows:
+            for name, value in row[field].items():
+                if value is None:
+                    continue
+                q = int(name[1:]) / 100
+                lines.append(
+                    f"{metric}{_labels(page=row['page'], model=row['model'], quantile=q)} {value:.6f}"
+                )
+
+    for metric, field, help_text in (
+        ("ai_alchemy_llm_prompt_chars", "prompt_chars", "Prompt characters sent."),
+        (
+            "ai_alchemy_llm_response_chars",
+            "response_chars",
+            "Response characters received.",
+        ),
+    ):
+        lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} gauge"]
+        for row in rows:
+            lines.append(
+                f"{metric}{_labels(page=row['page'], model=row['model'])} {row[field]}"
+            )
+    return "\n".join(lines) + "\n"
+
+
+def percentiles_over_time(
+    records: Iterable[CallRecord], field: str = "ttft", bucket_seconds: int = 60
+) -> Dict[str, List[Any]]:
+    """
+    Per-bucket percentiles of ``field`` for uncached, successful calls.
+
+    Returns:
+        dict: Columns "time" (bucket start, epoch seconds) and one per quantile.
+    """
+    buckets: Dict[int, List[float]] = {}
+    for r in records:
+        value = getattr(r, field)
+        # Throughput is only meaningful for streamed responses
+        if r.cached or r.shared or r.error is not None or value is None:
+            continue
+        if field == "chars_per_sec" and not r.stream:
+            continue
+        buckets.setdefault(
+            int(r.timestamp // bucket_seconds) * bucket_seconds, []
+        ).append(value)
+
+    columns: Dict[str, List[Any]] = {"time": []}
+    for q in QUANTILES:
+        columns[f"p{int(q * 100)}"] = []
+    for start in sorted(buckets):
+        columns["time"].append(start)
+        for name, value in _quantiles(buckets[start]).items():
+            columns[name].append(value)
+    return columns
+
+
+class CallTimer:
+    """Measures one call and writes its CallRecord to the ring when finished."""
+
+    def __init__(
+        self, ring: MetricsRing, page: str, model: str, stream: bool, prompt_chars: int
+    ):
+        self.ring = ring
+        self.page = page
+        self.model = model
+        self.stream = stream
+        self.prompt_chars = prompt_chars
+        self.retries = 0
+        self.shared = False
+        self.started = time.perf_counter()
+        self.ttft: Optional[float] = None
+        self.response_chars = 0
+
+    def first_token(self) -> None:
+        if self.ttft is None:
+            self.ttft = time.perf_counter() - self.started
+
+    def add_output(self, text: Optional[str]) -> None:
+        if text:
+            self.first_token()
+            self.response_chars += len(text)
+
+    def finish(self, error: Optional[str] = None, cached: bool = False) -> None:
+        self.ring.record(
+            CallRecord(
+                timestamp=time.time(),
+                page=self.page,
+                model=self.model,
+                stream=self.stream,
+                cached=cached,
+                duration=time.perf_counter() - self.started,
+                ttft=self.ttft,
+                prompt_chars=self.prompt_chars,
+                response_chars=self.response_chars,
+                retries=self.retries,
+                error=error,
+                shared=self.shared,
+            )
+        )
+
+
+# Process-wide buffer shared by every LLMClient and every Streamlit session
+llm_metrics = MetricsRing()
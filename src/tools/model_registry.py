@@ -0,0 +1,174 @@
+import gc
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+
+@dataclass
+class ModelSpec:
+    loader: Callable[[], Any]
+    predict: Callable[[Any, Any], Any]
+    size_mb: float
+
+
+@dataclass
+class ModelStats:
+    loads: int = 0
+    load_seconds: float = 0.0
+    last_load_seconds: float = 0.0
+    inferences: int = 0
+    inference_seconds: float = 0.0
+    last_inference_seconds: float = 0.0
+    evictions: int = 0
+
+    def as_dict(self) -> Dict[str, float]:
+        return {
+            "loads": self.loads,
+            "load_seconds": self.load_seconds,
+            "last_load_seconds": self.last_load_seconds,
+            "inferences": self.inferences,
+            "inference_seconds": self.inference_seconds,
+            "last_inference_seconds": self.last_inference_seconds,
+            "avg_inference_seconds": (
+                self.inference_seconds / self.inferences if self.inferences else 0.0
+            ),
+            "evictions": self.evictions,
+        }
+
+
+@dataclass
+class _Entry:
+    spec: ModelSpec
+    lock: threading.Lock = field(default_factory=threading.Lock)
+    model: Any = None
+    last_used: float = 0.0
+    stats: ModelStats = field(default_factory=ModelStats)
+
+
+class ModelRegistry:
+    """
+    Process-wide registry that loads each model once and reuses it across sessions.
+
+    Models load lazily on first use. Each model has its own lock, so calls to the
+    same model are serialized (most OCR backends are not thread-safe) while
+    different models run independently. When loading a model would exceed the
+    memory budget, the least recently used idle models are evicted first; models
+    idle for longer than ``idle_ttl`` seconds are evicted as well.
+    """
+
+    def __init__(
+        self, memory_budget_mb: float = 4096, idle_ttl: Optional[float] = 1800
+    ):
+        self.memory_budget_mb = memory_budget_mb
+        self.idle_ttl = idle_ttl
+        self._entries: Dict[str, _Entry] = {}
+        self._lock = threading.Lock()
+
+    def register(
+        self,
+        name: str,
+        loader: Callable[[], Any],
+        predict: Callable[[Any, Any], Any],
+        size_mb: float,
+    ) -> None:
+        """
+        Register a model backend.
+
+        Args:
+            name (str): The backend name.
+            loader (callable): Builds the model; called at most once while it stays loaded.
+            predict (callable): Runs inference as predict(model, input).
+            size_mb (float): Estimated resident size, used for the memory budget.
+        """
+        with self._lock:
+            self._entries[name] = _Entry(ModelSpec(loader, predict, size_mb))
+
+    @property
+    def names(self) -> List[str]:
+        return list(self._entries)
+
+    def predict(self, name: str, data: Any) -> Any:
+        """Run ``data`` through the named model, loading it first if needed."""
+        entry = self._entries.get(name)
+        if entry is None:
+            raise ValueError(
+                f"Unknown model '{name}'. Available: {', '.join(self.names)}"
+            )
+
+        with entry.lock:
+            if entry.model is None:
+                self._make_room(name, entry.spec.size_mb)
+                start = time.perf_counter()
+                entry.model = entry.spec.loader()
+                elapsed = time.perf_counter() - start
+                entry.stats.loads += 1
+                entry.stats.load_seconds += elapsed
+                entry.stats.last_load_seconds = elapsed
+
+            start = time.perf_counter()
+            try:
+                return entry.spec.predict(entry.model, data)
+            finally:
+                elapsed = time.perf_counter() - start
+                entry.stats.inferences += 1
+                entry.stats.inference_seconds += elapsed
+                entry.stats.last_inference_seconds = elapsed
+                entry.last_used = time.time()
+
+    def loaded_mb(self) -> float:
+        return sum(
+            e.spec.size_mb for e in self._entries.values() if e.model is not None
+        )
+
+    def evict(self, name: str) -> bool:
+        """Unload a model if it is idle. Returns True if it was unloaded."""
+        entry = self._entries.get(name)
+        if entry is None or entry.model is None:
+            return False
+        if not entry.lock.acquire(blocking=False):
+            return False
+        try:
+            entry.model = None
+            entry.stats.evictions += 1
+            gc.collect()
+            return True
+        finally:
+            entry.lock.release()
+
+    def evict_idle(self) -> List[str]:
+        """Unload models that have not been used for ``idle_ttl`` seconds."""
+        if self.idle_ttl is None:
+            return []
+        cutoff = time.time() - self.idle_ttl
+        return [
+            name
+            for name, entry in list(self._entries.items())
+            if entry.model is not None and entry.last_used < cutoff and self.evict(name)
+        ]
+
+    def _make_room(self, loading: str, size_mb: float) -> None:
+        with self._lock:
+            self.evict_idle()
+            candidates = sorted(
+                (
+                    (entry.last_used, name)
+                    for name, entry in self._entries.items()
+                    if name != loading and entry.model is not None
+                ),
+            )
+            for _, name in candidates:
+                if self.loaded_mb() + size_mb <= self.memory_budget_mb:
+                    break
+                self.evict(name)
+
+    def metrics(self) -> Dict[str, Dict[str, Any]]:
+        """Per-model load and inference statistics."""
+        return {
+            name: {
+                "loaded": entry.model is not None,
+                "size_mb": entry.spec.size_mb,
+                **entry.stats.as_dict(),
+            }
+            for name, entry in self._entries.items()
+        }
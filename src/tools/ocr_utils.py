@@ -0,0 +1,199 @@
+import io
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Union
+
+import numpy as np
+from PIL import Image, ImageOps
+
+ImageInput = Union[bytes, str, Image.Image]
+
+TESSERACT_CONFIG = r'--psm 3 -c tessedit_char_whitelist="ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789() "'
+
+# Photos carry no usable DPI (phones write 72 or nothing), so resolution is
+# also estimated from an assumed page width (A4, in inches)
+PAGE_WIDTH_INCHES = 8.27
+TARGET_DPI = 300
+
+# Bradley adaptive threshold: a pixel is ink if it is this much darker than
+# the mean of its neighbourhood, which is 1/WINDOW_FRACTION of the image width
+THRESHOLD = 0.15
+WINDOW_FRACTION = 16
+
+MAX_SKEW_DEGREES = 5.0
+SKEW_STEP_DEGREES = 0.25
+SKEW_SAMPLE_POINTS = 20000
+
+
+def load_image(image: ImageInput) -> Image.Image:
+    """Open bytes, a file path or a PIL image, applying any EXIF rotation."""
+    if isinstance(image, bytes):
+        image = Image.open(io.BytesIO(image))
+    elif not isinstance(image, Image.Image):
+        image = Image.open(image)
+    return ImageOps.exif_transpose(image)
+
+
+def to_grayscale(image: Image.Image) -> np.ndarray:
+    """Return the ITU-R 601 luma of an image as a float32 array."""
+    pixels = np.asarray(image.convert("RGB"), dtype=np.float32)
+    return pixels @ np.array([0.299, 0.587, 0.114], dtype=np.float32)
+
+
+def downscale_to_dpi(
+    image: Image.Image, dpi: Optional[float] = None, target_dpi: int = TARGET_DPI
+) -> Image.Image:
+    """
+    Shrink an image scanned or photographed above ``target_dpi``; never upscale.
+
+    The resolution is the larger of the metadata DPI and the width of an A4
+    page, so a photo tagged 72 dpi is still treated as the page it shows.
+    """
+    width, height = image.size
+    dpi = max(dpi or 0, width / PAGE_WIDTH_INCHES)
+    scale = target_dpi / dpi
+    if scale >= 1:
+        return image
+    size = (max(1, round(width * scale)), max(1, round(height * scale)))
+    return image.resize(size, Image.BILINEAR)
+
+
+def adaptive_binarize(gray: np.ndarray, threshold: float = THRESHOLD) -> np.ndarray:
+    """
+    Binarize with Bradley's adaptive threshold using an integral image.
+
+    Local means make the result robust to the uneven lighting of phone photos,
+    where a single global threshold loses whole regions of the page.
+
+    Returns:
+        np.ndarray: Boolean array, True where there is ink.
+    """
+    height, width = gray.shape
+    half = max(1, width // WINDOW_FRACTION // 2)
+    rows = np.arange(height)
+    cols = np.arange(width)
+    top = np.clip(rows - half, 0, height)
+    bottom = np.clip(rows + half + 1, 0, height)
+    left = np.clip(cols - half, 0, width)
+    right = np.clip(cols + half + 1, 0, width)
+
+    # Box sums are separable: horizontal window sums first, then vertical
+    across = np.pad(gray.astype(np.float64).cumsum(axis=1), ((0, 0), (1, 0)))
+    across = across[:, right] - across[:, left]
+    down = np.pad(across.cumsum(axis=0), ((1, 0), (0, 0)))
+    window_sum = down[bottom] - down[top]
+
+    area = np.outer(bottom - top, right - left)
+    return gray * area < window_sum * (1 - threshold)
+
+
+def estimate_skew(
+    ink: np.ndarray,
+    max_degrees: float = MAX_SKEW_DEGREES,
+    step: float = SKEW_STEP_DEGREES,
+) -> float:
+    """
+    Estimate the text rotation in degrees by projection profile.
+
+    Ink pixels are projected onto the vertical axis at each candidate angle;
+    the angle whose row histogram is sharpest (text lines fall into few rows)
+    wins. All angles are evaluated at once on a sample of the ink pixels.
+    """
+    ys, xs = np.nonzero(ink)
+    if len(ys) < 100:
+        return 0.0
+    if len(ys) > SKEW_SAMPLE_POINTS:
+        picked = np.random.default_rng(0).choice(
+            len(ys), SKEW_SAMPLE_POINTS, replace=False
+        )
+        ys, xs = ys[picked], xs[picked]
+
+    angles = np.arange(-max_degrees, max_degrees + step / 2, step)
+    radians = np.deg2rad(angles)
+    # Row of every sampled pixel under every candidate rotation: (angles, points)
+    projected = np.outer(np.cos(radians), ys) - np.outer(np.sin(radians), xs)
+    projected = np.round(projected - projected.min(axis=1, keepdims=True)).astype(
+        np.int64
+    )
+
+    rows = projected.max() + 1
+    offsets = (np.arange(len(angles)) * rows)[:, None]
+    histograms = np.bincount(
+        (projected + offsets).ravel(), minlength=len(angles) * rows
+    )
+    scores = (histograms.reshape(len(angles), rows).astype(np.float64) ** 2).sum(axis=1)
+    return float(angles[np.argmax(scores)])
+
+
+def preprocess(image: ImageInput, target_dpi: int = TARGET_DPI) -> Image.Image:
+    """
+    Prepare a page for tesseract: grayscale, downscale, binarize and deskew.
+
+    Args:
+        image (bytes, str or PIL.Image.Image): The image data, path or image.
+        target_dpi (int): Resolution to downscale larger images to. Defaults to 300.
+
+    Returns:
+        PIL.Image.Image: A black-on-white, deskewed 8-bit image.
+    """
+    image = load_image(image)
+    dpi = image.info.get("dpi", (None,))[0]
+    # Downscale first so every array operation below works on fewer pixels
+    gray = to_grayscale(downscale_to_dpi(image, dpi, target_dpi))
+    ink = adaptive_binarize(gray)
+
+    page = Image.fromarray(np.where(ink, 0, 255).astype(np.uint8), mode="L")
+    angle = estimate_skew(ink)
+    if abs(angle) >= SKEW_STEP_DEGREES:
+        page = page.rotate(angle, resample=Image.NEAREST, expand=True, fillcolor=255)
+    return page
+
+
+def ocr_image(image: ImageInput, config: str = TESSERACT_CONFIG) -> str:
+    """Preprocess an image in memory and run tesseract on it."""
+    import pytesseract
+
+    return pytesseract.image_to_string(preprocess(image), config=config)
+
+
+def _ocr_page(data: bytes) -> str:
+    # Runs in a worker process; returns errors as text like ocr() does
+    try:
+        return ocr_image(data)
+    except Exception as e:
+        return f"Error: {e}"
+
+
+def ocr_pages(images: List[ImageInput], max_workers: Optional[int] = None) -> List[str]:
+    """
+    OCR several pages, in parallel worker processes when there is more than one.
+
+    Both preprocessing and tesseract are CPU-bound, so pages are spread across
+    processes rather than threads. Results are returned in input order.
+
+    Args:
+        images (list): Page images as bytes, file paths or PIL images.
+        max_workers (int, optional): Process count. Defaults to min(4, CPU count).
+
+    Returns:
+        list: The text of each page, or an "Error: ..." string for failed pages.
+    """
+    if len(images) <= 1:
+        return [_ocr_page(image) for image in images]
+
+    # PIL images are sent to workers as PNG bytes
+    payloads = []
+    for image in images:
+        if isinstance(image, Image.Image):
+            buffer = io.BytesIO()
+            image.save(buffer, format="PNG")
+            image = buffer.getvalue()
+        payloads.append(image)
+
+    max_workers = max_workers or min(4, os.cpu_count() or 1, len(images))
+    # Forked children of the multithreaded Streamlit server can deadlock on
+    # locks held by its other threads; start clean interpreters instead
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=context) as pool:
+        return list(pool.map(_ocr_page, payloads))
@@ -0,0 +1,107 @@
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Iterator, List, Optional
+
+from tools.cache import LRUCache
+from tools.llm_utils import LLMClient, is_error_response
+from tools.scheduler import capture_context, use_context
+from tools.text_utils import chunk_text, estimate_tokens, split_paragraphs
+
+SYSTEM_PROMPT = "I want to improve my English. I want you act as a proofreader. I will provide you texts and I would like you to review them for any spelling, grammar, or punctuation errors. Just correct the mistakes in my text by changing them to the corrected one."
+USER_PROMPT = "This is the input text in the triple backticks: ```{text}``` \n Only give me the corrected version of the input text in the triple backticks."
+
+# Corrected chunks from earlier runs, keyed by chunk content hash
+_corrections = LRUCache(max_entries=2048, ttl=24 * 3600)
+
+
+@dataclass
+class ProofreadChunk:
+    index: int
+    original: str
+    corrected: str
+    cached: bool = False
+    error: Optional[str] = None
+
+
+def split_document(text: str, chunk_tokens: int = 600) -> List[str]:
+    """
+    Group paragraphs into chunks of roughly ``chunk_tokens`` tokens.
+
+    Chunks never cut through a paragraph unless the paragraph alone is over
+    budget, in which case it is split at sentence boundaries.
+    """
+    chunks, current, current_tokens = [], [], 0
+    for paragraph in split_paragraphs(text):
+        tokens = estimate_tokens(paragraph)
+        if tokens > chunk_tokens:
+            if current:
+                chunks.append("\n\n".join(current))
+                current, current_tokens = [], 0
+            chunks.extend(chunk_text(paragraph, chunk_tokens))
+            continue
+        if current and current_tokens + tokens > chunk_tokens:
+            chunks.append("\n\n".join(current))
+            current, current_tokens = [], 0
+        current.append(paragraph)
+        current_tokens += tokens
+    if current:
+        chunks.append("\n\n".join(current))
+    return chunks
+
+
+def _chunk_key(chunk: str) -> str:
+    return hashlib.sha256(chunk.encode("utf-8")).hexdigest()
+
+
+def proofread_chunks(
+    text: str,
+    llm_client: Optional[LLMClient] = None,
+    max_concurrency: int = 4,
+    chunk_tokens: int = 600,
+) -> Iterator[ProofreadChunk]:
+    """
+    Proofread a long document chunk by chunk.
+
+    Chunks seen in earlier runs are answered from a local hash cache without an
+    LLM call; the rest are proofread concurrently. Results are yielded in
+    document order as soon as each one (and everything before it) is ready.
+
+    Args:
+        text (str): The document.
+        llm_client (LLMClient, optional): Client to use. Defaults to a new LLMClient.
+        max_concurrency (int): Maximum chunks in flight. Defaults to 4.
+        chunk_tokens (int): Approximate chunk size in tokens. Defaults to 600.
+
+    Yields:
+        ProofreadChunk: One result per chunk, in order.
+    """
+    llm_client = llm_client or LLMClient()
+    chunks = split_document(text, chunk_tokens)
+    # Worker threads schedule their requests under the caller's session
+    context = capture_context()
+
+    def run(index: int, chunk: str) -> ProofreadChunk:
+        with use_context(context):
+            response = llm_client.generate_text(
+                SYSTEM_PROMPT, USER_PROMPT.format(text=chunk)
+            )
+        if not response or is_error_response(response):
+            # Keep the original text so the document stays complete
+            return ProofreadChunk(
+                index, chunk, chunk, error=response or "Empty response"
+            )
+        corrected = llm_client.remove_triple_backticks(response)
+        _corrections.set(_chunk_key(chunk), corrected)
+        return ProofreadChunk(index, chunk, corrected)
+
+    with ThreadPoolExecutor(max_workers=max_concurrency) as pool:
+        pending = []
+        for index, chunk in enumerate(chunks):
+            cached = _corrections.get(_chunk_key(chunk))
+            if cached is not None:
+                pending.append(ProofreadChunk(index, chunk, cached, cached=True))
+            else:
+                pending.append(pool.submit(run, index, chunk))
+        for item in pending:
+            yield item if isinstance(item, ProofreadChunk) else item.result()
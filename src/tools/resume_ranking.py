@@ -0,0 +1,85 @@
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from tools.retrieval import tokenize
+
+# Share of the final score taken by TF-IDF similarity; the rest is keyword coverage
+SIMILARITY_WEIGHT = 0.6
+KEYWORDS = 30
+
+
+@dataclass
+class ResumeScore:
+    name: str
+    text: str
+    score: float
+    similarity: float
+    coverage: float
+    matched: List[str] = field(default_factory=list)
+    missing: List[str] = field(default_factory=list)
+
+
+def _weights(counts: Counter, idf: Dict[str, float]) -> Dict[str, float]:
+    # Sublinear term frequency, so a keyword repeated ten times is not ten times better
+    return {term: (1 + np.log(tf)) * idf[term] for term, tf in counts.items()}
+
+
+def rank_resumes(
+    job_description: str, resumes: List[Tuple[str, str]], keywords: int = KEYWORDS
+) -> List[ResumeScore]:
+    """
+    Score resumes against a job description without calling the LLM.
+
+    The score mixes TF-IDF cosine similarity (IDF taken over the resume pool)
+    with the share of the job description's top keywords each resume mentions.
+
+    Args:
+        job_description (str): The job description.
+        resumes (list): (name, text) pairs.
+        keywords (int): Number of job keywords used for coverage. Defaults to 30.
+
+    Returns:
+        list: ResumeScore objects, best match first. Scores are in [0, 1].
+    """
+    job_counts = Counter(tokenize(job_description))
+    resume_counts = [Counter(tokenize(text)) for _, text in resumes]
+
+    documents = len(resumes) + 1
+    document_frequency = Counter(job_counts.keys())
+    for counts in resume_counts:
+        document_frequency.update(counts.keys())
+    idf = {
+        term: float(np.log((1 + documents) / (1 + df)) + 1)
+        for term, df in document_frequency.items()
+    }
+
+    job_weights = _weights(job_counts, idf)
+    job_norm = np.sqrt(sum(w * w for w in job_weights.values())) or 1.0
+    top_keywords = sorted(job_weights, key=job_weights.get, reverse=True)[:keywords]
+
+    scores = []
+    for (name, text), counts in zip(resumes, resume_counts):
+        weights = _weights(counts, idf)
+        norm = np.sqrt(sum(w * w for w in weights.values())) or 1.0
+        dot = sum(w * weights[t] for t, w in job_weights.items() if t in weights)
+        similarity = float(dot / (job_norm * norm))
+
+        matched = [t for t in top_keywords if t in counts]
+        missing = [t for t in top_keywords if t not in counts]
+        coverage = len(matched) / len(top_keywords) if top_keywords else 0.0
+        scores.append(
+            ResumeScore(
+                name=name,
+                text=text,
+                score=SIMILARITY_WEIGHT * similarity
+                + (1 - SIMILARITY_WEIGHT) * coverage,
+                similarity=similarity,
+                coverage=coverage,
+                matched=matched,
+                missing=missing,
+            )
+        )
+    return sorted(scores, key=lambda s: s.score, reverse=True)
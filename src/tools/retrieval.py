@@ -0,0 +1,132 @@
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List
+
+import numpy as np
+
+from tools.text_utils import chunk_text
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+STOPWORDS = frozenset(
+    "a an and are as at be but by for from has have in is it its of on or that the "
+    "this to was were will with what which who how when where why do does did can i you".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens with common English stopwords removed."""
+    return [t for t in _TOKEN.findall(text.lower()) if t not in STOPWORDS]
+
+
+@dataclass
+class Chunk:
+    id: int
+    text: str
+
+
+@dataclass
+class SearchResult:
+    chunk: Chunk
+    score: float
+
+
+class BM25Index:
+    """
+    Okapi BM25 index over a list of text chunks, stored as NumPy postings arrays.
+
+    Postings are kept sorted by term id, so a query only touches the slices for
+    its own terms instead of a dense chunk x vocabulary matrix.
+    """
+
+    def __init__(self, chunks: List[str], k1: float = 1.5, b: float = 0.75):
+        self.chunks = [Chunk(i + 1, text) for i, text in enumerate(chunks)]
+        self.k1 = k1
+        self.b = b
+
+        self.vocab: Dict[str, int] = {}
+        doc_ids, term_ids = [], []
+        lengths = np.zeros(len(chunks), dtype=np.float32)
+        for doc, text in enumerate(chunks):
+            tokens = tokenize(text)
+            lengths[doc] = len(tokens)
+            for token in tokens:
+                term_ids.append(self.vocab.setdefault(token, len(self.vocab)))
+                doc_ids.append(doc)
+
+        # Collapse repeated (term, doc) pairs into term frequencies
+        pairs = np.array(term_ids, dtype=np.int64) * max(len(chunks), 1) + np.array(
+            doc_ids, dtype=np.int64
+        )
+        unique, tf = np.unique(pairs, return_counts=True)
+        self.post_terms = unique // max(len(chunks), 1)
+        self.post_docs = unique % max(len(chunks), 1)
+        self.post_tf = tf.astype(np.float32)
+        self.term_starts = np.searchsorted(
+            self.post_terms, np.arange(len(self.vocab) + 1)
+        )
+
+        df = np.diff(self.term_starts).astype(np.float32)
+        n = len(chunks)
+        self.idf = np.log1p((n - df + 0.5) / (df + 0.5))
+        avg_length = lengths.mean() if n else 0.0
+        self.length_norm = k1 * (1 - b + b * lengths / (avg_length or 1.0))
+
+    def search(self, query: str, top_k: int = 4) -> List[SearchResult]:
+        """
+        Return the ``top_k`` chunks most relevant to ``query``.
+
+        Chunks with no query term in common are never returned.
+        """
+        scores = np.zeros(len(self.chunks), dtype=np.float32)
+        for term in set(tokenize(query)):
+            term_id = self.vocab.get(term)
+            if term_id is None:
+                continue
+            start, end = self.term_starts[term_id], self.term_starts[term_id + 1]
+            docs = self.post_docs[start:end]
+            tf = self.post_tf[start:end]
+            scores[docs] += (
+                self.idf[term_id] * tf * (self.k1 + 1) / (tf + self.length_norm[docs])
+            )
+
+        k = min(top_k, int(np.count_nonzero(scores)))
+        if k == 0:
+            return []
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best])]
+        return [SearchResult(self.chunks[i], float(scores[i])) for i in best]
+
+
+class DocumentIndexCache:
+    """Process-wide LRU of BM25 indexes keyed by document content hash."""
+
+    def __init__(self, max_documents: int = 32, chunk_tokens: int = 300):
+        self.max_documents = max_documents
+        self.chunk_tokens = chunk_tokens
+        self._indexes: "OrderedDict[str, BM25Index]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def document_hash(text: str) -> str:
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def get(self, text: str) -> BM25Index:
+        """Return the index for ``text``, building it on first use."""
+        key = self.document_hash(text)
+        with self._lock:
+            index = self._indexes.get(key)
+            if index is not None:
+                self._indexes.move_to_end(key)
+                return index
+        index = BM25Index(chunk_text(text, self.chunk_tokens))
+        with self._lock:
+            self._indexes[key] = index
+            while len(self._indexes) > self.max_documents:
+                self._indexes.popitem(last=False)
+        return index
+
+
+document_indexes = DocumentIndexCache()
@@ -0,0 +1,333 @@
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, replace
+from typing import Any, Callable, Dict, Generator, List, Optional, Tuple
+
+from tools.metrics import quantile
+
+# Request classes, most urgent first
+PRIORITY_INTERACTIVE = 0
+PRIORITY_TOOL = 1
+PRIORITY_BATCH = 2
+PRIORITY_NAMES = {
+    PRIORITY_INTERACTIVE: "interactive",
+    PRIORITY_TOOL: "tool",
+    PRIORITY_BATCH: "batch",
+}
+
+# Upstream requests allowed per provider; 0 (the default) disables admission control
+DEFAULT_RATE_PER_MINUTE = float(os.environ.get("AI_ALCHEMY_RATE_PER_MINUTE", 0))
+DEFAULT_BURST = float(os.environ.get("AI_ALCHEMY_RATE_BURST", 10))
+# A queued request moves up one priority class for every this many seconds waited
+DEFAULT_AGING_SECONDS = 30.0
+
+
+def current_session() -> Optional[str]:
+    """Id of the Streamlit session running on this thread, if any."""
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+    except ImportError:
+        return None
+    ctx = get_script_run_ctx(suppress_warning=True)
+    return ctx.session_id if ctx is not None else None
+
+
+@dataclass(frozen=True)
+class RequestContext:
+    """
+    Scheduling details for the LLM calls made on a thread.
+
+    Unset fields fall back to the client's priority and the current Streamlit
+    session. ``on_wait`` is called with the estimated queue position and wait
+    in seconds while a request is queued.
+    """
+
+    priority: Optional[int] = None
+    session: Optional[str] = None
+    on_wait: Optional[Callable[[int, float], None]] = None
+
+
+_context = threading.local()
+
+
+def queue_message(position: int, wait: float) -> str:
+    """Human-readable queue status for an ``on_wait`` callback."""
+    return f"⏳ Busy right now: you are #{position} in the queue (about {max(1, round(wait))}s)"
+
+
+def current_context() -> RequestContext:
+    return getattr(_context, "value", None) or RequestContext()
+
+
+@contextmanager
+def request_context(
+    priority: Optional[int] = None,
+    session: Optional[str] = None,
+    on_wait: Optional[Callable[[int, float], None]] = None,
+) -> Generator[RequestContext, None, None]:
+    """
+    Set the priority, session or queue callback for LLM calls made in this block.
+
+    Fields left as None are inherited from an enclosing block. Worker threads
+    do not inherit the context; capture ``current_context()`` and re-enter it
+    with ``use_context`` there.
+    """
+    outer = current_context()
+    changes = {
+        name: value
+        for name, value in (
+            ("priority", priority),
+            ("session", session),
+            ("on_wait", on_wait),
+        )
+        if value is not None
+    }
+    with use_context(replace(outer, **changes)) as context:
+        yield context
+
+
+def capture_context(default_priority: Optional[int] = None) -> RequestContext:
+    """
+    Snapshot this thread's request context for a worker thread to ``use_context``.
+
+    The Streamlit session is resolved now, since worker threads have none.
+    ``on_wait`` is dropped: it usually updates the calling page, which worker
+    threads cannot do.
+
+    Args:
+        default_priority (int, optional): Priority used if the context sets none.
+    """
+    context = current_context()
+    return RequestContext(
+        priority=default_priority if context.priority is None else context.priority,
+        session=context.session or current_session(),
+    )
+
+
+@contextmanager
+def use_context(context: RequestContext) -> Generator[RequestContext, None, None]:
+    outer = getattr(_context, "value", None)
+    _context.value = context
+    try:
+        yield context
+    finally:
+        _context.value = outer
+
+
+class TokenBucket:
+    """Allows ``rate`` requests per second on average, with bursts of up to ``burst``."""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self._updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def available(self, now: float) -> bool:
+        self._refill(now)
+        return self.tokens >= 1
+
+    def take(self, now: float) -> None:
+        self._refill(now)
+        self.tokens -= 1
+
+    def time_until(self, tokens: float, now: float) -> float:
+        """Seconds until ``tokens`` tokens will have accumulated."""
+        self._refill(now)
+        return max(0.0, (tokens - self.tokens) / self.rate)
+
+
+@dataclass
+class _Ticket:
+    provider: str
+    priority: int
+    session: str
+    tag: float
+    seq: int
+    enqueued: float
+
+    def key(self, now: float, aging_seconds: float):
+        boost = int((now - self.enqueued) // aging_seconds) if aging_seconds else 0
+        return (self.priority - boost, self.tag, self.seq)
+
+
+class AdmissionScheduler:
+    """
+    Process-wide admission control for upstream LLM requests.
+
+    Each provider gets a token bucket of ``rate_per_minute`` requests with
+    bursts of up to ``burst``. While a bucket is empty, requests for that
+    provider queue up and are admitted one per refilled token:
+
+    - by priority (interactive chat before single-shot tools before batch jobs),
+      with queued requests moving up a class every ``aging_seconds`` so batch
+      jobs are delayed but never starved;
+    - within a priority, round-robin across sessions (start-time fair
+      queueing), so one session's bulk job cannot crowd out another session.
+
+    Requests for a provider with tokens left never wait behind another
+    provider's queue.
+    """
+
+    def __init__(
+        self,
+        rate_per_minute: float = DEFAULT_RATE_PER_MINUTE,
+        burst: float = DEFAULT_BURST,
+        aging_seconds: float = DEFAULT_AGING_SECONDS,
+    ):
+        self.rate_per_minute = rate_per_minute
+        self.burst = burst
+        self.aging_seconds = aging_seconds
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._queue: List[_Ticket] = []
+        self._cond = threading.Condition()
+        self._seq = 0
+        self._virtual_time = 0.0
+        self._session_tags: Dict[str, float] = {}
+        self._admitted = {priority: 0 for priority in PRIORITY_NAMES}
+        self._waits: deque = deque(maxlen=1024)
+
+    @property
+    def enabled(self) -> bool:
+        return self.rate_per_minute > 0
+
+    def _bucket(self, provider: str) -> TokenBucket:
+        bucket = self._buckets.get(provider)
+        if bucket is None:
+            bucket = self._buckets[provider] = TokenBucket(
+                self.rate_per_minute / 60, self.burst
+            )
+        return bucket
+
+    def _next(self, now: float) -> Optional[_Ticket]:
+        """The best queued ticket whose provider has a token, if any."""
+        eligible = [t for t in self._queue if self._bucket(t.provider).available(now)]
+        if not eligible:
+            return None
+        return min(eligible, key=lambda t: t.key(now, self.aging_seconds))
+
+    def _estimate(self, ticket: _Ticket, now: float) -> Tuple[int, float]:
+        key = ticket.key(now, self.aging_seconds)
+        position = 1 + sum(
+            1
+            for other in self._queue
+            if other.provider == ticket.provider
+            and other.key(now, self.aging_seconds) < key
+        )
+        return position, self._bucket(ticket.provider).time_until(position, now)
+
+    def admit(
+        self,
+        provider: str,
+        priority: int = PRIORITY_TOOL,
+        session: Optional[str] = None,
+        on_wait: Optional[Callable[[int, float], None]] = None,
+    ) -> float:
+        """
+        Block until a request to ``provider`` may be sent.
+
+        Args:
+            provider (str): Rate-limit key, e.g. the g4f provider name.
+            priority (int): One of the PRIORITY_* classes. Defaults to PRIORITY_TOOL.
+            session (str, optional): Caller's session, for fairness between sessions.
+            on_wait (callable, optional): Called with the estimated queue position
+                and wait in seconds when the request is queued and whenever its
+                position changes. Not called for requests admitted right away.
+
+        Returns:
+            float: Seconds spent queued.
+        """
+        if not self.enabled:
+            return 0.0
+        session = session or "anonymous"
+        with self._cond:
+            now = time.monotonic()
+            # Start-time fair queueing: a session's next request is tagged one
+            # unit after its previous one, so sessions take turns
+            tag = max(self._virtual_time, self._session_tags.get(session, 0.0))
+            self._session_tags[session] = tag + 1
+            self._seq += 1
+            ticket = _Ticket(provider, priority, session, tag, self._seq, now)
+            self._queue.append(ticket)
+            reported = None
+            try:
+                while True:
+                    now = time.monotonic()
+                    best = self._next(now)
+                    if best is ticket:
+                        self._bucket(provider).take(now)
+                        break
+                    if best is not None:
+                        self._cond.notify_all()
+                    position, wait = self._estimate(ticket, now)
+                    if on_wait is not None and position != reported:
+                        reported = position
+                        self._cond.release()
+                        try:
+                            on_wait(position, wait)
+                        finally:
+                            self._cond.acquire()
+                        continue
+                    self._cond.wait(timeout=min(1.0, max(0.01, wait)))
+            finally:
+                self._queue.remove(ticket)
+                self._cond.notify_all()
+            self._virtual_time = max(self._virtual_time, ticket.tag)
+            if len(self._session_tags) > 256:
+                # Sessions at or behind virtual time are tagged from it anyway
+                self._session_tags = {
+                    s: t
+                    for s, t in self._session_tags.items()
+                    if t > self._virtual_time
+                }
+            waited = now - ticket.enqueued
+            self._admitted[priority] = self._admitted.get(priority, 0) + 1
+            self._waits.append((priority, waited))
+            return waited
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth, admissions and recent queue waits per priority class."""
+        with self._cond:
+            now = time.monotonic()
+            queued = list(self._queue)
+            waits = list(self._waits)
+            rows = []
+            for priority, name in PRIORITY_NAMES.items():
+                waiting = sorted(w for p, w in waits if p == priority)
+                rows.append(
+                    {
+                        "priority": name,
+                        "queued": sum(t.priority == priority for t in queued),
+                        "oldest_wait": max(
+                            (
+                                now - t.enqueued
+                                for t in queued
+                                if t.priority == priority
+                            ),
+                            default=0.0,
+                        ),
+                        "admitted": self._admitted.get(priority, 0),
+                        "wait_p50": quantile(waiting, 0.5) if waiting else None,
+                        "wait_p95": quantile(waiting, 0.95) if waiting else None,
+                    }
+                )
+            return {
+                "enabled": self.enabled,
+                "queued": len(queued),
+                "tokens": {
+                    name: round(min(b.burst, b.tokens + (now - b._updated) * b.rate), 2)
+                    for name, b in sorted(self._buckets.items())
+                },
+                "priorities": rows,
+            }
+
+
+# Process-wide scheduler shared by every LLMClient and every Streamlit session
+llm_scheduler = AdmissionScheduler()
@@ -0,0 +1,196 @@
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Generator, Iterable, List, Optional, Tuple
+
+
+class SharedStream:
+    """
+    One upstream chunk stream, buffered and fanned out to any number of subscribers.
+
+    The caller that starts the stream opens the upstream on its own thread (so
+    it waits for admission and the first token like a plain request), then a
+    background thread drains it into a buffer. Every subscriber iterates the
+    buffer from the start, so late joiners first replay what has already
+    arrived and then follow the live stream. When the last subscriber stops
+    early, the upstream is closed.
+    """
+
+    def __init__(self, on_done: Optional[Callable[[], None]] = None):
+        self._on_done = on_done
+        self._chunks: List[Any] = []
+        self._done = False
+        self._error: Optional[BaseException] = None
+        self._cancelled = False
+        self._subscribers = 0
+        self._changed = threading.Condition()
+
+    @property
+    def subscribers(self) -> int:
+        return self._subscribers
+
+    def run(self, start: Callable[[], Iterable[Any]]) -> None:
+        """Open the upstream on this thread and drain it in the background."""
+        try:
+            response = start()
+        except Exception as e:
+            self._finish(e)
+            return
+        threading.Thread(
+            target=self._pump,
+            args=(response,),
+            name="single-flight-stream",
+            daemon=True,
+        ).start()
+
+    def _pump(self, response: Iterable[Any]) -> None:
+        error = None
+        try:
+            for chunk in response:
+                with self._changed:
+                    if self._cancelled:
+                        break
+                    self._chunks.append(chunk)
+                    self._changed.notify_all()
+        except Exception as e:
+            error = e
+        finally:
+            close = getattr(response, "close", None)
+            if close is not None:
+                close()
+            self._finish(error)
+
+    def _finish(self, error: Optional[BaseException]) -> None:
+        with self._changed:
+            self._error = error
+            self._done = True
+            self._changed.notify_all()
+        if self._on_done is not None:
+            self._on_done()
+
+    def join(self) -> bool:
+        """Register a subscriber; False if the stream was already abandoned."""
+        with self._changed:
+            if self._cancelled:
+                return False
+            self._subscribers += 1
+            return True
+
+    def subscribe(self) -> Generator:
+        """Iterate the stream from its first chunk. Call ``join`` first."""
+        position = 0
+        try:
+            while True:
+                with self._changed:
+                    while position >= len(self._chunks) and not self._done:
+                        self._changed.wait()
+                    if position < len(self._chunks):
+                        chunk = self._chunks[position]
+                    elif self._error is not None:
+                        raise self._error
+                    else:
+                        return
+                position += 1
+                yield chunk
+        finally:
+            with self._changed:
+                self._subscribers -= 1
+                if self._subscribers == 0 and not self._done:
+                    self._cancelled = True
+
+
+class SingleFlight:
+    """
+    Collapse concurrent identical requests into one upstream call.
+
+    Requests are identified by a key (the response cache key for LLM calls).
+    While a call for a key is in flight, further callers with the same key wait
+    for its result, or subscribe to its stream, instead of starting their own.
+    Once the call completes the key is released, so later requests go to the
+    response cache or upstream as usual.
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, Future] = {}
+        self._streams: Dict[str, SharedStream] = {}
+        self._lock = threading.Lock()
+        self.leaders = 0
+        self.followers = 0
+
+    def call(self, key: str, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        Run ``fn`` once for all concurrent callers with the same key.
+
+        Returns:
+            tuple: The result and whether this caller shared another caller's call.
+
+        Raises:
+            Exception: Whatever ``fn`` raised, in every caller.
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            shared = future is not None
+            if shared:
+                self.followers += 1
+            else:
+                future = self._calls[key] = Future()
+                self.leaders += 1
+        if shared:
+            return future.result(), True
+
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+    def stream(
+        self, key: str, start: Callable[[], Iterable[Any]]
+    ) -> Tuple[Generator, bool]:
+        """
+        Subscribe to the in-flight stream for ``key``, starting it if there is none.
+
+        The caller that starts the stream blocks until ``start`` returns; callers
+        joining in the meantime wait for its first chunk.
+
+        Args:
+            key (str): Identifies identical requests.
+            start (callable): Starts the upstream request and returns its chunks.
+
+        Returns:
+            tuple: A chunk generator for this caller and whether it joined another
+            caller's stream.
+        """
+        with self._lock:
+            stream = self._streams.get(key)
+            if stream is not None and stream.join():
+                self.followers += 1
+                return stream.subscribe(), True
+
+            def release() -> None:
+                with self._lock:
+                    if self._streams.get(key) is stream:
+                        del self._streams[key]
+
+            stream = self._streams[key] = SharedStream(on_done=release)
+            stream.join()
+            self.leaders += 1
+        stream.run(start)
+        return stream.subscribe(), False
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "upstream_calls": self.leaders,
+                "shared_calls": self.followers,
+                "in_flight": len(self._calls) + len(self._streams),
+            }
+
+
+# Process-wide table shared by every LLMClient and every Streamlit session
+llm_flights = SingleFlight()
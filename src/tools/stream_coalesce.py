@@ -0,0 +1,119 @@
+import time
+from typing import AsyncIterable, AsyncGenerator, Generator, Iterable, List, Optional
+
+# Fraction of wall time the consumer may spend rendering; the flush window
+# grows with the measured render cost to stay under it
+RENDER_SHARE = 0.2
+
+
+class DeltaCoalescer:
+    """
+    Merge small stream deltas into fewer, larger chunks for rendering.
+
+    ``st.write_stream`` re-sends the whole accumulated markdown for every chunk
+    it receives, so one- or two-character g4f deltas make rendering cost grow
+    quadratically with the answer length. The coalescer releases buffered text
+    when:
+
+    - it is the first delta (time to first token is never delayed),
+    - the buffer reaches ``max_chars``,
+    - a line or markdown block ends and ``min_window`` has passed, or
+    - the current window has passed.
+
+    The window adapts to how long the consumer takes to render each chunk
+    (reported through ``record_render``), between ``min_window`` and
+    ``max_window`` seconds. Buffered text is released when the next delta
+    arrives or the stream ends, so only an upstream stall can hold it back.
+    """
+
+    def __init__(
+        self,
+        min_window: float = 0.05,
+        max_window: float = 0.5,
+        max_chars: int = 512,
+        render_share: float = RENDER_SHARE,
+    ):
+        self.min_window = min_window
+        self.max_window = max_window
+        self.max_chars = max_chars
+        self.render_share = render_share
+        self.window = min_window
+        self.render_cost: Optional[float] = None
+        self.deltas = 0
+        self.flushes = 0
+        self._buffer: List[str] = []
+        self._size = 0
+        self._last_flush: Optional[float] = None
+
+    def push(self, delta: str, now: Optional[float] = None) -> Optional[str]:
+        """Add a delta; return the text to render now, or None to keep buffering."""
+        if not delta:
+            return None
+        now = time.perf_counter() if now is None else now
+        self.deltas += 1
+        self._buffer.append(delta)
+        self._size += len(delta)
+
+        if self._last_flush is None or self._size >= self.max_chars:
+            return self._flush(now)
+        elapsed = now - self._last_flush
+        if elapsed >= self.window or (elapsed >= self.min_window and "\n" in delta):
+            return self._flush(now)
+        return None
+
+    def flush(self) -> Optional[str]:
+        """Return whatever is still buffered, e.g. when the stream ends."""
+        return self._flush(time.perf_counter()) if self._buffer else None
+
+    def record_render(self, seconds: float) -> None:
+        """Report how long the consumer spent on the last chunk."""
+        if self.render_cost is None:
+            self.render_cost = seconds
+        else:
+            self.render_cost = 0.7 * self.render_cost + 0.3 * seconds
+        target = self.render_cost * (1 - self.render_share) / self.render_share
+        self.window = min(self.max_window, max(self.min_window, target))
+
+    def _flush(self, now: float) -> str:
+        text = "".join(self._buffer)
+        self._buffer = []
+        self._size = 0
+        self._last_flush = now
+        self.flushes += 1
+        return text
+
+
+def coalesce_deltas(deltas: Iterable[str], **options) -> Generator[str, None, None]:
+    """
+    Wrap a text delta stream for rendering with ``st.write_stream``.
+
+    The joined output is identical to the input; only the chunking changes.
+    Render cost is measured as the time the consumer takes to ask for the next
+    chunk. Options are passed to DeltaCoalescer.
+    """
+    coalescer = DeltaCoalescer(**options)
+    for delta in deltas:
+        text = coalescer.push(delta)
+        if text:
+            yielded = time.perf_counter()
+            yield text
+            coalescer.record_render(time.perf_counter() - yielded)
+    text = coalescer.flush()
+    if text:
+        yield text
+
+
+async def acoalesce_deltas(
+    deltas: AsyncIterable[str], **options
+) -> AsyncGenerator[str, None]:
+    """Async counterpart of coalesce_deltas, for AsyncLLMClient streams."""
+    coalescer = DeltaCoalescer(**options)
+    async for delta in deltas:
+        text = coalescer.push(delta)
+        if text:
+            yielded = time.perf_counter()
+            yield text
+            coalescer.record_render(time.perf_counter() - yielded)
+    text = coalescer.flush()
+    if text:
+        yield text
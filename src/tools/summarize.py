@@ -0,0 +1,157 @@
+import hashlib
+from typing import Callable, Dict, Generator, List, Optional
+
+from tools.cache import LRUCache, replay_stream
+from tools.llm_utils import LLMClient
+from tools.text_utils import chunk_text, estimate_tokens
+
+LENGTH_INSTRUCTIONS: Dict[str, str] = {
+    "short": "Write a short summary of 2-3 sentences.",
+    "medium": "Write a concise summary of one or two paragraphs.",
+    "detailed": "Write a detailed summary that covers every key point, using bullet points where helpful.",
+}
+
+# The map prompt deliberately ignores the length target so chunk summaries can be
+# reused when the same text is summarized again at a different length.
+MAP_PROMPT = (
+    "You are a helpful assistant that summarizes part of a longer {kind}. "
+    "Summarize this section, keeping every important fact, name and number. "
+    "Do not add an introduction or conclusion."
+)
+COMBINE_PROMPT = (
+    "You are a helpful assistant that merges partial summaries of a longer {kind} "
+    "into a single coherent summary without repeating points."
+)
+FINAL_PROMPT = (
+    "You are a helpful assistant that creates summaries of a {kind}. "
+    "The text below may be a set of section summaries of the full {kind}. {length}"
+)
+
+_shared_map_cache = LRUCache(max_entries=1024, ttl=24 * 3600)
+
+
+class MapReduceSummarizer:
+    """
+    Summarize arbitrarily long text by chunking, parallel mapping and hierarchical reduction.
+
+    Texts that fit in one chunk are summarized with a single streamed call. Longer
+    texts are split into sentence-aligned chunks, summarized in parallel, and the
+    partial summaries are merged level by level until they fit in one prompt; only
+    that final reduce step is streamed.
+    """
+
+    def __init__(
+        self,
+        llm_client: Optional[LLMClient] = None,
+        chunk_tokens: int = 2000,
+        max_concurrency: int = 4,
+        map_cache: Optional[LRUCache] = None,
+        max_levels: int = 4,
+    ):
+        self.llm_client = llm_client or LLMClient()
+        self.chunk_tokens = chunk_tokens
+        self.max_concurrency = max_concurrency
+        self.max_levels = max_levels
+        # Streamlit re-creates page objects on every rerun, so chunk summaries live
+        # in a module-level cache by default
+        self.map_cache = map_cache if map_cache is not None else _shared_map_cache
+
+    def summarize(
+        self,
+        text: str,
+        length: str = "medium",
+        kind: str = "text",
+        on_progress: Optional[Callable[[str, int, int], None]] = None,
+    ) -> Generator:
+        """
+        Summarize text and stream the final answer.
+
+        Args:
+            text (str): The text to summarize.
+            length (str): One of "short", "medium" or "detailed". Defaults to "medium".
+            kind (str): What the text is, used in prompts (e.g. "YouTube video transcript").
+            on_progress (callable, optional): Called as (phase, done, total) between steps.
+
+        Returns:
+            Generator: A g4f-style chunk stream for ``LLMClient.stream_content``.
+        """
+        instruction = LENGTH_INSTRUCTIONS.get(length, LENGTH_INSTRUCTIONS["medium"])
+        chunks = chunk_text(text, self.chunk_tokens)
+        if len(chunks) <= 1:
+            return self.llm_client.generate_text(
+                FINAL_PROMPT.format(kind=kind, length=instruction), text, stream=True
+            )
+
+        summaries = self._map(chunks, kind, on_progress)
+        if not summaries:
+            return replay_stream("Error: could not summarize any part of the text.")
+
+        level = 0
+        while (
+            estimate_tokens("\n\n".join(summaries)) > self.chunk_tokens
+            and len(summaries) > 1
+            and level < self.max_levels
+        ):
+            level += 1
+            if on_progress:
+                on_progress(f"reduce level {level}", 0, len(summaries))
+            summaries = self._combine(summaries, kind)
+
+        if on_progress:
+            on_progress("final", 0, 1)
+        sections = "\n\n".join(
+            f"Section {i + 1}:\n{summary}" for i, summary in enumerate(summaries)
+        )
+        return self.llm_client.generate_text(
+            FINAL_PROMPT.format(kind=kind, length=instruction), sections, stream=True
+        )
+
+    def _map(self, chunks: List[str], kind: str, on_progress) -> List[str]:
+        keys = [self._chunk_key(chunk, kind) for chunk in chunks]
+        summaries = [self.map_cache.get(key) for key in keys]
+        missing = [i for i, summary in enumerate(summaries) if summary is None]
+        if on_progress:
+            on_progress("map", len(chunks) - len(missing), len(chunks))
+
+        if missing:
+            system_prompt = MAP_PROMPT.format(kind=kind)
+            results = self.llm_client.generate_batch(
+                [(system_prompt, chunks[i]) for i in missing],
+                max_concurrency=self.max_concurrency,
+            )
+            for i, result in zip(missing, results):
+                if result.ok:
+                    summaries[i] = result.text
+                    self.map_cache.set(keys[i], result.text)
+            if on_progress:
+                on_progress("map", len(chunks), len(chunks))
+        # Failed chunks are dropped rather than failing the whole summary
+        return [summary for summary in summaries if summary]
+
+    def _combine(self, summaries: List[str], kind: str) -> List[str]:
+        groups, current = [], []
+        for summary in summaries:
+            # Always merge at least two summaries per group so every level shrinks
+            if (
+                len(current) >= 2
+                and estimate_tokens("\n\n".join(current + [summary]))
+                > self.chunk_tokens
+            ):
+                groups.append(current)
+                current = []
+            current.append(summary)
+        groups.append(current)
+
+        system_prompt = COMBINE_PROMPT.format(kind=kind)
+        results = self.llm_client.generate_batch(
+            [(system_prompt, "\n\n".join(group)) for group in groups],
+            max_concurrency=self.max_concurrency,
+        )
+        return [
+            result.text if result.ok else "\n\n".join(group)
+            for group, result in zip(groups, results)
+        ]
+
+    @staticmethod
+    def _chunk_key(chunk: str, kind: str) -> str:
+        return hashlib.sha256(f"{kind}\x00{chunk}".encode("utf-8")).hexdigest()
@@ -0,0 +1,68 @@
+import re
+from typing import List
+
+# Sentence boundary: terminal punctuation (optionally followed by closing quotes or
+# brackets) and whitespace, or a blank line.
+_SENTENCE_END = re.compile(r"(?<=[.!?])[\"')\]]*\s+|\n\s*\n")
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Cheaply estimate the number of model tokens in a text.
+
+    Uses the common ~4 characters per token heuristic, which is close enough for
+    budgeting prompts without shipping a tokenizer.
+    """
+    return max(1, (len(text) + 3) // 4) if text else 0
+
+
+def split_sentences(text: str) -> List[str]:
+    """Split text into sentences, dropping empty fragments."""
+    return [s.strip() for s in _SENTENCE_END.split(text) if s and s.strip()]
+
+
+def split_paragraphs(text: str) -> List[str]:
+    """Split text on blank lines, dropping empty paragraphs."""
+    return [p.strip() for p in re.split(r"\n\s*\n", text) if p.strip()]
+
+
+def chunk_text(text: str, max_tokens: int = 1500) -> List[str]:
+    """
+    Split text into sentence-aligned chunks of at most ``max_tokens`` tokens.
+
+    A single sentence longer than the budget is hard-wrapped on whitespace.
+
+    Args:
+        text (str): The text to split.
+        max_tokens (int): Token budget per chunk. Defaults to 1500.
+
+    Returns:
+        list[str]: The chunks, in document order.
+    """
+    chunks, current, current_tokens = [], [], 0
+    for sentence in split_sentences(text):
+        for piece in _wrap(sentence, max_tokens):
+            tokens = estimate_tokens(piece)
+            if current and current_tokens + tokens > max_tokens:
+                chunks.append(" ".join(current))
+                current, current_tokens = [], 0
+            current.append(piece)
+            current_tokens += tokens
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
+
+
+def _wrap(sentence: str, max_tokens: int) -> List[str]:
+    if estimate_tokens(sentence) <= max_tokens:
+        return [sentence]
+    pieces, current = [], ""
+    for word in sentence.split():
+        candidate = f"{current} {word}" if current else word
+        if current and estimate_tokens(candidate) > max_tokens:
+            pieces.append(current)
+            candidate = word
+        current = candidate
+    if current:
+        pieces.append(current)
+    return pieces
@@ -0,0 +1,221 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from tools.cache import DEFAULT_CACHE_DIR
+
+# Segments are stored in blocks covering this many seconds of video, so a time
+# range query only reads and decompresses the blocks it overlaps
+BLOCK_SECONDS = 120.0
+
+
+def format_timestamp(seconds: float) -> str:
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return (
+        f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes}:{seconds:02d}"
+    )
+
+
+@dataclass
+class Transcript:
+    """Transcript segments in columnar form: one array per field."""
+
+    video_id: str
+    language: str
+    starts: np.ndarray
+    durations: np.ndarray
+    texts: List[str]
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    @property
+    def text(self) -> str:
+        return " ".join(self.texts)
+
+    @property
+    def duration(self) -> float:
+        return float(self.starts[-1] + self.durations[-1]) if len(self) else 0.0
+
+    def slice(self, start: float = 0.0, end: Optional[float] = None) -> "Transcript":
+        """Segments overlapping [start, end) seconds."""
+        ends = self.starts + self.durations
+        mask = ends > start
+        if end is not None:
+            mask &= self.starts < end
+        indexes = np.flatnonzero(mask)
+        return Transcript(
+            self.video_id,
+            self.language,
+            self.starts[indexes],
+            self.durations[indexes],
+            [self.texts[i] for i in indexes],
+        )
+
+    def timestamped(self) -> str:
+        """Text with a [m:ss] marker in front of every segment."""
+        return "\n".join(
+            f"[{format_timestamp(start)}] {text}"
+            for start, text in zip(self.starts, self.texts)
+        )
+
+
+class TranscriptStore:
+    """
+    Local SQLite store of YouTube transcripts, keyed by (video id, language).
+
+    Each block row holds the segment start times and durations as float32
+    arrays and the segment texts as zlib-compressed JSON, so transcripts take
+    little space and a time range loads without reading the whole video.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.path.join(DEFAULT_CACHE_DIR, "transcripts.sqlite")
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("""CREATE TABLE IF NOT EXISTS videos (
+                    video_id TEXT NOT NULL,
+                    language TEXT NOT NULL,
+                    segments INTEGER NOT NULL,
+                    duration REAL NOT NULL,
+                    fetched_at REAL NOT NULL,
+                    PRIMARY KEY (video_id, language)
+                )""")
+            self._conn.execute("""CREATE TABLE IF NOT EXISTS blocks (
+                    video_id TEXT NOT NULL,
+                    language TEXT NOT NULL,
+                    block INTEGER NOT NULL,
+                    start REAL NOT NULL,
+                    end REAL NOT NULL,
+                    starts BLOB NOT NULL,
+                    durations BLOB NOT NULL,
+                    texts BLOB NOT NULL,
+                    PRIMARY KEY (video_id, language, block)
+                )""")
+
+    def save(self, video_id: str, language: str, entries: Iterable[Dict]) -> Transcript:
+        """
+        Store transcript entries as returned by ``YouTubeTranscriptApi.get_transcript``.
+
+        Args:
+            video_id (str): The YouTube video ID.
+            language (str): The transcript language code.
+            entries (iterable): Dicts with "text", "start" and "duration".
+
+        Returns:
+            Transcript: The stored transcript.
+        """
+        entries = sorted(entries, key=lambda e: e["start"])
+        starts = np.array([e["start"] for e in entries], dtype=np.float32)
+        durations = np.array(
+            [e.get("duration", 0.0) for e in entries], dtype=np.float32
+        )
+        texts = [e["text"] for e in entries]
+        transcript = Transcript(video_id, language, starts, durations, texts)
+
+        blocks = (starts // BLOCK_SECONDS).astype(np.int64)
+        rows = []
+        for block in np.unique(blocks):
+            indexes = np.flatnonzero(blocks == block)
+            rows.append(
+                (
+                    video_id,
+                    language,
+                    int(block),
+                    float(starts[indexes[0]]),
+                    float((starts[indexes] + durations[indexes]).max()),
+                    starts[indexes].tobytes(),
+                    durations[indexes].tobytes(),
+                    zlib.compress(
+                        json.dumps([texts[i] for i in indexes]).encode("utf-8")
+                    ),
+                )
+            )
+
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM blocks WHERE video_id = ? AND language = ?",
+                (video_id, language),
+            )
+            self._conn.executemany(
+                "INSERT INTO blocks VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO videos VALUES (?, ?, ?, ?, ?)",
+                (video_id, language, len(texts), transcript.duration, time.time()),
+            )
+        return transcript
+
+    def duration(self, video_id: str, language: str) -> Optional[float]:
+        """Video length in seconds, or None if the transcript is not stored."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT duration FROM videos WHERE video_id = ? AND language = ?",
+                (video_id, language),
+            ).fetchone()
+        return row[0] if row else None
+
+    def load(
+        self,
+        video_id: str,
+        language: str,
+        start: float = 0.0,
+        end: Optional[float] = None,
+    ) -> Optional[Transcript]:
+        """
+        Load the segments overlapping [start, end) seconds.
+
+        Only the blocks that overlap the range are read from disk.
+
+        Returns:
+            Transcript: The segments in the range, or None if the video is not stored.
+        """
+        if self.duration(video_id, language) is None:
+            return None
+        query = "SELECT starts, durations, texts FROM blocks WHERE video_id = ? AND language = ? AND end > ?"
+        params = [video_id, language, start]
+        if end is not None:
+            query += " AND start < ?"
+            params.append(end)
+        with self._lock:
+            rows = self._conn.execute(query + " ORDER BY block", params).fetchall()
+
+        starts = np.concatenate(
+            [np.frombuffer(row[0], dtype=np.float32) for row in rows]
+            or [np.zeros(0, np.float32)]
+        )
+        durations = np.concatenate(
+            [np.frombuffer(row[1], dtype=np.float32) for row in rows]
+            or [np.zeros(0, np.float32)]
+        )
+        texts = [text for row in rows for text in json.loads(zlib.decompress(row[2]))]
+        return Transcript(video_id, language, starts, durations, texts).slice(
+            start, end
+        )
+
+
+_default_store: Optional[TranscriptStore] = None
+_default_store_lock = threading.Lock()
+
+
+def get_transcript_store() -> TranscriptStore:
+    """Return the process-wide transcript store, creating it on first use."""
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            try:
+                _default_store = TranscriptStore()
+            except (OSError, sqlite3.Error):
+                _default_store = TranscriptStore(path=":memory:")
+        return _default_store
@@ -0,0 +1,227 @@
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from tools.cache import DEFAULT_CACHE_DIR
+from tools.llm_utils import LLMClient, is_error_response
+from tools.scheduler import capture_context, use_context
+
+SYSTEM_PROMPT = (
+    "You are a professional translator. Translate each numbered segment to "
+    "{language}. Keep the markers exactly as given, one per segment, in the same "
+    "order, e.g.\n<<1>>\ntranslated text\n<<2>>\ntranslated text\n"
+    "Do not merge or split segments and do not add any explanation."
+)
+_MARKER = re.compile(r"<<(\d+)>>")
+_SEGMENT_SPLIT = re.compile(r"(\n\s*\n)")
+
+
+def normalize_segment(text: str) -> str:
+    return " ".join(text.split())
+
+
+def segment_text(text: str) -> List[Tuple[str, str]]:
+    """
+    Split text into paragraphs, keeping the separator that follows each one.
+
+    Returns:
+        list: (paragraph, separator) pairs; joining them restores the input.
+    """
+    parts = _SEGMENT_SPLIT.split(text)
+    parts.append("")
+    return [(parts[i], parts[i + 1]) for i in range(0, len(parts) - 1, 2)]
+
+
+@dataclass
+class TranslationResult:
+    text: str
+    segments: int
+    hits: int
+    misses: int
+    error: Optional[str] = None
+
+
+class TranslationMemory:
+    """
+    Paragraph-level translation memory backed by SQLite.
+
+    Each paragraph is looked up by (normalized text, target language); only the
+    misses are sent to the LLM, together in one numbered prompt, and the
+    translated text is stitched back in the original order.
+    """
+
+    def __init__(
+        self, llm_client: Optional[LLMClient] = None, path: Optional[str] = None
+    ):
+        self.llm_client = llm_client or LLMClient()
+        self.path = path or os.path.join(DEFAULT_CACHE_DIR, "translation_memory.sqlite")
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("""CREATE TABLE IF NOT EXISTS segments (
+                    key TEXT NOT NULL,
+                    language TEXT NOT NULL,
+                    source TEXT NOT NULL,
+                    translation TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    PRIMARY KEY (key, language)
+                )""")
+
+    @staticmethod
+    def _key(segment: str) -> str:
+        return hashlib.sha256(normalize_segment(segment).encode("utf-8")).hexdigest()
+
+    def lookup(self, segments: List[str], language: str) -> Dict[str, str]:
+        """Return stored translations for the given segments, keyed by segment key."""
+        keys = list({self._key(s) for s in segments})
+        found = {}
+        with self._lock:
+            # Stay well below SQLite's bound-parameter limit
+            for start in range(0, len(keys), 500):
+                batch = keys[start : start + 500]
+                rows = self._conn.execute(
+                    f"SELECT key, translation FROM segments WHERE language = ? "
+                    f"AND key IN ({','.join('?' * len(batch))})",
+                    [language, *batch],
+                ).fetchall()
+                found.update(rows)
+        return found
+
+    def store(self, pairs: List[Tuple[str, str]], language: str) -> None:
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO segments VALUES (?, ?, ?, ?, ?)",
+                [
+                    (
+                        self._key(source),
+                        language,
+                        normalize_segment(source),
+                        translation,
+                        now,
+                    )
+                    for source, translation in pairs
+                ],
+            )
+
+    def _translate_segments(self, segments: List[str], language: str) -> Dict[int, str]:
+        numbered = "\n".join(
+            f"<<{i + 1}>>\n{segment}" for i, segment in enumerate(segments)
+        )
+        response = self.llm_client.generate_text(
+            SYSTEM_PROMPT.format(language=language), numbered
+        )
+        if not response or is_error_response(response):
+            raise RuntimeError(response or "Empty response")
+
+        parts = _MARKER.split(self.llm_client.remove_triple_backticks(response))
+        translations = {}
+        for i in range(1, len(parts) - 1, 2):
+            index = int(parts[i]) - 1
+            # Markers the prompt never used (e.g. <<0>>) are ignored
+            if 0 <= index < len(segments):
+                translations[index] = parts[i + 1].strip()
+        return translations
+
+    def translate(self, text: str, language: str) -> TranslationResult:
+        """
+        Translate text, reusing stored paragraph translations.
+
+        Args:
+            text (str): The source text.
+            language (str): The target language.
+
+        Returns:
+            TranslationResult: The stitched translation and hit/miss counts.
+        """
+        pieces = segment_text(text)
+        sources = [p for p, _ in pieces if p.strip()]
+        known = self.lookup(sources, language)
+
+        misses, seen = [], set()
+        for source in sources:
+            key = self._key(source)
+            if key not in known and key not in seen:
+                seen.add(key)
+                misses.append(source)
+
+        error = None
+        if misses:
+            try:
+                translated = self._translate_segments(misses, language)
+                # Segments the model dropped or merged are retried one by one
+                missing = [i for i in range(len(misses)) if not translated.get(i)]
+                if missing:
+                    results = self.llm_client.generate_batch(
+                        [
+                            (
+                                SYSTEM_PROMPT.format(language=language),
+                                f"<<1>>\n{misses[i]}",
+                            )
+                            for i in missing
+                        ]
+                    )
+                    for i, result in zip(missing, results):
+                        if result.ok:
+                            translated[i] = _MARKER.sub("", result.text).strip()
+                new = [
+                    (misses[i], t)
+                    for i, t in translated.items()
+                    if 0 <= i < len(misses) and t
+                ]
+                self.store(new, language)
+                known.update((self._key(source), t) for source, t in new)
+            except Exception as e:
+                error = str(e)
+
+        # Untranslatable paragraphs are left in the source language
+        output = "".join(
+            (known.get(self._key(p), p) if p.strip() else p) + separator
+            for p, separator in pieces
+        )
+        return TranslationResult(
+            text=output,
+            segments=len(sources),
+            hits=len(sources) - sum(1 for s in sources if self._key(s) in seen),
+            misses=len(misses),
+            error=error,
+        )
+
+    def translate_many(
+        self, text: str, languages: List[str], max_concurrency: int = 4
+    ) -> List[TranslationResult]:
+        """Translate one text into several languages concurrently, in input order."""
+        # Worker threads schedule their requests under the caller's session
+        context = capture_context()
+
+        def run(language: str) -> TranslationResult:
+            with use_context(context):
+                return self.translate(text, language)
+
+        workers = max(1, min(max_concurrency, len(languages)))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(run, languages))
+
+
+_default_memory: Optional[TranslationMemory] = None
+_default_memory_lock = threading.Lock()
+
+
+def get_translation_memory(llm_client: Optional[LLMClient] = None) -> TranslationMemory:
+    """Return the process-wide translation memory, creating it on first use."""
+    global _default_memory
+    with _default_memory_lock:
+        if _default_memory is None:
+            try:
+                _default_memory = TranslationMemory(llm_client)
+            except (OSError, sqlite3.Error):
+                _default_memory = TranslationMemory(llm_client, path=":memory:")
+        return _default_memory